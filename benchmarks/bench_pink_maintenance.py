@@ -0,0 +1,89 @@
+# DB size and query time of the history DB before and after pink_maintenance.run_maintenance
+# bench_pink_maintenance.py
+#
+# Run from the repository root:
+#   python -m benchmarks.bench_pink_maintenance [listings] [days]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from pink_olx_app import pink_maintenance
+from pink_olx_app.pink_store import PinkStore
+
+DAY = 86400
+QUERIES = ["xiaomi tablet", "iphone", "golf 7", "felge"]
+
+
+def populate(store, listings, days, now, crawls_per_day=4):
+    """Fills the store with `days` of crawls; each crawl ~25% of listings change price."""
+    start = now - days * DAY
+    prices = {i: random.uniform(50, 900) for i in range(listings)}
+    with store.transaction() as conn:
+        conn.executemany("INSERT INTO queries (id, query) VALUES (?, ?)", list(enumerate(QUERIES, 1)))
+        conn.executemany(
+            "INSERT INTO listings (listing_id, title, price, state, city, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(i, f"listing {i}", prices[i], "used", "Sarajevo", start, start + random.randint(0, days) * DAY)
+             for i in range(listings)])
+        # Rows inserted directly are not in the full-text index yet (PinkStore indexes its own saves).
+        conn.execute("INSERT INTO listings_fts (listings_fts) VALUES ('rebuild')")
+        conn.executemany(
+            "INSERT INTO query_listings (query_id, listing_id, first_seen, last_seen) VALUES (?, ?, ?, ?)",
+            [(i % len(QUERIES) + 1, i, start, now) for i in range(listings)])
+        for crawl in range(days * crawls_per_day):
+            timestamp = start + crawl * DAY // crawls_per_day
+            rows = []
+            for i in range(listings):
+                if crawl == 0 or random.random() < 0.25:
+                    prices[i] = round(prices[i] * random.uniform(0.9, 1.1), 2)
+                    rows.append((i, timestamp, prices[i]))
+                # Re-observing the same price, as a naive import would.
+                elif random.random() < 0.02:
+                    rows.append((i, timestamp, prices[i]))
+            conn.executemany("INSERT INTO price_observations (listing_id, observed_at, price) VALUES (?, ?, ?)", rows)
+            conn.executemany("INSERT INTO searches (query_id, timestamp, result_count) VALUES (?, ?, ?)",
+                             [(q, timestamp, listings // len(QUERIES)) for q in range(1, len(QUERIES) + 1)])
+
+
+def measure(store, path):
+    store.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+    observations = store.conn.execute("SELECT COUNT(*) FROM price_observations").fetchone()[0]
+    start = time.perf_counter()
+    store.get_history_for_query("xiaomi tablet")
+    history = time.perf_counter() - start
+    start = time.perf_counter()
+    store.conn.execute("""
+        SELECT o.observed_at / 86400, MIN(o.price), MAX(o.price), COUNT(*)
+        FROM price_observations o JOIN query_listings ql ON ql.listing_id = o.listing_id
+        WHERE ql.query_id = 1 GROUP BY 1
+    """).fetchall()
+    daily = time.perf_counter() - start
+    return size, observations, history, daily
+
+
+def run(listings, days):
+    random.seed(0)
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        store = PinkStore(path)
+        populate(store, listings, days, now)
+
+        before = measure(store, path)
+        report = pink_maintenance.run_maintenance(store, retention_days=days // 2, rollup_after_days=14, now=now)
+        after = measure(store, path)
+        store.close()
+
+    print(f"listings: {listings}, days: {days}")
+    print(f"maintenance: {report}")
+    for label, (size, observations, history, daily) in (("before", before), ("after", after)):
+        print(f"  {label:6}: {size / 1e6:7.1f} MB  {observations:>9,} observations  "
+              f"history {history * 1000:6.0f} ms  daily stats {daily * 1000:6.0f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 180)
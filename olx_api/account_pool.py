@@ -0,0 +1,256 @@
+# olx_api/account_pool.py
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from olx_api.listings import Listings
+from olx_api.token_provider import TokenProvider
+from olx_api.users import Users
+
+
+class Account:
+    """
+    One OLX account in an AccountPool: its login, shared token and known quota.
+    """
+
+    def __init__(self, auth, cache_path=None):
+        """
+        :param auth: An OLXAuth instance for the account.
+        :param cache_path: (Optional) Token cache file, see TokenProvider.
+        """
+        self.auth = auth
+        self.name = auth.username
+        # OLX username (auth.username is the login, usually an email); see AccountPool.username_of
+        self.username = None
+        self.token_provider = TokenProvider(auth, cache_path=cache_path)
+        self.listing_ids = set()
+        self.refresh_limits = {}
+        self.listing_limits = {}
+        self.free_refreshes_left = 0
+
+    def api(self, api_class):
+        """
+        Returns an instance of api_class (e.g. Listings, Search) authenticated as this account.
+
+        :param api_class: An OLXBase subclass.
+        :return: The API instance.
+        """
+        return api_class(token=self.token_provider)
+
+
+class AccountPool:
+    """
+    Spreads traffic over several OLX accounts.
+
+    Read traffic (search, categories, locations, ...) is handed out round-robin, so each
+    account's rate limit only sees a share of the requests. Mutations are routed to the account
+    that owns the listing. Per-account refresh quota is read from get_refresh_limits and
+    decremented locally, so bulk refresh jobs go to accounts that still have free refreshes
+    without extra limit lookups; the listing limits (get_listing_limits) are kept alongside.
+
+    Usage Example:
+        >>> pool = AccountPool([
+        ...     OLXAuth(username="shop1@olx.ba", password="password1"),
+        ...     OLXAuth(username="shop2@olx.ba", password="password2"),
+        ... ])
+        >>> pool.load_ownership()
+        >>> pool.update_quotas()
+        >>> results = pool.reader(Search).search_listings(q="iphone")
+        >>> pool.refresh_listing(40)
+    """
+
+    def __init__(self, auths, cache_dir=None):
+        """
+        :param auths: Iterable of OLXAuth instances, one per account.
+        :param cache_dir: (Optional) Directory for the per-account token cache files.
+        """
+        self.accounts = []
+        for auth in auths:
+            cache_path = None
+            if cache_dir:
+                default_path = TokenProvider.default_cache_path(auth.username, auth.device_name)
+                cache_path = os.path.join(cache_dir, os.path.basename(default_path))
+            self.accounts.append(Account(auth, cache_path=cache_path))
+        if not self.accounts:
+            raise ValueError("AccountPool needs at least one account.")
+        self._owners = {}
+        self._round_robin = itertools.cycle(self.accounts)
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+    # -- Routing --
+    def next_account(self):
+        """
+        Returns the next account in round-robin order.
+        """
+        with self._lock:
+            return next(self._round_robin)
+
+    def reader(self, api_class):
+        """
+        Returns an API instance for read traffic, rotating through the accounts.
+
+        :param api_class: An OLXBase subclass (e.g. Search, Categories).
+        :return: The API instance.
+        """
+        return self.next_account().api(api_class)
+
+    def owner_of(self, listing_id):
+        """
+        Returns the account owning a listing.
+
+        :param listing_id: ID of the listing.
+        :return: The owning Account.
+        :raises: KeyError if the owner is unknown (see register_listing / load_ownership).
+        """
+        try:
+            return self._owners[int(listing_id)]
+        except KeyError:
+            raise KeyError(f"No account in the pool owns listing {listing_id}.")
+
+    def writer(self, listing_id, api_class=Listings):
+        """
+        Returns an API instance authenticated as the owner of a listing, for mutations.
+
+        :param listing_id: ID of the listing.
+        :param api_class: An OLXBase subclass (default Listings; e.g. Sponsored).
+        :return: The API instance.
+        """
+        return self.owner_of(listing_id).api(api_class)
+
+    def register_listing(self, listing_id, account):
+        """
+        Records that a listing belongs to an account.
+
+        :param listing_id: ID of the listing.
+        :param account: The owning Account, or its username.
+        :raises: KeyError if no account in the pool has that username.
+        """
+        if not isinstance(account, Account):
+            username = account
+            account = next((a for a in self.accounts if a.name == username), None)
+            if account is None:
+                raise KeyError(f"No account in the pool has username {username!r}.")
+        with self._lock:
+            self._owners[int(listing_id)] = account
+            account.listing_ids.add(int(listing_id))
+
+    def username_of(self, account):
+        """
+        Returns the OLX username of an account: from the login response if the account logged in,
+        otherwise (e.g. with a cached token) from its /me profile. Resolved once per account.
+
+        :param account: An Account of the pool.
+        :return: The username, or None if the profile has none.
+        """
+        if account.username is None:
+            username = (account.auth.user or {}).get("username")
+            if not username:
+                profile = account.api(Users).get_me()
+                if isinstance(profile.get("data"), dict):
+                    profile = profile["data"]
+                username = profile.get("username")
+            account.username = username
+        return account.username
+
+    def load_ownership(self, max_pages=50):
+        """
+        Fills the ownership map from every account's active listings.
+
+        :param max_pages: Maximum number of pages to read per account.
+        """
+        for account in self.accounts:
+            users_api = account.api(Users)
+            username = self.username_of(account)
+            if not username:
+                self.logger.warning("Could not resolve the OLX username of account %s; skipping it.", account.name)
+                continue
+            for page in range(1, max_pages + 1):
+                response = users_api.get_active_listings(username, page=page)
+                data = response.get("data", [])
+                for listing in data:
+                    self.register_listing(listing["id"], account)
+                meta = response.get("meta", {})
+                if not data or page >= meta.get("last_page", page):
+                    break
+
+    # -- Quota --
+    def update_quotas(self):
+        """
+        Reads the refresh and listing limits of every account.
+        """
+        for account in self.accounts:
+            listings_api = account.api(Listings)
+            limits = listings_api.get_refresh_limits()
+            if isinstance(limits.get("data"), dict):
+                limits = limits["data"]
+            account.refresh_limits = limits
+            account.listing_limits = listings_api.get_listing_limits()
+            free_limit = int(limits.get("free_limit", 0) or 0)
+            free_count = int(limits.get("free_count", 0) or 0)
+            account.free_refreshes_left = max(free_limit - free_count, 0)
+
+    def quotas(self):
+        """
+        Returns the locally tracked free refreshes left per account name.
+        """
+        return {account.name: account.free_refreshes_left for account in self.accounts}
+
+    def refresh_listing(self, listing_id, allow_paid=False):
+        """
+        Refreshes a listing through its owner, using up one of the owner's free refreshes.
+
+        :param listing_id: ID of the listing.
+        :param allow_paid: If False, refuse to refresh once the owner has no free refreshes left.
+        :return: The JSON response, or None if the owner's free quota is used up.
+        """
+        account = self.owner_of(listing_id)
+        with self._lock:
+            uses_free = account.free_refreshes_left > 0
+            if not uses_free and not allow_paid:
+                self.logger.debug("Account %s has no free refreshes left.", account.name)
+                return None
+            if uses_free:
+                account.free_refreshes_left -= 1
+        try:
+            return account.api(Listings).refresh_listing(listing_id)
+        except Exception:
+            if uses_free:
+                with self._lock:
+                    account.free_refreshes_left += 1
+            raise
+
+    def refresh_many(self, listing_ids, allow_paid=False):
+        """
+        Refreshes many listings, each through its owner, skipping those whose owner is out of quota.
+        Accounts are worked on in parallel; requests of a single account stay sequential.
+
+        :param listing_ids: Iterable of listing IDs.
+        :param allow_paid: See refresh_listing.
+        :return: A dict of listing_id -> JSON response (None for skipped listings, the exception
+                 for failed ones).
+        """
+        by_account = {}
+        for listing_id in listing_ids:
+            by_account.setdefault(self.owner_of(listing_id).name, []).append(listing_id)
+
+        def run(ids):
+            results = {}
+            for listing_id in ids:
+                try:
+                    results[listing_id] = self.refresh_listing(listing_id, allow_paid=allow_paid)
+                except Exception as e:
+                    self.logger.warning("Refreshing listing %s failed: %s", listing_id, e)
+                    results[listing_id] = e
+            return results
+
+        results = {}
+        if not by_account:
+            return results
+        with ThreadPoolExecutor(max_workers=len(by_account)) as pool:
+            for partial in pool.map(run, by_account.values()):
+                results.update(partial)
+        return results
@@ -3,6 +3,8 @@
 import logging
 import requests
 
+from olx_api.token_provider import TokenProvider
+
 
 class OLXBase:
     BASE_URL = "https://api.olx.ba"
@@ -12,7 +14,7 @@ class OLXBase:
         """
         Base initializer that accepts an optional token.
 
-        :param token: Optional Bearer token for authentication.
+        :param token: Optional Bearer token, or a TokenProvider shared between instances.
 
         Example logging:
         if not self.logger.handlers:
@@ -22,10 +24,29 @@ class OLXBase:
             file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
         """
+        self.token_provider = None
         self.token = token
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.addHandler(logging.NullHandler())
 
+    @property
+    def token(self):
+        """
+        The Bearer token used for requests. Resolved through the TokenProvider if one was given.
+        """
+        if self.token_provider is not None:
+            return self.token_provider.get_token()
+        return self._token
+
+    @token.setter
+    def token(self, value):
+        if isinstance(value, TokenProvider):
+            self.token_provider = value
+            self._token = None
+        else:
+            self.token_provider = None
+            self._token = value
+
     def _get_headers(self, multipart=False):
         """
         Returns the common headers for authenticated requests.
@@ -48,11 +69,15 @@ class OLXBase:
         Common method to log, raise errors, and return JSON from a response.
 
         Logs the response status code and JSON content (or text if not JSON).
+        If a TokenProvider is set and the response is a 401, the token is refreshed once and
+        the request is sent again.
 
         :param response: The HTTP response object.
         :return: Parsed JSON from the response.
         :raises: HTTPError if the response status indicates an error.
         """
+        if response.status_code == 401 and self.token_provider is not None:
+            response = self._retry_with_new_token(response)
         self.logger.debug("Response Status Code: %s", response.status_code)
         try:
             json_response = response.json()
@@ -61,3 +86,19 @@ class OLXBase:
             self.logger.debug("Response is not valid JSON. Raw response: %s", response.text)
         response.raise_for_status()
         return response.json()
+
+    def _retry_with_new_token(self, response):
+        """
+        Refreshes the token through the TokenProvider and re-sends the rejected request.
+
+        :param response: The 401 response.
+        :return: The response of the retried request.
+        """
+        request = response.request
+        stale = (request.headers.get("Authorization") or "")[len("Bearer "):] or None
+        token = self.token_provider.refresh(stale_token=stale)
+        self.logger.debug("Token rejected, retrying %s %s with a new token.", request.method, request.url)
+        retry = request.copy()
+        retry.headers["Authorization"] = f"Bearer {token}"
+        with requests.Session() as session:
+            return session.send(retry)
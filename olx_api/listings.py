@@ -59,8 +59,8 @@ class Listings(OLXBase):
         """
         url = f"{self.BASE_URL}/listings/{listing_id}"
         response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        data = self._handle_response(response)
+        return data
 
     def create_listing(self, title, short_description=None, description=None, country_id=None,
                        city_id=None, price=None, available=None, listing_type=None,
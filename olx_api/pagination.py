@@ -0,0 +1,205 @@
+# olx_api/pagination.py
+import hashlib
+import logging
+import math
+from array import array
+from bisect import bisect_left
+
+
+class CompactIdSet:
+    """
+    Set of integer listing ids stored in a sorted array of 64-bit ints (8 bytes per id instead
+    of ~60 for a Python set entry). New ids go to an unsorted buffer that is merged into the
+    sorted array once it holds an eighth as many ids, so adds stay cheap (amortized).
+    """
+
+    def __init__(self, buffer_size=1024):
+        self._sorted = array("q")
+        self._buffer = set()
+        self.buffer_size = buffer_size
+
+    def __len__(self):
+        return len(self._sorted) + len(self._buffer)
+
+    def __contains__(self, listing_id):
+        if listing_id in self._buffer:
+            return True
+        index = bisect_left(self._sorted, listing_id)
+        return index < len(self._sorted) and self._sorted[index] == listing_id
+
+    def add(self, listing_id):
+        """Adds an id; returns False if it was already present."""
+        if listing_id in self:
+            return False
+        self._buffer.add(listing_id)
+        if len(self._buffer) >= max(self.buffer_size, len(self._sorted) // 8):
+            self._sorted = array("q", sorted(self._sorted.tolist() + list(self._buffer)))
+            self._buffer.clear()
+        return True
+
+
+class BloomFilter:
+    """
+    Probabilistic id set for very large crawls: a fixed bit array sized for 'capacity' ids at
+    the given false positive rate (about 1.2 bytes per id at 1%). It never misses an added id
+    but may claim an unseen id was added, so a few unique listings can be counted as duplicates.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _positions(self, listing_id):
+        digest = hashlib.blake2b(str(listing_id).encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, listing_id):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(listing_id))
+
+    def add(self, listing_id):
+        """Adds an id; returns False if it was (probably) already present."""
+        present = True
+        for position in self._positions(listing_id):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                present = False
+        if not present:
+            self._count += 1
+        return not present
+
+
+class ConsistentPaginator:
+    """
+    Pages through live search results while detecting the damage that listings added or removed
+    mid-crawl do to offset pagination.
+
+    - Added listings push everything down: the tail of page p-1 shows up again at the head of
+      page p. These duplicates are dropped by id (tracked in a compact id set).
+    - Removed listings pull everything up: the head of page p slides onto page p-1, which was
+      already read, so those listings are silently missed. This is detected when meta.total
+      drops between pages, and page p-1 is re-fetched to recover them (refetch=True).
+
+    Usage Example:
+        >>> paginator = ConsistentPaginator(Search(token=None))
+        >>> listings = paginator.crawl("iphone")
+        >>> paginator.report["consistency"]
+        0.998
+    """
+
+    def __init__(self, search_api, per_page=40, refetch=True, max_refetches=10, id_set=None):
+        """
+        :param search_api: A Search instance.
+        :param per_page: Results per page.
+        :param refetch: Re-fetch the previous page when items may have shifted past a boundary.
+        :param max_refetches: Maximum number of extra page requests per crawl.
+        :param id_set: (Optional) Factory for the seen-id set; defaults to CompactIdSet. Pass e.g.
+                       lambda: BloomFilter(5_000_000) for very large crawls.
+        """
+        self.search_api = search_api
+        self.per_page = per_page
+        self.refetch = refetch
+        self.max_refetches = max_refetches
+        self.id_set = id_set or CompactIdSet
+        self.report = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+    def _fetch(self, q, category_id, page, extra_params):
+        response = self.search_api.search_listings(q, category_id, page=page, per_page=self.per_page,
+                                                   extra_params=extra_params)
+        return response.get("data", []), response.get("meta", {}).get("total", 0)
+
+    def crawl(self, q, category_id=None, extra_params=None, max_pages=None):
+        """
+        Fetches all pages of a search, dropping duplicates and re-fetching shifted pages.
+
+        :param q: Search query string.
+        :param category_id: (Optional) Category ID to filter the search.
+        :param extra_params: (Optional) A dict of extra URL parameters.
+        :param max_pages: (Optional) Maximum number of pages to fetch (re-fetches not included).
+        :return: A list of unique listing dictionaries in result order. Details are in self.report.
+        """
+        seen = self.id_set()
+        listings, shifts, refetched = [], [], []
+        rows = duplicates = recovered = missing = 0
+
+        def collect(data):
+            nonlocal rows, duplicates
+            added = 0
+            for item in data:
+                rows += 1
+                if item.get("id") is None or seen.add(item["id"]):
+                    listings.append(item)
+                    added += 1
+                else:
+                    duplicates += 1
+            return added
+
+        data, total = self._fetch(q, category_id, 1, extra_params)
+        first_total = total
+        collect(data)
+        pages_needed = math.ceil(total / self.per_page) if total else 0
+        if max_pages is not None:
+            pages_needed = min(pages_needed, max_pages)
+
+        page = 1
+        while page < pages_needed and len(data) >= self.per_page:
+            page += 1
+            previous_total = total
+            try:
+                data, total = self._fetch(q, category_id, page, extra_params)
+            except Exception as e:
+                self.logger.warning("Error on page %d: %s. Stopping.", page, e)
+                break
+            # Leading non-sponsored rows already seen: the list moved down by that many.
+            leading = 0
+            for item in data:
+                if item.get("sponsored"):
+                    continue
+                if item.get("id") not in seen:
+                    break
+                leading += 1
+            collect(data)
+            if leading:
+                shifts.append((page, leading))
+            if total < previous_total:
+                # Up to this many listings may have slid onto the page already read.
+                dropped, found = previous_total - total, 0
+                shifts.append((page, -dropped))
+                if self.refetch and len(refetched) < self.max_refetches:
+                    refetched.append(page - 1)
+                    try:
+                        found = collect(self._fetch(q, category_id, page - 1, extra_params)[0])
+                    except Exception as e:
+                        self.logger.warning("Error re-fetching page %d: %s.", page - 1, e)
+                recovered += found
+                missing += max(0, dropped - found)
+            if total != previous_total and max_pages is None:
+                pages_needed = math.ceil(total / self.per_page)
+
+        self.report = {
+            "pages": page,
+            "requests": page + len(refetched),
+            "total_start": first_total,
+            "total_end": total,
+            "rows": rows,
+            "unique": len(listings),
+            "duplicates": duplicates,
+            "shifts": shifts,
+            "refetched": refetched,
+            "recovered": recovered,
+            # Upper bound: removals after the boundary did not move anything that was read.
+            "missing_estimate": missing,
+            # 1.0 means every row read was a new listing and nothing is estimated missing.
+            "consistency": round(len(listings) / (rows + missing), 4) if rows + missing else 1.0,
+        }
+        if shifts:
+            self.logger.info("Results shifted during crawl of %r: %s", q, shifts)
+        return listings
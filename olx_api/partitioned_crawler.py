@@ -0,0 +1,166 @@
+# olx_api/partitioned_crawler.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PartitionedCrawler:
+    """
+    Crawls every listing of a broad query by splitting it into price bands small enough to
+    page through completely.
+
+    Deep pages of a big result set are capped or inconsistent, so a single paginated crawl
+    misses listings. The crawler asks for meta.total of the whole query (one listing per
+    request), and while a band holds more than per_page * max_pages listings it is split in
+    two at the middle price; an open-ended top band is split at double its lower bound.
+    Neighbouring bands share their boundary price, so decimal prices are not lost between
+    them. The partitions are crawled concurrently and merged, dropping duplicate ids.
+    Optionally the query is first split by category.
+
+    Usage Example:
+        >>> crawler = PartitionedCrawler(Search(token=None), max_pages=50)
+        >>> listings = crawler.crawl("iphone")
+        >>> crawler.report
+        {'partitions': 12, 'expected': 9120, 'fetched': 9120, 'duplicates': 3, 'capped': [], ...}
+    """
+
+    def __init__(self, search_api, per_page=40, max_pages=50, price_from_param="price_from",
+                 price_to_param="price_to", max_workers=4, first_split=1000):
+        """
+        :param search_api: A Search instance.
+        :param per_page: Results per page when crawling partitions.
+        :param max_pages: Maximum number of pages that can be read reliably per partition.
+        :param price_from_param: URL parameter for the lower price bound (inclusive).
+        :param price_to_param: URL parameter for the upper price bound (inclusive).
+        :param max_workers: Number of concurrent requests.
+        :param first_split: Where to split the open-ended band [0, inf) first.
+        """
+        self.search_api = search_api
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.price_from_param = price_from_param
+        self.price_to_param = price_to_param
+        self.max_workers = max_workers
+        self.first_split = first_split
+        self.report = {}
+        self._requests = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+    @property
+    def capacity(self):
+        """Maximum number of listings a single partition may hold."""
+        return self.per_page * self.max_pages
+
+    def _band_params(self, extra_params, low, high):
+        params = dict(extra_params or {})
+        params[self.price_from_param] = low
+        if high is not None:
+            params[self.price_to_param] = high
+        return params
+
+    def count(self, q, category_id=None, low=0, high=None, extra_params=None):
+        """
+        Returns meta.total for a query restricted to the price band [low, high] (high=None: no upper bound).
+        """
+        with self._lock:
+            self._requests += 1
+        response = self.search_api.search_listings(q, category_id, page=1, per_page=1,
+                                                   extra_params=self._band_params(extra_params, low, high))
+        return response.get("meta", {}).get("total", 0)
+
+    def _split(self, low, high):
+        if high is None:
+            middle = max(low * 2, low + self.first_split)
+        else:
+            middle = (low + high) // 2
+        return (low, middle), (middle, high)
+
+    def plan(self, q, category_ids=None, extra_params=None, totals=None):
+        """
+        Splits the query into partitions that each fit under the page cap.
+
+        :param q: Search query string.
+        :param category_ids: (Optional) Category IDs to split by before splitting by price.
+        :param extra_params: (Optional) Extra URL parameters applied to every request.
+        :param totals: (Optional) Already counted totals of the whole query, one per category ID
+                       (or one for no category); saves counting them again.
+        :return: A list of (category_id, low, high, total) partitions; high=None means no upper bound.
+        """
+        pending = [(category_id, 0, None) for category_id in (category_ids or [None])]
+        partitions, self.report["capped"] = [], []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending:
+                if totals is None:
+                    totals = list(pool.map(lambda band: self.count(q, band[0], band[1], band[2], extra_params),
+                                           pending))
+                next_pending = []
+                for (category_id, low, high), total in zip(pending, totals):
+                    if total == 0:
+                        continue
+                    if total <= self.capacity:
+                        partitions.append((category_id, low, high, total))
+                    elif high is not None and high - low <= 1:
+                        # One price step with more listings than the cap: crawl what we can.
+                        self.logger.warning("Prices %s-%s have %d listings; only %d can be crawled.",
+                                            low, high, total, self.capacity)
+                        self.report["capped"].append((category_id, low, high, total))
+                        partitions.append((category_id, low, high, total))
+                    else:
+                        next_pending.extend((category_id,) + band for band in self._split(low, high))
+                pending, totals = next_pending, None
+        return partitions
+
+    def _crawl_partition(self, q, partition, extra_params):
+        category_id, low, high, _ = partition
+        listings, pages = [], 0
+        for data in self.search_api.iter_search_pages(q, category_id, per_page=self.per_page,
+                                                      extra_params=self._band_params(extra_params, low, high),
+                                                      max_pages=self.max_pages):
+            listings.extend(data)
+            pages += 1
+        with self._lock:
+            self._requests += max(pages, 1)
+        return listings
+
+    def crawl(self, q, category_ids=None, extra_params=None):
+        """
+        Crawls every partition of the query concurrently and merges the results.
+
+        :param q: Search query string.
+        :param category_ids: (Optional) Category IDs to split by before splitting by price.
+        :param extra_params: (Optional) Extra URL parameters applied to every request.
+        :return: A list of unique listing dictionaries; listings without an id are skipped, since
+                 they can't be told apart from their duplicates. Details are in self.report.
+        """
+        self._requests = 0
+        self.report = {}
+        totals = [self.count(q, category_id, extra_params=extra_params) for category_id in (category_ids or [None])]
+        expected = sum(totals)
+        partitions = self.plan(q, category_ids, extra_params, totals)
+
+        merged, duplicates, without_id = {}, 0, 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for listings in pool.map(lambda partition: self._crawl_partition(q, partition, extra_params), partitions):
+                for item in listings:
+                    listing_id = item.get("id")
+                    if listing_id is None:
+                        without_id += 1
+                    elif listing_id in merged:
+                        duplicates += 1
+                    else:
+                        merged[listing_id] = item
+
+        self.report.update({
+            "partitions": len(partitions),
+            "expected": expected,
+            "partitioned": sum(partition[3] for partition in partitions),
+            "fetched": len(merged),
+            "duplicates": duplicates,
+            "without_id": without_id,
+            "requests": self._requests,
+        })
+        if len(merged) < expected:
+            self.logger.warning("Fetched %d of %d listings for %r.", len(merged), expected, q)
+        return list(merged.values())
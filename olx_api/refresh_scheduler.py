@@ -0,0 +1,275 @@
+# olx_api/refresh_scheduler.py
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class RefreshScheduler:
+    """
+    Spreads listing refreshes over the day so the free refresh quota is used exactly.
+
+    The scheduler keeps a priority queue of listings and reads free_limit / free_count /
+    paid_count from Listings.get_refresh_limits() before every refresh. The remaining free
+    refreshes are spaced evenly until the end of the day, so nothing is wasted and the limit
+    is never exceeded. The queue and refresh history are persisted to a JSON file, so the
+    worker can be restarted at any time.
+
+    Ranking modes:
+      - "age": the listing refreshed the longest time ago goes first.
+      - "views": the listing with the most views goes first.
+      - "score": the listing with the highest user supplied score goes first.
+    With "views" and "score" the queue is worked through in rounds: a refreshed listing waits
+    until every other listing has been refreshed as often, so the top listing isn't refreshed
+    over and over.
+
+    Usage Example:
+        >>> listings_api = Listings(token="your_valid_token")
+        >>> scheduler = RefreshScheduler(listings_api, state_path="refresh_state.json", rank_by="views")
+        >>> scheduler.add_listing(40, views=120)
+        >>> scheduler.add_listing(41, views=15)
+        >>> scheduler.run_forever()
+    """
+
+    RANKINGS = ("age", "views", "score")
+
+    def __init__(self, listings_api, state_path="refresh_scheduler.json", rank_by="age", allow_paid=False,
+                 clock=time.time, sleep=None):
+        """
+        Initializes the scheduler.
+
+        :param listings_api: A Listings instance used for refresh calls and limit lookups.
+        :param state_path: Path of the JSON file the queue is persisted to (None disables persistence).
+        :param rank_by: One of "age", "views" or "score".
+        :param allow_paid: If True, keep refreshing with paid refreshes once the free quota is used up.
+        :param clock: Callable returning the current unix time (injectable for tests).
+        :param sleep: Callable used to wait between refreshes (defaults to an interruptible wait).
+        """
+        if rank_by not in self.RANKINGS:
+            raise ValueError(f"rank_by must be one of {self.RANKINGS}, got {rank_by!r}")
+        self.listings_api = listings_api
+        self.state_path = state_path
+        self.rank_by = rank_by
+        self.allow_paid = allow_paid
+        self.clock = clock
+        self._stop = threading.Event()
+        self.sleep = sleep or self._stop.wait
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+        self._entries = {}
+        self._heap = []
+        self._counter = 0
+        # Unix time the next refresh is due; None means "now".
+        self.next_due = None
+        self.load_state()
+
+    # -- Queue management --
+    def add_listing(self, listing_id, views=0, score=0.0, last_refreshed=None):
+        """
+        Adds a listing to the queue, or updates its ranking data if it is already queued.
+
+        :param listing_id: ID of the listing.
+        :param views: Number of views (used by the "views" ranking).
+        :param score: User supplied score (used by the "score" ranking).
+        :param last_refreshed: Unix time of the last refresh (defaults to the stored value or 0).
+        """
+        key = str(listing_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            # New listings join the current round instead of catching up on all earlier ones.
+            rounds = min((queued.get("rounds", 0) for queued in self._entries.values()), default=0)
+            entry = {"listing_id": listing_id, "last_refreshed": 0, "rounds": rounds}
+        entry["views"] = views
+        entry["score"] = score
+        if last_refreshed is not None:
+            entry["last_refreshed"] = last_refreshed
+        self._entries[key] = entry
+        self._push(entry)
+
+    def remove_listing(self, listing_id):
+        """
+        Removes a listing from the queue. Stale heap entries are skipped lazily.
+
+        :param listing_id: ID of the listing.
+        """
+        self._entries.pop(str(listing_id), None)
+
+    def queued_listings(self):
+        """
+        Returns the queued listing IDs in the order they would be refreshed.
+
+        :return: A list of listing IDs.
+        """
+        return [entry["listing_id"] for entry in sorted(self._entries.values(), key=self._priority)]
+
+    def _priority(self, entry):
+        if self.rank_by == "age":
+            return entry["last_refreshed"]
+        if self.rank_by == "views":
+            return entry.get("rounds", 0), -entry["views"]
+        return entry.get("rounds", 0), -entry["score"]
+
+    def _push(self, entry):
+        # Each push gets a fresh version so older heap entries for the same listing are ignored.
+        self._counter += 1
+        entry["version"] = self._counter
+        heapq.heappush(self._heap, (self._priority(entry), self._counter, str(entry["listing_id"])))
+
+    def _pop(self):
+        while self._heap:
+            _, version, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry["version"] == version:
+                return entry
+        return None
+
+    # -- Quota --
+    def get_quota(self):
+        """
+        Reads the refresh limits and returns the remaining free and the used paid refreshes.
+
+        :return: A (free_remaining, paid_count) tuple.
+        """
+        limits = self.listings_api.get_refresh_limits()
+        if isinstance(limits.get("data"), dict):
+            limits = limits["data"]
+        free_limit = int(limits.get("free_limit", 0) or 0)
+        free_count = int(limits.get("free_count", 0) or 0)
+        paid_count = int(limits.get("paid_count", 0) or 0)
+        return max(free_limit - free_count, 0), paid_count
+
+    def seconds_until_day_end(self):
+        """
+        Returns the number of seconds left until local midnight, when the free quota resets.
+        """
+        now = datetime.fromtimestamp(self.clock())
+        midnight = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        return max((midnight - now).total_seconds(), 0.0)
+
+    def next_interval(self, free_remaining):
+        """
+        Computes how long to wait before the next refresh so the remaining free refreshes
+        are spread evenly over the rest of the day.
+
+        :param free_remaining: Number of free refreshes left today.
+        :return: Seconds to wait.
+        """
+        seconds_left = self.seconds_until_day_end()
+        if free_remaining <= 0:
+            return seconds_left
+        return seconds_left / free_remaining
+
+    # -- Worker --
+    def refresh_next(self):
+        """
+        Refreshes the highest ranked listing and puts it back into the queue.
+
+        :return: The refreshed listing ID, or None if the queue is empty.
+        """
+        entry = self._pop()
+        if entry is None:
+            return None
+        listing_id = entry["listing_id"]
+        try:
+            self.listings_api.refresh_listing(listing_id)
+        except Exception as e:
+            self.logger.warning("Refreshing listing %s failed: %s", listing_id, e)
+            self._push(entry)
+            self.save_state()
+            raise
+        entry["last_refreshed"] = self.clock()
+        entry["rounds"] = entry.get("rounds", 0) + 1
+        self._push(entry)
+        self.save_state()
+        self.logger.debug("Refreshed listing %s", listing_id)
+        return listing_id
+
+    def run_once(self):
+        """
+        Performs a single scheduling step: refreshes one listing if it is due and quota is
+        left, and returns the number of seconds to wait before the next step. Steps that run
+        before next_due (e.g. the hourly wake-ups of run_forever) refresh nothing.
+
+        :return: Seconds until the next step should run.
+        """
+        if not self._entries:
+            return self.seconds_until_day_end()
+
+        now = self.clock()
+        if self.next_due is not None and now < self.next_due:
+            return self.next_due - now
+
+        free_remaining, _ = self.get_quota()
+        if free_remaining <= 0 and not self.allow_paid:
+            self.logger.debug("Free refresh quota used up, waiting for the daily reset.")
+            return self.seconds_until_day_end()
+
+        self.refresh_next()
+        if free_remaining <= 0:
+            # Paid refreshes: cycle through the queue once over the rest of the day.
+            wait = self.next_interval(len(self._entries))
+        else:
+            wait = self.next_interval(free_remaining - 1)
+        self.next_due = now + wait
+        self.save_state()
+        return wait
+
+    def run_forever(self):
+        """
+        Runs the scheduler as a long-lived worker until stop() is called.
+        Failed refreshes are logged and retried on the next step.
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                wait = self.run_once()
+            except Exception as e:
+                self.logger.warning("Scheduler step failed: %s", e)
+                wait = 60
+            # Wake up at least once per hour so a new day is picked up promptly; run_once
+            # does not refresh before next_due.
+            self.sleep(min(max(wait, 1), 3600))
+
+    def stop(self):
+        """Signals run_forever() to exit after the current step."""
+        self._stop.set()
+
+    # -- Persistence --
+    def save_state(self):
+        """
+        Writes the queue to state_path atomically.
+        """
+        if not self.state_path:
+            return
+        state = {
+            "rank_by": self.rank_by,
+            "next_due": self.next_due,
+            "listings": [
+                {key: value for key, value in entry.items() if key != "version"}
+                for entry in self._entries.values()
+            ],
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def load_state(self):
+        """
+        Restores the queue from state_path if the file exists.
+        """
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.next_due = state.get("next_due")
+        for saved in state.get("listings", []):
+            entry = {"listing_id": saved["listing_id"], "last_refreshed": saved.get("last_refreshed", 0),
+                     "views": saved.get("views", 0), "score": saved.get("score", 0.0),
+                     "rounds": saved.get("rounds", 0)}
+            self._entries[str(entry["listing_id"])] = entry
+            self._push(entry)
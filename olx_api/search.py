@@ -1,6 +1,14 @@
 from olx_api.base import OLXBase
+from olx_api.pagination import ConsistentPaginator
 import requests
+import hashlib
+import json
 import math
+import os
+import threading
+
+# Sort order the incremental mode relies on (newest listings first).
+NEWEST_FIRST = {"sort_by": "date", "sort_order": "desc"}
 
 
 class Search(OLXBase):
@@ -84,16 +92,16 @@ class Search(OLXBase):
         response = requests.get(url, headers=self._get_headers(), params=params)
         return self._handle_response(response)
 
-    def search_all_listings(self, q, category_id=None, per_page=40, attr="", attr_encoded=1, extra_params=None,
-                            max_pages=None):
+    def iter_search_pages(self, q, category_id=None, per_page=40, attr="", attr_encoded=1, extra_params=None,
+                          max_pages=None, raise_errors=False):
         """
-        Retrieves all listings matching the search query by iterating through pages.
+        Yields the listings of a search one page at a time, so callers can process (store,
+        aggregate, ...) each page as it arrives instead of waiting for the whole crawl.
 
-        First, a request (using the provided per_page and extra_params) is made to determine the total
-        number of listings from meta information. The number of pages is determined using meta["last_page"]
-        (if available) or calculated as total/per_page. Optionally, a maximum number of pages (max_pages) can
-        be specified. If an error occurs on any page (e.g. a 429 or 500 error), the method prints the error
-        and returns the aggregated listings so far.
+        The first page's meta information determines the number of pages (meta["last_page"] if
+        available, otherwise total/per_page), optionally capped at max_pages. If an error occurs on
+        any page (e.g. a 429 or 500 error), the error is printed and iteration stops, or with
+        raise_errors=True it is raised, so callers can tell a cut-off crawl from a finished one.
 
         :param q: Search query string.
         :param category_id: (Optional) Category ID to filter the search.
@@ -102,16 +110,15 @@ class Search(OLXBase):
         :param attr_encoded: Flag for attribute encoding.
         :param extra_params: (Optional) A dict of extra URL parameters.
         :param max_pages: (Optional) Maximum number of pages to fetch.
-        :return: A flat list containing all listing dictionaries that match the query.
+        :param raise_errors: Raise errors on later pages instead of stopping quietly.
+        :return: A generator of lists of listing dictionaries, one list per page.
         """
-        initial = self.search_listings(q, category_id, page=1, per_page=per_page, attr=attr, attr_encoded=attr_encoded,
-                                       extra_params=extra_params)
-        meta = initial.get("meta", {})
+        response = self.search_listings(q, category_id, page=1, per_page=per_page, attr=attr,
+                                        attr_encoded=attr_encoded, extra_params=extra_params)
+        meta = response.get("meta", {})
         total = meta.get("total", 0)
-        listings = []
-
         if total == 0:
-            return listings
+            return
 
         pages_needed = meta.get("last_page", math.ceil(total / per_page))
         if max_pages is not None:
@@ -120,23 +127,178 @@ class Search(OLXBase):
         print(f"Total listings (meta): {total}. Fetching in {pages_needed} page(s) with {per_page} per request.")
 
         for page in range(1, pages_needed + 1):
-            try:
-                response = self.search_listings(q, category_id, page=page, per_page=per_page, attr=attr,
-                                                attr_encoded=attr_encoded, extra_params=extra_params)
-            except Exception as e:
-                print(f"Encountered error on page {page}: {e}. Returning aggregated listings so far.")
-                break
+            if page > 1:
+                try:
+                    response = self.search_listings(q, category_id, page=page, per_page=per_page, attr=attr,
+                                                    attr_encoded=attr_encoded, extra_params=extra_params)
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    print(f"Encountered error on page {page}: {e}. Stopping.")
+                    return
 
             data = response.get("data", [])
-            listings.extend(data)
             print(f"Fetched page {page}/{pages_needed}: {len(data)} listings.")
+            yield data
 
             if len(data) < per_page:
                 print("Received fewer items than requested; assuming end of results.")
-                break
+                return
 
+    def search_all_listings(self, q, category_id=None, per_page=40, attr="", attr_encoded=1, extra_params=None,
+                            max_pages=None, consistent=False):
+        """
+        Retrieves all listings matching the search query by iterating through pages.
+
+        Pages come from iter_search_pages: the number of pages is determined using meta["last_page"]
+        (if available) or calculated as total/per_page. Optionally, a maximum number of pages (max_pages) can
+        be specified. If an error occurs on any page (e.g. a 429 or 500 error), the method prints the error
+        and returns the aggregated listings so far.
+
+        :param q: Search query string.
+        :param category_id: (Optional) Category ID to filter the search.
+        :param per_page: Number of results per page (default is 40 - gives most consistent results).
+        :param attr: Additional attribute parameter.
+        :param attr_encoded: Flag for attribute encoding.
+        :param extra_params: (Optional) A dict of extra URL parameters.
+        :param max_pages: (Optional) Maximum number of pages to fetch.
+        :param consistent: If True, crawl with pagination.ConsistentPaginator instead: duplicates
+                           caused by results shifting between pages are dropped and shifted pages
+                           re-fetched.
+        :return: A flat list containing all listing dictionaries that match the query.
+        """
+        if consistent:
+            params = dict(extra_params or {}, attr=attr, attr_encoded=attr_encoded)
+            return ConsistentPaginator(self, per_page=per_page).crawl(q, category_id, params, max_pages)
+        listings = []
+        for data in self.iter_search_pages(q, category_id, per_page=per_page, attr=attr, attr_encoded=attr_encoded,
+                                           extra_params=extra_params, max_pages=max_pages):
+            listings.extend(data)
         return listings
 
+    _state_lock = threading.Lock()
+
+    @staticmethod
+    def search_key(q, category_id=None, attr="", attr_encoded=1, extra_params=None):
+        """
+        Returns a short stable key identifying a query together with its filters.
+        """
+        filters = {"q": q, "category_id": category_id, "attr": attr, "attr_encoded": attr_encoded,
+                   "extra_params": extra_params or {}}
+        return hashlib.sha256(json.dumps(filters, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+    def search_new_listings(self, q, category_id=None, per_page=40, attr="", attr_encoded=1, extra_params=None,
+                            state_path="search_state.json", resync_every=20, max_pages=None, max_known_ids=5000):
+        """
+        Returns only the listings that are new since the previous call with the same query and filters.
+
+        Results are requested newest first (NEWEST_FIRST, unless extra_params sets its own sort) and
+        the ids of the listings seen so far are kept per query+filters in state_path. Pages are
+        fetched until one contains an already seen (non-sponsored) listing, so a poll that finds five
+        new listings usually costs one request instead of a full crawl. The first run and every
+        resync_every-th run crawl all pages (up to max_pages) as a safety net; they also catch
+        listings that showed up late further down the results (e.g. an older listing reactivated).
+
+        Every resync forgets the seen ids that were in the range it read but are no longer listed.
+        At most max_known_ids ids are kept per query (the highest ones): anything below the lowest
+        kept id counts as seen, so the state file stays small even for queries with huge result sets.
+
+        :param q: Search query string.
+        :param category_id: (Optional) Category ID to filter the search.
+        :param per_page: Number of results per page.
+        :param attr: Additional attribute parameter.
+        :param attr_encoded: Flag for attribute encoding.
+        :param extra_params: (Optional) A dict of extra URL parameters.
+        :param state_path: JSON file holding the seen listing ids.
+        :param resync_every: Do a full crawl every N runs (0 or None disables periodic resyncs).
+        :param max_pages: (Optional) Maximum number of pages to fetch.
+        :param max_known_ids: Maximum number of seen ids kept per query.
+        :return: A list of the new listing dictionaries, newest first.
+        """
+        params = dict(NEWEST_FIRST)
+        params.update(extra_params or {})
+        key = self.search_key(q, category_id, attr, attr_encoded, params)
+        with self._state_lock:
+            state = self._load_search_state(state_path)
+        entry = state.get(key, {"q": q, "newest_id": None, "runs": 0})
+        known = set(entry.get("known_ids", ()))
+        # Entries saved before seen ids were kept only have the highest one; resync once to fill them in.
+        legacy = "known_ids" not in entry and entry["newest_id"] is not None
+        # Ids below this mark count as seen (the lowest kept id once max_known_ids was reached).
+        low_water = entry["newest_id"] + 1 if legacy else entry.get("low_water")
+        full = (entry["newest_id"] is None or legacy
+                or bool(resync_every and entry["runs"] % resync_every == 0))
+
+        new_listings, seen_ids, pages, read_all = [], set(), 0, True
+        # Lowest non-sponsored id read; sponsored listings are pinned to the top regardless of age.
+        read_down_to = None
+        try:
+            for data in self.iter_search_pages(q, category_id, per_page=per_page, attr=attr,
+                                               attr_encoded=attr_encoded, extra_params=params,
+                                               max_pages=max_pages, raise_errors=True):
+                pages += 1
+                read_all = len(data) < per_page or max_pages is None or pages < max_pages
+                reached_seen = False
+                for item in data:
+                    listing_id = item.get("id")
+                    if listing_id is None or listing_id in seen_ids:
+                        continue
+                    seen_ids.add(listing_id)
+                    if not item.get("sponsored"):
+                        read_down_to = listing_id if read_down_to is None else min(read_down_to, listing_id)
+                    if listing_id not in known and (low_water is None or listing_id >= low_water):
+                        new_listings.append(item)
+                    elif not item.get("sponsored"):
+                        reached_seen = True
+                if reached_seen and not full:
+                    break
+        except Exception as e:
+            if not pages:
+                raise
+            print(f"Encountered error on page {pages + 1}: {e}. Stopping.")
+            read_all = False
+
+        print(f"Incremental search '{q}': {len(new_listings)} new listing(s) in {pages} page(s)"
+              f"{' (full resync)' if full else ''}.")
+        if seen_ids:
+            newest = max(seen_ids)
+            entry["newest_id"] = newest if entry["newest_id"] is None else max(entry["newest_id"], newest)
+        if full and read_all:
+            # A resync that read every page replaces the ids, so listings that are gone are forgotten.
+            known = seen_ids
+        elif full and read_down_to is not None:
+            # A cut-off resync still covered every id down to the lowest one it read.
+            known = seen_ids | {listing_id for listing_id in known if listing_id < read_down_to}
+        else:
+            known = known | seen_ids
+        known = sorted(known)
+        if len(known) > max_known_ids:
+            known = known[-max_known_ids:]
+            entry["low_water"] = max(known[0], entry.get("low_water") or known[0])
+        entry["known_ids"] = known
+        entry["runs"] += 1
+        with self._state_lock:
+            state = self._load_search_state(state_path)
+            state[key] = entry
+            self._save_search_state(state_path, state)
+        return new_listings
+
+    @staticmethod
+    def _load_search_state(state_path):
+        if not state_path or not os.path.exists(state_path):
+            return {}
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_search_state(state_path, state):
+        if not state_path:
+            return
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
     def autosuggest(self, q, extra_params=None):
         """
         Retrieves autosuggest data for the given query.
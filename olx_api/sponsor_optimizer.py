@@ -0,0 +1,231 @@
+# olx_api/sponsor_optimizer.py
+import logging
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+SponsorPlan = namedtuple("SponsorPlan", ["selections", "total_cost", "total_value", "upper_bound"])
+
+logger = logging.getLogger("SponsorOptimizer")
+logger.addHandler(logging.NullHandler())
+
+
+class SponsorOptimizer:
+    """
+    Chooses sponsorship options for many listings under a fixed budget.
+
+    Each listing gets at most one option (a Quote from SponsorQuoteMatrix), which makes this a
+    multiple-choice knapsack problem. Two solvers are available:
+
+      - "greedy": drops dominated options, builds the upper convex hull of every listing's
+        cost/value curve and takes hull increments by decreasing value per unit cost. Runs in
+        O(n log n) over all options and also reports the LP upper bound, so the gap to the
+        optimum is known. Handles thousands of listings in milliseconds.
+      - "dp": exact dynamic programming over the budget discretised to `resolution`.
+        Cost grows with listings x options x budget units, so use it for small budgets.
+
+    Option values come from `values`, either a dict mapping listing_id to the value of one
+    sponsored day (the option value is then value * days), or a callable taking a Quote
+    and returning its value.
+
+    Usage Example:
+        >>> matrix = SponsorQuoteMatrix(Sponsored(token="your_valid_token"))
+        >>> quotes = [q for listing_id in listing_ids for q in matrix.get_quotes(listing_id)]
+        >>> optimizer = SponsorOptimizer(values={40: 12.5, 41: 3.0})
+        >>> plan = optimizer.optimize(quotes, budget=300)
+        >>> results = execute_plan(plan, Sponsored(token="your_valid_token"))
+    """
+
+    def __init__(self, values, method="greedy", resolution=1.0):
+        """
+        :param values: Dict of listing_id -> value per sponsored day, or a callable(quote) -> value.
+        :param method: "greedy" or "dp".
+        :param resolution: Budget unit used by the "dp" solver.
+        """
+        if method not in ("greedy", "dp"):
+            raise ValueError(f"method must be 'greedy' or 'dp', got {method!r}")
+        self.values = values
+        self.method = method
+        self.resolution = resolution
+
+    def option_value(self, quote):
+        """
+        Returns the estimated value of a single option.
+
+        :param quote: A Quote tuple.
+        :return: The value as a float.
+        """
+        return self._value_function()(quote)
+
+    def _value_function(self):
+        if callable(self.values):
+            return lambda quote: float(self.values(quote))
+        values = self.values
+        return lambda quote: values.get(quote.listing_id, 0.0) * quote.days
+
+    def optimize(self, quotes, budget):
+        """
+        Picks at most one option per listing maximising the total value within the budget.
+
+        :param quotes: Iterable of Quote tuples for any number of listings.
+        :param budget: Total amount that may be spent.
+        :return: A SponsorPlan with the chosen quotes, their total cost and value, and an upper
+                 bound on the achievable value.
+        """
+        value_of = self._value_function()
+        by_listing = defaultdict(list)
+        for quote in quotes:
+            value = value_of(quote)
+            if value > 0 and quote.total <= budget:
+                by_listing[quote.listing_id].append((quote.total, value, quote))
+
+        if self.method == "dp":
+            return self._solve_dp(by_listing, budget)
+        return self._solve_greedy(by_listing, budget)
+
+    def _solve_greedy(self, by_listing, budget):
+        hulls = {}
+        increments = []
+        for listing_id, options in by_listing.items():
+            hull = _upper_hull(options)
+            prev_cost, prev_value = 0.0, 0.0
+            for step, (cost, value, _) in enumerate(hull):
+                d_cost, d_value = cost - prev_cost, value - prev_value
+                efficiency = d_value / d_cost if d_cost > 0 else float("inf")
+                increments.append((-efficiency, listing_id, step, d_cost, d_value))
+                prev_cost, prev_value = cost, value
+            hulls[listing_id] = hull
+        increments.sort(key=lambda inc: inc[0])
+
+        chosen = {}
+        blocked = set()
+        remaining = budget
+        total_value = 0.0
+        upper_bound = None
+        for _, listing_id, step, d_cost, d_value in increments:
+            if listing_id in blocked or chosen.get(listing_id, -1) != step - 1:
+                continue
+            if d_cost <= remaining:
+                chosen[listing_id] = step
+                remaining -= d_cost
+                total_value += d_value
+            else:
+                if upper_bound is None:
+                    # The LP relaxation takes this increment fractionally; nothing better exists.
+                    upper_bound = total_value + d_value * (remaining / d_cost)
+                blocked.add(listing_id)
+        if upper_bound is None:
+            upper_bound = total_value
+
+        selections = {listing_id: hulls[listing_id][step] for listing_id, step in chosen.items()}
+
+        # Spend what is left: switch a listing to any option (hull or not) that still fits
+        # and adds value.
+        for listing_id, options in by_listing.items():
+            current_cost, current_value, _ = selections.get(listing_id, (0.0, 0.0, None))
+            best = None
+            for option in options:
+                if option[0] - current_cost <= remaining and option[1] > current_value:
+                    if best is None or option[1] > best[1]:
+                        best = option
+            if best is not None:
+                remaining -= best[0] - current_cost
+                selections[listing_id] = best
+        return self._plan(selections, upper_bound)
+
+    def _solve_dp(self, by_listing, budget):
+        units = int(budget / self.resolution)
+        best = [0.0] * (units + 1)
+        choices = []
+        for listing_id, options in by_listing.items():
+            new_best = best[:]
+            picked = [None] * (units + 1)
+            for option in options:
+                # Round costs up so the plan never exceeds the real budget.
+                weight = int(-(-option[0] // self.resolution))
+                value = option[1]
+                for b in range(units, weight - 1, -1):
+                    candidate = best[b - weight] + value
+                    if candidate > new_best[b]:
+                        new_best[b] = candidate
+                        picked[b] = (weight, option)
+            choices.append((listing_id, picked))
+            best = new_best
+
+        selections = {}
+        b = max(range(units + 1), key=lambda i: best[i])
+        for listing_id, picked in reversed(choices):
+            if picked[b] is not None:
+                weight, option = picked[b]
+                selections[listing_id] = option
+                b -= weight
+        return self._plan(selections, None)
+
+    @staticmethod
+    def _plan(selections, upper_bound):
+        chosen = list(selections.values())
+        total_cost = sum(cost for cost, _, _ in chosen)
+        total_value = sum(value for _, value, _ in chosen)
+        return SponsorPlan(
+            selections=[quote for _, _, quote in chosen],
+            total_cost=total_cost,
+            total_value=total_value,
+            upper_bound=upper_bound if upper_bound is not None else total_value,
+        )
+
+
+def _upper_hull(options):
+    """
+    Returns the options on the upper convex hull of the (cost, value) curve, sorted by cost.
+    Options that cost more but are worth no more than a cheaper one are dropped first.
+    """
+    options = sorted(options, key=lambda option: (option[0], -option[1]))
+    frontier = []
+    for option in options:
+        if not frontier or option[1] > frontier[-1][1]:
+            frontier.append(option)
+
+    hull = []
+    for option in frontier:
+        while hull:
+            prev_cost, prev_value = (hull[-2][0], hull[-2][1]) if len(hull) > 1 else (0.0, 0.0)
+            last_cost, last_value = hull[-1][0], hull[-1][1]
+            # Drop the last point if it lies under the line from its predecessor to the new option.
+            if (last_value - prev_value) * (option[0] - prev_cost) <= (option[1] - prev_value) * (last_cost - prev_cost):
+                hull.pop()
+            else:
+                break
+        hull.append(option)
+    return hull
+
+
+def execute_plan(plan, sponsored_api, discounts=None, max_workers=4):
+    """
+    Runs sponsor_listing for every selection of a plan concurrently, and optionally
+    discount_listing for the given listings.
+
+    :param plan: A SponsorPlan returned by SponsorOptimizer.optimize().
+    :param sponsored_api: A Sponsored instance.
+    :param discounts: (Optional) Dict of listing_id -> (price, days) passed to discount_listing.
+    :param max_workers: Number of concurrent requests.
+    :return: A list of (action, listing_id, response_or_exception) tuples.
+    """
+    jobs = [("sponsor", quote.listing_id,
+             lambda q=quote: sponsored_api.sponsor_listing(q.listing_id, q.sponsor_type, q.days,
+                                                           q.refresh_every, q.locations))
+            for quote in plan.selections]
+    for listing_id, (price, days) in (discounts or {}).items():
+        jobs.append(("discount", listing_id,
+                     lambda l=listing_id, p=price, d=days: sponsored_api.discount_listing(l, p, d)))
+
+    def run(job):
+        action, listing_id, call = job
+        try:
+            return action, listing_id, call()
+        except Exception as e:
+            logger.warning("%s for listing %s failed: %s", action, listing_id, e)
+            return action, listing_id, e
+
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, jobs))
@@ -0,0 +1,153 @@
+# olx_api/sponsor_quotes.py
+import itertools
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+Quote = namedtuple("Quote", ["listing_id", "sponsor_type", "days", "refresh_every", "locations", "total", "raw"])
+
+SPONSOR_TYPES = (0, 1, 2)
+SPONSOR_DAYS = (1, 2, 3, 5, 7, 14, 21, 30)
+REFRESH_INTERVALS = (0, 3, 6, 8, 24)
+LOCATION_SETS = (("homepage",),)
+
+
+class SponsorQuoteMatrix:
+    """
+    Fetches and caches sponsoring prices for every combination of sponsorship options.
+
+    Sponsored.get_sponsoring_price only prices one combination per call. This class fans the
+    sponsor_type x days x refresh_every x locations grid out over a thread pool, caches each
+    quote for ttl seconds and returns a compact table of Quote tuples.
+
+    Quotes are cached per listing by default. If the price of a sponsorship only depends on the
+    listing's price bracket, pass bracket_fn (mapping a listing price to a bracket key) and the
+    listing price, and quotes are shared between all listings in the same bracket.
+
+    Usage Example:
+        >>> sponsored = Sponsored(token="your_valid_token")
+        >>> matrix = SponsorQuoteMatrix(sponsored, ttl=1800)
+        >>> table = matrix.get_quotes(40, sponsor_types=(1, 2), days=(3, 7), refresh_every=(0, 24))
+        >>> cheapest = min(table, key=lambda quote: quote.total)
+    """
+
+    def __init__(self, sponsored_api, ttl=3600, max_workers=8, bracket_fn=None, clock=time.time):
+        """
+        :param sponsored_api: A Sponsored instance used to fetch prices.
+        :param ttl: Number of seconds a cached quote stays valid.
+        :param max_workers: Number of concurrent price requests.
+        :param bracket_fn: (Optional) Callable mapping a listing price to a price bracket key.
+        :param clock: Callable returning the current time (injectable for tests).
+        """
+        self.sponsored_api = sponsored_api
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.bracket_fn = bracket_fn
+        self.clock = clock
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def cache_key(self, listing_id, listing_price=None):
+        """
+        Returns the cache key quotes for a listing are stored under.
+
+        :param listing_id: ID of the listing.
+        :param listing_price: (Optional) Listing price, used when bracket_fn is set.
+        :return: A hashable key.
+        """
+        if self.bracket_fn is not None and listing_price is not None:
+            return ("bracket", self.bracket_fn(listing_price))
+        return ("listing", listing_id)
+
+    def get_quotes(self, listing_id, sponsor_types=SPONSOR_TYPES, days=SPONSOR_DAYS,
+                   refresh_every=REFRESH_INTERVALS, locations=LOCATION_SETS, listing_price=None):
+        """
+        Returns quotes for every combination of the given options, fetching missing or
+        expired ones concurrently. Combinations whose request fails are logged and left out.
+
+        :param listing_id: ID of the listing.
+        :param sponsor_types: Iterable of sponsoring types.
+        :param days: Iterable of durations in days.
+        :param refresh_every: Iterable of refresh intervals in hours.
+        :param locations: Iterable of location lists (e.g. [["homepage"], ["homepage", "category"]]).
+        :param listing_price: (Optional) Listing price, used when bracket_fn is set.
+        :return: A list of Quote tuples ordered like the option grid.
+        """
+        key = self.cache_key(listing_id, listing_price)
+        combos = [
+            (sponsor_type, day, refresh, tuple(location_set))
+            for sponsor_type, day, refresh, location_set
+            in itertools.product(sponsor_types, days, refresh_every, locations)
+        ]
+
+        now = self.clock()
+        quotes = {}
+        # Combinations to fetch, in grid order (dict keys: ordered, without duplicates).
+        missing = {}
+        with self._lock:
+            for combo in combos:
+                cached = self._cache.get((key, combo))
+                if cached is not None and cached[0] > now:
+                    quotes[combo] = cached[1]
+                else:
+                    missing[combo] = None
+
+        if missing:
+            for combo, raw in self._fetch_all(listing_id, list(missing)):
+                quotes[combo] = raw
+
+        expires = self.clock() + self.ttl
+        table = []
+        with self._lock:
+            for combo in combos:
+                raw = quotes.get(combo)
+                if raw is None:
+                    continue
+                if combo in missing:
+                    self._cache[(key, combo)] = (expires, raw)
+                sponsor_type, day, refresh, location_set = combo
+                table.append(Quote(listing_id, sponsor_type, day, refresh, list(location_set),
+                                   _quote_total(raw), raw))
+        return table
+
+    def _fetch_all(self, listing_id, combos):
+        def fetch(combo):
+            sponsor_type, day, refresh, location_set = combo
+            try:
+                return combo, self.sponsored_api.get_sponsoring_price(
+                    listing_id, sponsor_type, day, refresh, list(location_set))
+            except Exception as e:
+                self.logger.warning("Fetching sponsoring price %s for listing %s failed: %s", combo, listing_id, e)
+                return combo, None
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(combos))) as pool:
+            return list(pool.map(fetch, combos))
+
+    def invalidate(self, listing_id=None, listing_price=None):
+        """
+        Drops cached quotes for one listing (or bracket), or the whole cache if no listing is given.
+
+        :param listing_id: (Optional) ID of the listing.
+        :param listing_price: (Optional) Listing price, used when bracket_fn is set.
+        """
+        with self._lock:
+            if listing_id is None and listing_price is None:
+                self._cache.clear()
+                return
+            key = self.cache_key(listing_id, listing_price)
+            for cache_key in [k for k in self._cache if k[0] == key]:
+                del self._cache[cache_key]
+
+
+def _quote_total(raw):
+    # The price endpoint answers with {"search": ..., "refresh": ..., "total": ...}, possibly wrapped in "data".
+    if isinstance(raw.get("data"), dict):
+        raw = raw["data"]
+    try:
+        return float(raw.get("total", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
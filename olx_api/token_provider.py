@@ -0,0 +1,138 @@
+# olx_api/token_provider.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available.
+    fcntl = None
+
+
+class TokenProvider:
+    """
+    Shares one Bearer token between API instances, threads and processes.
+
+    The token is cached in a file only readable by the current user, so new processes reuse it
+    instead of logging in again. When a request comes back with 401, OLXBase asks the provider
+    to refresh: exactly one caller logs in again while concurrent callers wait on the lock and
+    then pick up the new token. A token refreshed by another process is picked up from the
+    cache file instead of logging in a second time.
+
+    Any API class accepts a provider in place of a plain token.
+
+    Usage Example:
+        >>> auth = OLXAuth(username="test@olx.ba", password="password", device_name="integration")
+        >>> provider = TokenProvider(auth)
+        >>> listings_api = Listings(token=provider)
+        >>> search_api = Search(token=provider)
+    """
+
+    def __init__(self, auth, cache_path=None):
+        """
+        :param auth: An OLXAuth instance used to log in when no valid token is available.
+        :param cache_path: (Optional) Path of the token cache file. Defaults to a per-account file
+                           in ~/.cache/olx_api.
+        """
+        self.auth = auth
+        self.cache_path = cache_path or self.default_cache_path(auth.username, auth.device_name)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+        self._token = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_cache_path(username, device_name):
+        """
+        Returns the default cache file path for an account.
+
+        :param username: The account username.
+        :param device_name: The device name used for login.
+        :return: A file path.
+        """
+        digest = hashlib.sha256(f"{username}|{device_name}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(os.path.expanduser("~"), ".cache", "olx_api", f"token-{digest}.json")
+
+    def get_token(self):
+        """
+        Returns the current token, loading it from the cache file or logging in if needed.
+
+        :return: The token as a string.
+        """
+        token = self._token
+        if token:
+            return token
+        return self.refresh()
+
+    def refresh(self, stale_token=None):
+        """
+        Obtains a new token after stale_token was rejected.
+
+        If another thread or process already replaced stale_token, that token is returned
+        without logging in again.
+
+        :param stale_token: The token that was rejected (None when no token is known yet).
+        :return: A valid token.
+        :raises: HTTPError if the login request fails.
+        """
+        with self._lock:
+            if self._token and self._token != stale_token:
+                return self._token
+            with self._file_lock():
+                cached = self._read_cache()
+                if cached and cached != stale_token:
+                    self.logger.debug("Using token from cache file %s", self.cache_path)
+                    self._token = cached
+                    self.auth.token = cached
+                    return cached
+                self.logger.debug("Logging in to obtain a new token.")
+                token = self.auth.login()
+                self._write_cache(token)
+                self._token = token
+                return token
+
+    def invalidate(self):
+        """Forgets the token in memory and removes the cache file."""
+        with self._lock:
+            self._token = None
+            try:
+                os.remove(self.cache_path)
+            except FileNotFoundError:
+                pass
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("token")
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, token):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "saved_at": int(time.time())}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd = os.open(f"{self.cache_path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
@@ -14,6 +14,19 @@ class Users(OLXBase):
         super().__init__(token)
         self.token = token
 
+    def get_me(self):
+        """
+        Retrieves the profile of the authenticated user.
+
+        GET /me
+
+        :return: JSON response from the API.
+        """
+        url = f"{self.BASE_URL}/me"
+        response = requests.get(url, headers=self._get_headers())
+        data = self._handle_response(response)
+        return data
+
     def get_active_listings(self, username, page=1):
         """
         Retrieves active listings for a given username.
@@ -0,0 +1,255 @@
+# Aggregate price history analytics, computed inside SQLite
+
+# pink_analytics.py
+#
+# Every function returns columns instead of rows: {"day": (...), "p50": (...), ...}.
+# A dashboard can hand the tuples straight to a plot (or numpy.asarray) without
+# materializing one Python object per listing.
+
+import time
+
+from pink_olx_app.pink_store import DEFAULT_DB, PinkStore
+
+DAY = 86400
+PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+GROUP_COLUMNS = ("city", "state")
+
+# Average of the middle one or two values of a partition numbered by ROW_NUMBER().
+MEDIAN = "AVG(CASE WHEN {rn} IN (({cnt} + 1) / 2, ({cnt} + 2) / 2) THEN {value} END)"
+
+
+def _columns(cursor):
+    """Turns a cursor's result into a dict of column name -> tuple of values."""
+    names = [description[0] for description in cursor.description]
+    rows = cursor.fetchall()
+    if not rows:
+        return {name: () for name in names}
+    return dict(zip(names, zip(*rows)))
+
+
+def _time_filter(column, since, until, params):
+    conditions = []
+    if since is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(int(since))
+    if until is not None:
+        conditions.append(f"{column} < ?")
+        params.append(int(until))
+    return "".join(f" AND {condition}" for condition in conditions)
+
+
+def _scope(query, params):
+    """
+    CTE 'scope' with one row per listing: first/last time a query returned it, and whether
+    it has disappeared (the latest search of its queries no longer returned it).
+    """
+    where = ""
+    if query is not None:
+        where = "WHERE ql.query_id = (SELECT id FROM queries WHERE query = ?)"
+        params.append(query)
+    return f"""
+        scope AS (
+            SELECT ql.listing_id, MIN(ql.first_seen) AS first_seen, MAX(ql.last_seen) AS last_seen,
+                   MAX(ql.last_seen) < MAX(latest.timestamp) AS gone
+            FROM query_listings ql
+            JOIN (SELECT query_id, MAX(timestamp) AS timestamp FROM searches GROUP BY query_id) latest
+              ON latest.query_id = ql.query_id
+            {where}
+            GROUP BY ql.listing_id
+        )"""
+
+
+def daily_price_percentiles(store, query, since=None, until=None, percentiles=PERCENTILES):
+    """
+    Price distribution per day on which `query` was searched: the listings the query returned
+    that day, each with its price at the end of the day.
+    Columns: day, listings, min_price, p10, p25, p50, p75, p90 (one per entry of
+    `percentiles`, nearest-rank), max_price.
+    """
+    params = [query]
+    time_filter = _time_filter("timestamp", since, until, params)
+    percentile_columns = "".join(
+        f", MIN(CASE WHEN rn >= {float(p)!r} * cnt THEN price END) AS p{round(p * 100):g}"
+        for p in percentiles
+    )
+    with store.lock:
+        cursor = store.conn.execute(f"""
+            WITH
+            q AS (SELECT id FROM queries WHERE query = ?),
+            days AS (
+                SELECT DISTINCT timestamp / {DAY} * {DAY} AS day FROM searches
+                WHERE query_id = (SELECT id FROM q){time_filter}
+            ),
+            history (listing_id, timestamp, price) AS (
+                SELECT listing_id, observed_at, price FROM price_observations
+                WHERE listing_id IN (SELECT listing_id FROM query_listings WHERE query_id = (SELECT id FROM q))
+                UNION ALL
+                SELECT listing_id, day, median_price FROM daily_listing_prices
+                WHERE listing_id IN (SELECT listing_id FROM query_listings WHERE query_id = (SELECT id FROM q))
+            ),
+            -- Each price is valid from its observation until the next one.
+            intervals AS (
+                SELECT listing_id, price, timestamp AS valid_from,
+                       LEAD(timestamp) OVER (PARTITION BY listing_id ORDER BY timestamp) AS valid_to
+                FROM history
+            ),
+            -- Days d on which a listing was returned and had that price at the end of the day.
+            spans AS (
+                SELECT i.price,
+                       MAX(i.valid_from, ql.first_seen) / {DAY} * {DAY} AS first_day,
+                       MIN(COALESCE(i.valid_to - {DAY}, ql.last_seen), ql.last_seen) AS last_day
+                FROM intervals i
+                JOIN query_listings ql ON ql.query_id = (SELECT id FROM q) AND ql.listing_id = i.listing_id
+                WHERE i.price > 0
+            ),
+            daily AS (
+                SELECT d.day, s.price,
+                       ROW_NUMBER() OVER w AS rn,
+                       COUNT(*) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS cnt
+                FROM spans s
+                CROSS JOIN days d
+                WHERE d.day BETWEEN s.first_day AND s.last_day
+                WINDOW w AS (PARTITION BY d.day ORDER BY s.price)
+            )
+            SELECT day, COUNT(*) AS listings, MIN(price) AS min_price{percentile_columns}, MAX(price) AS max_price
+            FROM daily
+            GROUP BY day
+            ORDER BY day
+        """, params)
+        return _columns(cursor)
+
+
+def listing_churn(store, query, since=None, until=None):
+    """
+    Per search day of `query`: how many listings appeared for the first time, how many were
+    returned for the last time (i.e. disappeared afterwards) and how many were active.
+    Columns: day, searches, result_count, new, disappeared, active.
+    """
+    params = [query]
+    time_filter = _time_filter("day", since, until, params)
+    with store.lock:
+        cursor = store.conn.execute(f"""
+            WITH
+            q AS (SELECT id FROM queries WHERE query = ?),
+            days AS (
+                SELECT timestamp / {DAY} * {DAY} AS day, COUNT(*) AS searches, MAX(result_count) AS result_count
+                FROM searches WHERE query_id = (SELECT id FROM q)
+                GROUP BY 1
+            ),
+            new AS (
+                SELECT first_seen / {DAY} * {DAY} AS day, COUNT(*) AS n
+                FROM query_listings WHERE query_id = (SELECT id FROM q)
+                GROUP BY 1
+            ),
+            gone AS (
+                SELECT last_seen / {DAY} * {DAY} AS day, COUNT(*) AS n
+                FROM query_listings
+                WHERE query_id = (SELECT id FROM q)
+                  AND last_seen < (SELECT MAX(timestamp) FROM searches WHERE query_id = (SELECT id FROM q))
+                GROUP BY 1
+            ),
+            churn AS (
+                SELECT d.day, d.searches, d.result_count,
+                       COALESCE(new.n, 0) AS new, COALESCE(gone.n, 0) AS disappeared,
+                       SUM(COALESCE(new.n, 0)) OVER w - SUM(COALESCE(gone.n, 0)) OVER w
+                           + COALESCE(gone.n, 0) AS active
+                FROM days d
+                LEFT JOIN new ON new.day = d.day
+                LEFT JOIN gone ON gone.day = d.day
+                WINDOW w AS (ORDER BY d.day)
+            )
+            SELECT day, searches, result_count, new, disappeared, active
+            FROM churn
+            WHERE true{time_filter}
+            ORDER BY day
+        """, params)
+        return _columns(cursor)
+
+
+def time_to_sell(store, query=None, since=None, by=None):
+    """
+    Days between a listing's first and last appearance, for listings that have disappeared
+    (presumably sold), optionally only those that disappeared since `since`.
+    `query` limits it to one query (None = all), `by` breaks it down per "city" or "state".
+    Columns: [city|state,] sold, median_days, p25_days, p75_days.
+    """
+    if by is not None and by not in GROUP_COLUMNS:
+        raise ValueError(f"by must be one of {GROUP_COLUMNS}, not {by!r}.")
+    params = []
+    scope = _scope(query, params)
+    time_filter = _time_filter("s.last_seen", since, None, params)
+    partition = f"PARTITION BY l.{by}" if by else ""
+    group_column = f"{by}, " if by else ""
+    with store.lock:
+        cursor = store.conn.execute(f"""
+            WITH {scope},
+            sold AS (
+                SELECT {f"l.{by}, " if by else ""}(s.last_seen - s.first_seen) * 1.0 / {DAY} AS days,
+                       ROW_NUMBER() OVER ({partition} ORDER BY s.last_seen - s.first_seen) AS rn,
+                       COUNT(*) OVER ({partition}) AS cnt
+                FROM scope s
+                JOIN listings l ON l.listing_id = s.listing_id
+                WHERE s.gone{time_filter}
+            )
+            SELECT {group_column}COUNT(*) AS sold,
+                   {MEDIAN.format(rn="rn", cnt="cnt", value="days")} AS median_days,
+                   MIN(CASE WHEN rn >= 0.25 * cnt THEN days END) AS p25_days,
+                   MIN(CASE WHEN rn >= 0.75 * cnt THEN days END) AS p75_days
+            FROM sold
+            {f"GROUP BY {by} ORDER BY sold DESC" if by else ""}
+        """, params)
+        return _columns(cursor)
+
+
+def city_breakdown(store, query=None, since=None):
+    """
+    Per city: listing counts and current prices of the listings `query` returned (None = all),
+    optionally only those seen since `since`.
+    Columns: city, listings, active, sold, min_price, median_price, max_price, median_days_to_sell.
+    """
+    params = []
+    scope = _scope(query, params)
+    time_filter = _time_filter("s.last_seen", since, None, params)
+    with store.lock:
+        cursor = store.conn.execute(f"""
+            WITH {scope},
+            ranked AS (
+                SELECT l.city, l.price, s.gone,
+                       CASE WHEN s.gone THEN (s.last_seen - s.first_seen) * 1.0 / {DAY} END AS days,
+                       ROW_NUMBER() OVER (PARTITION BY l.city ORDER BY l.price) AS price_rn,
+                       COUNT(*) OVER (PARTITION BY l.city) AS price_cnt,
+                       ROW_NUMBER() OVER (PARTITION BY l.city, s.gone ORDER BY s.last_seen - s.first_seen) AS days_rn,
+                       COUNT(*) OVER (PARTITION BY l.city, s.gone) AS days_cnt
+                FROM scope s
+                JOIN listings l ON l.listing_id = s.listing_id
+                WHERE true{time_filter}
+            )
+            SELECT city, COUNT(*) AS listings,
+                   SUM(NOT gone) AS active, SUM(gone) AS sold,
+                   MIN(price) AS min_price,
+                   {MEDIAN.format(rn="price_rn", cnt="price_cnt", value="price")} AS median_price,
+                   MAX(price) AS max_price,
+                   {MEDIAN.format(rn="days_rn", cnt="days_cnt", value="days")} AS median_days_to_sell
+            FROM ranked
+            GROUP BY city
+            ORDER BY listings DESC
+        """, params)
+        return _columns(cursor)
+
+
+def dashboard(query, days=90, db_name=DEFAULT_DB, now=None):
+    """
+    Everything a dashboard for one query needs, for the last `days` days.
+    """
+    now = time.time() if now is None else now
+    since = int(now) - days * DAY
+    store = PinkStore(db_name)
+    try:
+        return {
+            "percentiles": daily_price_percentiles(store, query, since=since),
+            "churn": listing_churn(store, query, since=since),
+            "time_to_sell": time_to_sell(store, query, since=since),
+            "cities": city_breakdown(store, query, since=since),
+        }
+    finally:
+        store.close()
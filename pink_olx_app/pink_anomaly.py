@@ -0,0 +1,202 @@
+# Price outlier / mispricing detection
+
+# pink_anomaly.py
+#
+# Listings are grouped (category, condition, optionally brand/model from the title) and each
+# price is compared with robust statistics of its group: median and MAD, plus the IQR fences.
+# Everything is computed with NumPy over a ListingFrame: one sort per statistic, no Python
+# loop per listing or per group.
+
+from collections import namedtuple
+
+import numpy as np
+
+from pink_olx_app.pink_olx_logic import ListingFrame
+
+GROUP_KEYS = ("category", "state", "city", "brand", "model")
+
+# 0.6745 = z-score of the 75th percentile: makes the MAD comparable to a standard deviation.
+MAD_SCALE = 0.6745
+# sqrt(pi / 2): the same for the mean absolute deviation, used when the MAD and the IQR are 0.
+MEAN_AD_SCALE = 1.2533
+
+# Per-row results; rows that were not scored (no price, group too small) have score NaN.
+Anomalies = namedtuple("Anomalies", ["score", "median", "mad", "q1", "q3", "group", "flag"])
+
+UNDERPRICED = -1
+OVERPRICED = 1
+
+
+def _title_words(item, words):
+    title = (item.get("title") or "").lower().split()
+    return " ".join(title[:words])
+
+
+def _group_codes(frame, group_by):
+    """Combines the requested per-row keys into one dense group code per row."""
+    columns = []
+    for key in group_by:
+        if key == "category":
+            columns.append(frame.category_code)
+        elif key == "state":
+            columns.append(frame.state_code)
+        elif key == "city":
+            columns.append(frame.city_code)
+        elif key in ("brand", "model"):
+            words = 1 if key == "brand" else 2
+            _, codes = frame._encode(_title_words(item, words) for item in frame.listings)
+            columns.append(codes)
+        else:
+            raise ValueError(f"Unknown group key {key!r}; expected one of {GROUP_KEYS}.")
+    if not columns:
+        return np.zeros(len(frame), dtype=np.int64)
+    # Mixed-radix combination of the codes, then renumbered densely.
+    combined = np.zeros(len(frame), dtype=np.int64)
+    for codes in columns:
+        combined = combined * (int(codes.max(initial=0)) + 1) + codes
+    _, groups = np.unique(combined, return_inverse=True)
+    return groups.reshape(-1)
+
+
+def _grouped_quantile(sorted_values, starts, counts, fraction):
+    """Linear-interpolated quantile of every group in values sorted by (group, value)."""
+    position = starts + fraction * np.maximum(counts - 1, 0)
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    weight = position - low
+    return sorted_values[low] * (1 - weight) + sorted_values[high] * weight
+
+
+def _group_stats(price, group):
+    """
+    Per-group count, median, MAD, quartiles and spread (robust standard deviation) of positive
+    prices with a group code each. Returns a tuple of arrays indexed by group code.
+    """
+    group_count = int(group.max()) + 1
+    counts = np.bincount(group, minlength=group_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    order = np.lexsort((price, group))
+    sorted_price = price[order]
+    median = np.full(group_count, np.nan)
+    q1, q3 = median.copy(), median.copy()
+    median[present] = _grouped_quantile(sorted_price, starts[present], counts[present], 0.5)
+    q1[present] = _grouped_quantile(sorted_price, starts[present], counts[present], 0.25)
+    q3[present] = _grouped_quantile(sorted_price, starts[present], counts[present], 0.75)
+
+    deviation = np.abs(price - median[group])
+    sorted_deviation = deviation[np.lexsort((deviation, group))]
+    mad = np.full(group_count, np.nan)
+    mad[present] = _grouped_quantile(sorted_deviation, starts[present], counts[present], 0.5)
+    mean_deviation = np.bincount(group, weights=deviation, minlength=group_count) / np.maximum(counts, 1)
+
+    # Groups where more than half the prices are equal have MAD 0; fall back to the IQR, and to
+    # the mean absolute deviation when even the quartiles are equal.
+    spread = np.where(mad > 0, mad / MAD_SCALE,
+                      np.where(q3 > q1, (q3 - q1) / 1.349, mean_deviation * MEAN_AD_SCALE))
+    return counts, median, mad, q1, q3, spread
+
+
+def score_prices(prices, groups, min_group_size=5):
+    """
+    Robust z-scores of prices within their groups.
+
+    :param prices: Float array of prices; prices <= 0 are ignored.
+    :param groups: Int array with a group code per price.
+    :param min_group_size: Groups with fewer priced rows are scored against all prices instead
+                           (no row is scored if there are fewer priced rows than that in total).
+    :return: Anomalies with per-row arrays; median, mad, q1 and q3 are those each row was scored against.
+    """
+    n = len(prices)
+    valid = prices > 0
+    rows = np.flatnonzero(valid)
+    nan = np.full(n, np.nan)
+    result = Anomalies(nan.copy(), nan.copy(), nan.copy(), nan.copy(), nan.copy(), groups,
+                       np.zeros(n, dtype=np.int8))
+    if not len(rows):
+        return result
+
+    price, group = prices[rows], groups[rows]
+    stats = _group_stats(price, group)
+    # Too few prices to judge a group on its own: its rows are compared with all prices, which
+    # are appended to the statistics as one more group.
+    small = stats[0][group] < min_group_size
+    if small.any() and len(rows) >= min_group_size:
+        overall = _group_stats(price, np.zeros(len(rows), dtype=np.int64))
+        group = np.where(small, len(stats[0]), group)
+        stats = tuple(np.append(per_group, everything) for per_group, everything in zip(stats, overall))
+    counts, median, mad, q1, q3, spread = stats
+
+    scored = (counts[group] >= min_group_size) & (spread[group] > 0)
+    score = np.full(len(rows), np.nan)
+    score[scored] = (price[scored] - median[group][scored]) / spread[group][scored]
+
+    result.score[rows] = score
+    result.median[rows] = median[group]
+    result.mad[rows] = mad[group]
+    result.q1[rows] = q1[group]
+    result.q3[rows] = q3[group]
+    return result
+
+
+def detect_anomalies(listings, group_by=("category", "state"), threshold=3.5, min_group_size=5):
+    """
+    Scores every listing against its group and flags mispriced ones.
+    A listing is flagged when its robust z-score is beyond +-threshold and it is also outside
+    the group's 1.5 * IQR fences.
+
+    :param listings: A ListingFrame, or a list of listing dicts.
+    :param group_by: Keys to group by, from GROUP_KEYS ("brand" / "model" are the first one / two
+                     words of the title).
+    :param threshold: Robust z-score beyond which a listing is flagged.
+    :param min_group_size: Groups with fewer priced listings are compared with all listings.
+    :return: Anomalies; flag is UNDERPRICED (-1), OVERPRICED (1) or 0 per row.
+    """
+    frame = listings if isinstance(listings, ListingFrame) else ListingFrame(listings)
+    result = score_prices(frame.price, _group_codes(frame, group_by), min_group_size)
+    iqr = result.q3 - result.q1
+    with np.errstate(invalid="ignore"):
+        low = (result.score <= -threshold) & (frame.price < result.q1 - 1.5 * iqr)
+        high = (result.score >= threshold) & (frame.price > result.q3 + 1.5 * iqr)
+    result.flag[low] = UNDERPRICED
+    result.flag[high] = OVERPRICED
+    return result
+
+
+def underpriced(listings, n=20, **kwargs):
+    """
+    Returns (rows, anomalies): row indices of the n most underpriced flagged listings, lowest
+    score first, and the full Anomalies. kwargs are passed to detect_anomalies.
+    """
+    result = detect_anomalies(listings, **kwargs)
+    rows = np.flatnonzero(result.flag == UNDERPRICED)
+    rows = rows[np.argsort(result.score[rows], kind="stable")][:n]
+    return rows, result
+
+
+def detect_store_anomalies(store, query=None, since=None, group_by=("state", "model"), **kwargs):
+    """
+    Runs detect_anomalies over listings stored by pink_store (their latest price), optionally
+    for one query and/or only listings seen since a timestamp. The store has no category, so
+    the default grouping is by condition and model.
+    Returns (frame, anomalies).
+    """
+    conditions, params = [], []
+    if query is not None:
+        conditions.append("l.listing_id IN (SELECT listing_id FROM query_listings "
+                          "WHERE query_id = (SELECT id FROM queries WHERE query = ?))")
+        params.append(query)
+    if since is not None:
+        conditions.append("l.last_seen >= ?")
+        params.append(int(since))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with store.lock:
+        rows = store.conn.execute(
+            f"SELECT l.listing_id, l.title, l.price, l.state, l.city FROM listings l {where}", params
+        ).fetchall()
+    frame = ListingFrame(
+        {"id": listing_id, "title": title, "price": price, "state": state, "location": {"city": city}}
+        for listing_id, title, price, state, city in rows
+    )
+    return frame, detect_anomalies(frame, group_by=group_by, **kwargs)
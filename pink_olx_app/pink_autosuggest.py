@@ -0,0 +1,247 @@
+# Autosuggest service: prefix-trie LRU cache + background fetching
+
+# pink_autosuggest.py
+#
+# Typing "iphone" asks for "ip", "iph", "ipho", ... in quick succession. Responses are cached
+# per normalized query (LRU with a TTL) and the cached queries are indexed in a prefix trie, so
+# a longer query can be answered at once by filtering the suggestions of its longest cached
+# prefix. Only the newest query is fetched; older ones still waiting are dropped and results of
+# superseded in-flight requests are cached but not delivered.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+_END = object()
+
+
+def normalize_query(query):
+    """Lowercases and collapses whitespace, so 'iPhone  13 ' and 'iphone 13' share a cache entry."""
+    return " ".join((query or "").lower().split())
+
+
+def is_valid_response(data):
+    """
+    True for an actual autosuggest answer (it has an autocomplete list, possibly empty). An empty
+    dict, e.g. what a rate-limited request comes back as, is not one.
+    """
+    return isinstance(data, dict) and isinstance(data.get("autocomplete"), list)
+
+
+def filter_suggestions(data, query):
+    """
+    Narrows an autosuggest response for a shorter prefix down to a longer query: keeps the
+    autocomplete strings and categories where some word starts with the query's last word and
+    that contain the rest of it.
+    """
+    query = normalize_query(query)
+    if not query:
+        return data
+    *head, last = query.split()
+
+    def matches(text):
+        text = normalize_query(text)
+        return all(word in text for word in head) and any(word.startswith(last) for word in text.split())
+
+    return {
+        "autocomplete": [text for text in data.get("autocomplete", []) if matches(text)],
+        "categories": [cat for cat in data.get("categories", []) if matches(cat.get("name", ""))],
+    }
+
+
+class SuggestionCache:
+    """
+    LRU cache of autosuggest responses with a time to live, plus a character trie over the
+    cached queries for longest-cached-prefix lookups.
+    """
+
+    def __init__(self, max_entries=256, ttl=600, clock=time.monotonic):
+        """
+        :param max_entries: Maximum number of cached queries.
+        :param ttl: Seconds a response stays valid.
+        :param clock: Callable returning the current time in seconds (injectable for tests).
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._trie = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _trie_add(self, key):
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_END] = True
+
+    def _trie_remove(self, key):
+        path, node = [], self._trie
+        for ch in key:
+            path.append((node, ch))
+            node = node[ch]
+        node.pop(_END, None)
+        # Prune branches that no longer lead to a cached query.
+        for parent, ch in reversed(path):
+            if parent[ch]:
+                break
+            del parent[ch]
+
+    def _fresh(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if now - stored_at > self.ttl:
+            del self._entries[key]
+            self._trie_remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def get(self, query):
+        """Returns the cached response for a query, or None if missing or expired."""
+        with self._lock:
+            return self._fresh(normalize_query(query), self.clock())
+
+    def put(self, query, data):
+        key = normalize_query(query)
+        with self._lock:
+            if key not in self._entries:
+                self._trie_add(key)
+            self._entries[key] = (self.clock(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._trie_remove(oldest)
+
+    def longest_prefix(self, query):
+        """
+        Returns (prefix, response) for the longest cached, unexpired query that is a prefix of
+        'query' (the query itself included), or (None, None).
+        """
+        key = normalize_query(query)
+        with self._lock:
+            now = self.clock()
+            node, prefixes = self._trie, []
+            for length, ch in enumerate(key, start=1):
+                node = node.get(ch)
+                if node is None:
+                    break
+                if _END in node:
+                    prefixes.append(key[:length])
+            for prefix in reversed(prefixes):
+                data = self._fresh(prefix, now)
+                if data is not None:
+                    return prefix, data
+        return None, None
+
+
+class AutosuggestService:
+    """
+    Answers autosuggest queries from the cache when it can and fetches on a background thread
+    otherwise.
+
+    request() returns immediately with (data, source):
+      - "cache": the exact query was cached.
+      - "prefix": a cached prefix returned fewer than full_size suggestions, so the API has no
+        more to offer; its filtered suggestions are the answer and nothing is fetched. Only
+        valid responses are cached, so an empty fallback never stands in for longer queries.
+      - "partial": filtered suggestions of a cached prefix (or None); a fetch was queued and
+        on_result(query, data) is called from the worker thread when it finishes, unless a newer
+        request arrived meanwhile.
+
+    Usage Example:
+        >>> service = AutosuggestService(search_api, on_result=lambda q, data: print(q, data))
+        >>> service.request("iph")
+        (None, 'partial')
+        >>> service.request("ipho")   # once "iph" is cached
+        ({'autocomplete': ['iphone 13', ...], 'categories': [...]}, 'partial')
+    """
+
+    def __init__(self, search_api=None, on_result=None, cache=None, full_size=10):
+        """
+        :param search_api: Search instance used for fetching (can be set later).
+        :param on_result: Callable(query, data) invoked from the worker thread with fresh responses.
+        :param cache: (Optional) SuggestionCache to use.
+        :param full_size: Number of autocomplete entries the API returns when it has more; a
+                          cached response with fewer is treated as complete for longer queries.
+        """
+        self.search_api = search_api
+        self.on_result = on_result
+        # An empty SuggestionCache is falsy (it has __len__), so test for None explicitly.
+        self.cache = cache if cache is not None else SuggestionCache()
+        self.full_size = full_size
+        self._generation = 0
+        self._pending = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+    def request(self, query):
+        """Returns (data, source) right away and queues a fetch if the cache can't answer."""
+        query = normalize_query(query)
+        with self._cond:
+            self._generation += 1
+            generation = self._generation
+
+        data = self.cache.get(query)
+        if data is not None:
+            return data, "cache"
+        prefix, prefix_data = self.cache.longest_prefix(query)
+        filtered = filter_suggestions(prefix_data, query) if prefix_data is not None else None
+        if is_valid_response(prefix_data) and len(prefix_data["autocomplete"]) < self.full_size:
+            self.cache.put(query, filtered)
+            return filtered, "prefix"
+
+        with self._cond:
+            # Only the newest query waits; anything queued before it is superseded.
+            self._pending = (generation, query)
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="Autosuggest", daemon=True)
+                self._thread.start()
+        return filtered, "partial"
+
+    def is_current(self, generation):
+        with self._cond:
+            return generation == self._generation
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, query = self._pending
+                self._pending = None
+
+            try:
+                data = self.search_api.autosuggest(query) if self.search_api else {}
+            except Exception as e:
+                self.logger.warning("Autosuggest for %r failed: %s", query, e)
+                continue
+            if is_valid_response(data):
+                self.cache.put(query, data)
+            else:
+                self.logger.warning("Autosuggest for %r returned no suggestion list; not cached.", query)
+            if self.is_current(generation) and self.on_result:
+                self.on_result(query, data)
+
+    def cancel(self):
+        """Drops the queued fetch and keeps any in-flight result from being delivered."""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
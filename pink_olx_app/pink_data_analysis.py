@@ -1,41 +1,122 @@
-# Data analysis functions (matplotlib, etc.)
+# Data analysis functions (NumPy histograms, matplotlib rendering)
 # pink_data_analysis.py
+#
+# Binning is plain NumPy and returns arrays, so crawlers and servers can compute price
+# distributions without matplotlib. Only the plot_* functions import matplotlib, on first use.
 
-import statistics
-import matplotlib.pyplot as plt
+from collections import namedtuple
 
-def plot_price_distribution(listings):
+import numpy as np
+
+from pink_olx_app.pink_stats import PriceStats
+
+BIN_METHODS = ("fixed", "log", "fd")
+
+# counts[i] listings have edges[i] <= price < edges[i + 1] (the last bin includes its right edge).
+Histogram = namedtuple("Histogram", ["counts", "edges", "method"])
+
+
+def _parse_price(item):
+    try:
+        return float(item.get("price", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _positive(prices):
+    """Drops zero, negative and non-finite prices (missing or "nan" / "inf" in the listing)."""
+    return prices[np.isfinite(prices) & (prices > 0)]
+
+
+def listing_prices(listings):
     """
-    Creates a simple histogram of listing prices using matplotlib.
-    Returns the matplotlib Figure object.
+    Returns the positive prices of listing dicts as a float64 array.
     """
-    prices = []
-    for item in listings:
-        try:
-            p = float(item.get("price", 0) or 0)
-            if p > 0:
-                prices.append(p)
-        except:
-            pass
-
-    if not prices:
-        # Return None or an empty figure if no valid prices
-        fig = plt.figure()
-        plt.title("No valid prices to plot")
-        return fig
+    return _positive(np.fromiter((_parse_price(item) for item in listings), dtype=np.float64))
+
+
+def bin_edges(prices, method="fixed", bins=10, max_bins=200):
+    """
+    Computes histogram bin edges for an array of prices.
+
+    :param prices: Array of positive prices.
+    :param method: "fixed" (bins equal-width bins), "log" (bins bins of equal width on a log
+                   scale, for long-tailed prices) or "fd" (Freedman–Diaconis: bin width from the
+                   interquartile range, at most max_bins bins).
+    :param bins: Number of bins for "fixed" and "log".
+    :param max_bins: Upper bound on the number of bins for "fd".
+    :return: Array of bin edges.
+    """
+    if method not in BIN_METHODS:
+        raise ValueError(f"method must be one of {BIN_METHODS}, not {method!r}.")
+    low, high = float(prices.min()), float(prices.max())
+    if method == "log" and low <= 0:
+        raise ValueError("Log bins need positive prices.")
+    if low == high:
+        return np.array([low, high + 1.0])
+    if method == "log":
+        return np.geomspace(low, high, bins + 1)
+    if method == "fd":
+        q25, q75 = np.percentile(prices, [25, 75])
+        width = 2 * (q75 - q25) / len(prices) ** (1 / 3)
+        if width > 0:
+            bins = int(np.clip(np.ceil((high - low) / width), 1, max_bins))
+    return np.linspace(low, high, bins + 1)
+
+
+def price_histogram(prices, method="fixed", bins=10):
+    """
+    Bins prices (an array, or listing dicts) into a Histogram of counts and edges.
+    Only positive prices are counted; returns None if there are none.
+    """
+    if isinstance(prices, np.ndarray):
+        prices = _positive(prices.astype(np.float64, copy=False))
+    else:
+        prices = listing_prices(prices)
+    if not len(prices):
+        return None
+    edges = bin_edges(prices, method, bins)
+    counts, edges = np.histogram(prices, bins=edges)
+    return Histogram(counts, edges, method)
+
+
+# -- Rendering --
+def plot_histogram(histogram, stats=None, title="Price Distribution"):
+    """
+    Draws a precomputed Histogram with matplotlib. Returns the matplotlib Figure object.
+    """
+    import matplotlib.pyplot as plt
 
     fig = plt.figure()
-    plt.hist(prices, bins=10, color='pink', edgecolor='red')
-    plt.title("Price Distribution")
+    plt.stairs(histogram.counts, histogram.edges, fill=True, color='pink', edgecolor='red')
+    if histogram.method == "log":
+        plt.xscale("log")
+    plt.title(title)
     plt.xlabel("Price")
     plt.ylabel("Frequency")
 
-    # Stats in text
-    min_p = min(prices)
-    max_p = max(prices)
-    avg_p = statistics.mean(prices)
-    text_str = f"Count: {len(prices)}\nMin: {min_p}\nMax: {max_p}\nAvg: {avg_p:.2f}"
-    plt.text(0.95, 0.95, text_str, transform=plt.gca().transAxes,
-             ha='right', va='top', bbox=dict(boxstyle="round", fc="white", alpha=0.8))
-
+    if stats is not None and stats.count:
+        text_str = (f"Count: {stats.count}\nMin: {stats.min}\nMax: {stats.max}\nAvg: {stats.mean:.2f}"
+                    f"\nMedian: {stats.median:.2f}")
+        plt.text(0.95, 0.95, text_str, transform=plt.gca().transAxes,
+                 ha='right', va='top', bbox=dict(boxstyle="round", fc="white", alpha=0.8))
     return fig
+
+
+def plot_price_distribution(listings, method="fixed", bins=10):
+    """
+    Creates a simple histogram of listing prices using matplotlib.
+    Returns the matplotlib Figure object.
+    """
+    prices = listing_prices(listings)
+    histogram = price_histogram(prices, method, bins)
+    if histogram is None:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure()
+        plt.title("No valid prices to plot")
+        return fig
+
+    stats = PriceStats()
+    stats.update(prices)
+    return plot_histogram(histogram, stats)
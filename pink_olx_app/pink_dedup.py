@@ -0,0 +1,189 @@
+# Near-duplicate (reposted) listing detection with MinHash and LSH
+
+# pink_dedup.py
+#
+# Each listing's title (+ description) is cut into character shingles and summarized by a
+# MinHash signature. Signatures are split into LSH bands; listings sharing a band bucket are
+# candidates, and candidates whose estimated Jaccard similarity (and price) match are joined
+# with union-find. Adding a listing only looks at its own buckets, so indexing n listings is
+# roughly linear instead of comparing all pairs.
+
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_text(text):
+    """Lowercases, strips diacritics and collapses punctuation/whitespace to single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def shingles(text, size=4):
+    """
+    Returns the set of character shingles of a normalized text, hashed to 32-bit ints.
+    Texts shorter than one shingle yield a single shingle of the whole text.
+    """
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))} if text else set()
+    return {zlib.crc32(text[i:i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+
+
+class DedupIndex:
+    """
+    Incremental near-duplicate index over listings.
+
+    Every listing gets a cluster id: the smallest listing id among the listings it was matched
+    with (directly or through others), so ids are stable across runs for the same data.
+
+    Usage Example:
+        >>> index = DedupIndex()
+        >>> for page in search_api.iter_search_pages(q="iphone 13"):
+        ...     index.add_listings(page)
+        >>> index.annotate(listings)      # sets item["cluster_id"]
+        >>> index.cluster_count()
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.6, price_tolerance=0.1, shingle_size=4, seed=1):
+        """
+        :param num_perm: Number of MinHash permutations (signature length).
+        :param bands: Number of LSH bands; num_perm must be divisible by it. With rows = num_perm /
+                      bands, pairs above a similarity of about (1 / bands) ** (1 / rows) become candidates.
+        :param threshold: Minimum estimated Jaccard similarity for a candidate to be a duplicate.
+        :param price_tolerance: Maximum relative price difference for duplicates (None = ignore price).
+                                Different sellers often use the same title; reposts keep the price.
+        :param shingle_size: Characters per shingle.
+        :param seed: Seed for the hash permutations.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.price_tolerance = price_tolerance
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: ((a * x + b) mod 2**64) >> 32, with odd a.
+        self._a = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._buckets = {}
+        self._signatures = {}
+        self._prices = {}
+        self._parent = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, listing_id):
+        return listing_id in self._signatures
+
+    # -- Signatures --
+    def signature(self, text):
+        """Returns the MinHash signature (uint64 array of num_perm values) of a text."""
+        hashed = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        if not len(hashed):
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        permuted = (self._a[:, None] * hashed[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def similarity(self, first_id, second_id):
+        """Estimated Jaccard similarity of two indexed listings."""
+        return float(np.mean(self._signatures[first_id] == self._signatures[second_id]))
+
+    # -- Union-find --
+    def _find(self, listing_id):
+        root = listing_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[listing_id] != root:
+            self._parent[listing_id], listing_id = root, self._parent[listing_id]
+        return root
+
+    def _union(self, first_id, second_id):
+        first_root, second_root = self._find(first_id), self._find(second_id)
+        if first_root != second_root:
+            low, high = sorted((first_root, second_root))
+            self._parent[high] = low
+
+    def _prices_match(self, first_id, second_id):
+        if self.price_tolerance is None:
+            return True
+        first, second = self._prices[first_id], self._prices[second_id]
+        if not first or not second:
+            return first == second
+        return abs(first - second) <= self.price_tolerance * max(first, second)
+
+    # -- Indexing --
+    def add(self, listing_id, text, price=None):
+        """
+        Indexes one listing and links it to its near-duplicates. Re-adding a known id is a no-op.
+        Returns its cluster id.
+        """
+        if listing_id in self._signatures:
+            return self._find(listing_id)
+        signature = self.signature(text)
+        self._signatures[listing_id] = signature
+        self._prices[listing_id] = price
+        self._parent[listing_id] = listing_id
+
+        candidates = set()
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            bucket = self._buckets.setdefault(key, [])
+            candidates.update(bucket)
+            bucket.append(listing_id)
+        for other_id in candidates:
+            if (self._find(other_id) != self._find(listing_id)
+                    and self._prices_match(listing_id, other_id)
+                    and self.similarity(listing_id, other_id) >= self.threshold):
+                self._union(listing_id, other_id)
+        return self._find(listing_id)
+
+    def add_listings(self, listings):
+        """
+        Indexes listing dicts (e.g. one page of search results) by title + description and price.
+        Returns their cluster ids, in order (None for listings without an id, which are skipped).
+        """
+        cluster_ids = []
+        for item in listings:
+            if item.get("id") is None:
+                cluster_ids.append(None)
+                continue
+            text = f"{item.get('title') or ''} {item.get('description') or ''}"
+            try:
+                price = float(item.get("price", 0) or 0)
+            except (TypeError, ValueError):
+                price = 0.0
+            cluster_ids.append(self.add(item.get("id"), text, price))
+        return cluster_ids
+
+    def cluster_id(self, listing_id):
+        """Current cluster id of an indexed listing (clusters can merge as listings are added)."""
+        return self._find(listing_id)
+
+    def annotate(self, listings):
+        """
+        Sets item["cluster_id"] on indexed listing dicts to their current cluster id, for
+        ListingFrame, PriceStats and pink_store. Unindexed listings are left alone.
+        """
+        for item in listings:
+            if item.get("id") in self._parent:
+                item["cluster_id"] = self._find(item["id"])
+        return listings
+
+    def clusters(self, min_size=2):
+        """Returns {cluster_id: [listing ids]} for clusters with at least min_size listings."""
+        members = {}
+        for listing_id in self._parent:
+            members.setdefault(self._find(listing_id), []).append(listing_id)
+        return {root: ids for root, ids in members.items() if len(ids) >= min_size}
+
+    def cluster_count(self):
+        return sum(1 for listing_id in self._parent if self._find(listing_id) == listing_id)
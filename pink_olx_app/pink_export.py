@@ -0,0 +1,239 @@
+# Columnar (Parquet / Arrow IPC) export of search results and stored history
+
+# pink_export.py
+#
+# Rows are buffered column by column and written one row group (Parquet) or record
+# batch (Arrow IPC / Feather) at a time, so memory stays bounded by batch_rows no matter
+# how large the crawl or the history DB is. pyarrow is only imported when exporting.
+#
+#   python -m pink_olx_app.pink_export history.parquet --db pink_olx_data.db --query iphone
+
+import argparse
+import sqlite3
+import time
+
+from pink_olx_app.pink_store import DEFAULT_DB
+
+FORMATS = ("parquet", "feather")
+BATCH_ROWS = 65536
+
+# Flattened listing columns: (name, arrow type name).
+LISTING_COLUMNS = (
+    ("listing_id", "int64"),
+    ("title", "string"),
+    ("price", "float64"),
+    ("display_price", "string"),
+    ("state", "string"),
+    ("city", "string"),
+    ("city_id", "int64"),
+    ("latitude", "float64"),
+    ("longitude", "float64"),
+    ("category_id", "int64"),
+    ("sponsored", "int64"),
+    ("listed_at", "timestamp"),
+    ("query", "string"),
+    ("crawled_at", "timestamp"),
+)
+
+HISTORY_COLUMNS = (
+    ("listing_id", "int64"),
+    ("title", "string"),
+    ("price", "float64"),
+    ("state", "string"),
+    ("city", "string"),
+    ("query", "string"),
+    ("observed_at", "timestamp"),
+)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Exporting to Parquet/Arrow needs pyarrow (pip install pyarrow).")
+    return pyarrow
+
+
+def _schema(pa, columns):
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("s"),
+    }
+    return pa.schema([(name, types[type_name]) for name, type_name in columns])
+
+
+def _number(value, cast=float):
+    try:
+        return cast(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _flatten(item, query, crawled_at):
+    """Turns one API listing dict into a row matching LISTING_COLUMNS."""
+    location = item.get("location")
+    if not isinstance(location, dict):
+        location = {}
+    return (
+        _number(item.get("id"), int),
+        item.get("title"),
+        _number(item.get("price")),
+        item.get("display_price"),
+        item.get("state"),
+        location.get("city"),
+        _number(location.get("city_id"), int),
+        _number(location.get("lat")),
+        _number(location.get("lon")),
+        _number(item.get("category_id"), int),
+        _number(item.get("sponsored"), int),
+        _number(item.get("date") or item.get("created_at"), int),
+        query,
+        crawled_at,
+    )
+
+
+class ColumnarWriter:
+    """
+    Writes rows to a Parquet or Arrow IPC (Feather v2) file in batches of batch_rows.
+
+    Usage Example:
+        >>> with ColumnarWriter("crawl.parquet", LISTING_COLUMNS) as writer:
+        ...     for row in rows:
+        ...         writer.write_row(row)
+    """
+
+    def __init__(self, path, columns, file_format=None, batch_rows=BATCH_ROWS, compression="zstd"):
+        """
+        :param path: Output file.
+        :param columns: Sequence of (name, type) pairs, e.g. LISTING_COLUMNS.
+        :param file_format: "parquet" or "feather"; guessed from the file extension if omitted.
+        :param batch_rows: Rows per row group / record batch.
+        :param compression: Codec for both formats (zstd, lz4, snappy (Parquet only) or None).
+        """
+        if file_format is None:
+            file_format = "feather" if path.endswith((".feather", ".arrow", ".ipc")) else "parquet"
+        if file_format not in FORMATS:
+            raise ValueError(f"file_format must be one of {FORMATS}, not {file_format!r}.")
+        self.pa = _pyarrow()
+        self.path = path
+        self.file_format = file_format
+        self.schema = _schema(self.pa, columns)
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._buffer = [[] for _ in columns]
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        else:
+            import pyarrow.ipc as ipc
+            options = ipc.IpcWriteOptions(compression=compression)
+            self._writer = ipc.new_file(path, self.schema, options=options)
+
+    def write_row(self, row):
+        for column, value in zip(self._buffer, row):
+            column.append(value)
+        if len(self._buffer[0]) >= self.batch_rows:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        """Writes the buffered rows as one row group / record batch."""
+        if not self._buffer[0]:
+            return
+        arrays = [self.pa.array(column, type=field.type) for column, field in zip(self._buffer, self.schema)]
+        batch = self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self.file_format == "parquet":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+        self.rows_written += batch.num_rows
+        self._buffer = [[] for _ in self.schema]
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_listings(listings, path, query=None, crawled_at=None, file_format=None, batch_rows=BATCH_ROWS):
+    """
+    Exports API listing dicts (a list, or any iterable such as a page generator) to Parquet
+    or Arrow IPC. Returns the number of exported rows.
+    """
+    crawled_at = int(time.time()) if crawled_at is None else int(crawled_at)
+    with ColumnarWriter(path, LISTING_COLUMNS, file_format, batch_rows) as writer:
+        for item in listings:
+            writer.write_row(_flatten(item, query, crawled_at))
+    return writer.rows_written
+
+
+def export_history(path, query=None, since=None, db_name=DEFAULT_DB, file_format=None, batch_rows=BATCH_ROWS):
+    """
+    Exports the stored price history (every observation and daily rollup, per query) to
+    Parquet or Arrow IPC, optionally only for one query and/or since a timestamp.
+    Reads through its own connection in fetchmany() batches, so the app keeps writing
+    while a large export runs. Returns the number of exported rows.
+    """
+    conditions, params = [], []
+    if query is not None:
+        conditions.append("q.query = ?")
+        params.append(query)
+    if since is not None:
+        conditions.append("h.timestamp >= ?")
+        params.append(int(since))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = sqlite3.connect(db_name)
+    try:
+        cursor = conn.execute(f"""
+            WITH history (listing_id, price, timestamp) AS (
+                SELECT listing_id, price, observed_at FROM price_observations
+                UNION ALL
+                SELECT listing_id, median_price, day FROM daily_listing_prices
+            )
+            SELECT l.listing_id, l.title, h.price, l.state, l.city, q.query, h.timestamp
+            FROM queries q
+            JOIN query_listings ql ON ql.query_id = q.id
+            JOIN listings l ON l.listing_id = ql.listing_id
+            JOIN history h ON h.listing_id = ql.listing_id
+            {where}
+        """, params)
+        with ColumnarWriter(path, HISTORY_COLUMNS, file_format, batch_rows) as writer:
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                writer.write_rows(rows)
+        return writer.rows_written
+    finally:
+        conn.close()
+
+
+def main():
+    """Command line entry point; exports the history DB."""
+    parser = argparse.ArgumentParser(description="Export the Pink OLX history DB to Parquet or Arrow IPC.")
+    parser.add_argument("path")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--query", default=None)
+    parser.add_argument("--since", type=int, default=None, help="Unix timestamp.")
+    parser.add_argument("--format", choices=FORMATS, default=None)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = export_history(args.path, args.query, args.since, args.db, args.format, args.batch_rows)
+    print(f"[Export] {rows} rows to {args.path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# Retention, rollups and compaction for the local history DB
+
+# pink_maintenance.py
+#
+# Run once, or every --interval seconds:
+#   python -m pink_olx_app.pink_maintenance --db pink_olx_data.db --interval 86400
+
+import argparse
+import time
+
+from pink_olx_app.pink_store import DEFAULT_DB, PinkStore
+
+DAY = 86400
+
+
+def _day_start(timestamp):
+    return int(timestamp) // DAY * DAY
+
+
+def _get_state(conn, key, default=0):
+    row = conn.execute("SELECT value FROM maintenance_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_state(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO maintenance_state (key, value) VALUES (?, ?)", (key, value))
+
+
+def rollup_daily(store, older_than_days=30, now=None):
+    """
+    Downsamples price observations older than `older_than_days` into daily rollups
+    (min/max/median/count) per query, and per listing for days on which a listing has more
+    than one observation. Those observations are then replaced by their rollup row; single
+    observations stay as they are, since a rollup row would not be smaller.
+    The latest observation of every listing is always kept, so its current price is never lost;
+    it is left out of the listing's rollup, so history never counts it twice.
+    Only whole days are rolled up, and each day only once.
+    Returns the number of deleted observations.
+    """
+    now = time.time() if now is None else now
+    cutoff = _day_start(now - older_than_days * DAY)
+    with store.transaction() as conn:
+        start = _get_state(conn, "rolled_up_until")
+        if start >= cutoff:
+            return 0
+
+        # Median = average of the middle one or two values of each partition.
+        # (The unary + keeps SQLite on the primary key instead of the observed_at index.)
+        conn.execute("""
+            INSERT OR REPLACE INTO daily_query_prices
+                (query_id, day, min_price, max_price, median_price, observations)
+            SELECT query_id, day, MIN(price), MAX(price),
+                   AVG(CASE WHEN rn IN ((cnt + 1) / 2, (cnt + 2) / 2) THEN price END), cnt
+            FROM (
+                SELECT ql.query_id, o.observed_at / ?3 * ?3 AS day, o.price,
+                       ROW_NUMBER() OVER w AS rn,
+                       COUNT(*) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS cnt
+                FROM price_observations o
+                JOIN query_listings ql ON ql.listing_id = o.listing_id
+                WHERE +o.observed_at >= ?1 AND +o.observed_at < ?2
+                WINDOW w AS (PARTITION BY ql.query_id, o.observed_at / ?3 ORDER BY o.price)
+            )
+            GROUP BY query_id, day
+        """, (start, cutoff, DAY))
+
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS busy_days (listing_id INTEGER, day INTEGER, "
+                     "PRIMARY KEY (listing_id, day)) WITHOUT ROWID")
+        conn.execute("DELETE FROM temp.busy_days")
+        conn.execute("""
+            INSERT INTO temp.busy_days (listing_id, day)
+            SELECT listing_id, observed_at / ?3 * ?3 FROM price_observations
+            WHERE +observed_at >= ?1 AND +observed_at < ?2
+              AND observed_at < (SELECT MAX(p.observed_at) FROM price_observations p
+                                 WHERE p.listing_id = price_observations.listing_id)
+            GROUP BY listing_id, observed_at / ?3
+            HAVING COUNT(*) > 1
+        """, (start, cutoff, DAY))
+        conn.execute("""
+            INSERT OR REPLACE INTO daily_listing_prices
+                (listing_id, day, min_price, max_price, median_price, observations)
+            SELECT listing_id, day, MIN(price), MAX(price),
+                   AVG(CASE WHEN rn IN ((cnt + 1) / 2, (cnt + 2) / 2) THEN price END), cnt
+            FROM (
+                SELECT o.listing_id, b.day, o.price,
+                       ROW_NUMBER() OVER w AS rn,
+                       COUNT(*) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS cnt
+                FROM temp.busy_days b
+                JOIN price_observations o
+                  ON o.listing_id = b.listing_id AND o.observed_at >= b.day AND o.observed_at < b.day + ?1
+                WHERE o.observed_at < (SELECT MAX(p.observed_at) FROM price_observations p
+                                       WHERE p.listing_id = o.listing_id)
+                WINDOW w AS (PARTITION BY o.listing_id, b.day ORDER BY o.price)
+            )
+            GROUP BY listing_id, day
+        """, (DAY,))
+        deleted = conn.execute("""
+            DELETE FROM price_observations
+            WHERE EXISTS (SELECT 1 FROM temp.busy_days b
+                          WHERE b.listing_id = price_observations.listing_id
+                            AND b.day = price_observations.observed_at / ?1 * ?1)
+              AND observed_at < (SELECT MAX(p.observed_at) FROM price_observations p
+                                 WHERE p.listing_id = price_observations.listing_id)
+        """, (DAY,)).rowcount
+        conn.execute("DELETE FROM temp.busy_days")
+        _set_state(conn, "rolled_up_until", cutoff)
+    return deleted
+
+
+def dedupe_observations(store):
+    """
+    Deletes observations that repeat the previous price of the same listing, keeping the
+    first observation of each run. Returns the number of deleted rows.
+    """
+    with store.transaction() as conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS repeats (listing_id INTEGER, observed_at INTEGER, "
+                     "PRIMARY KEY (listing_id, observed_at)) WITHOUT ROWID")
+        conn.execute("DELETE FROM temp.repeats")
+        conn.execute("""
+            INSERT INTO temp.repeats (listing_id, observed_at)
+            SELECT listing_id, observed_at FROM (
+                SELECT listing_id, observed_at, price,
+                       LAG(price) OVER w AS prev_price,
+                       ROW_NUMBER() OVER w AS rn
+                FROM price_observations
+                WINDOW w AS (PARTITION BY listing_id ORDER BY observed_at)
+            )
+            WHERE rn > 1 AND price IS prev_price
+        """)
+        deleted = conn.execute("""
+            DELETE FROM price_observations
+            WHERE EXISTS (SELECT 1 FROM temp.repeats r
+                          WHERE r.listing_id = price_observations.listing_id
+                            AND r.observed_at = price_observations.observed_at)
+        """).rowcount
+        conn.execute("DELETE FROM temp.repeats")
+    return deleted
+
+
+def apply_retention(store, retention_days=365, rollup_retention_days=None, now=None):
+    """
+    Deletes data older than `retention_days`: listings not seen since then (with their
+    observations and query links), old searches and old observations (except the latest one
+    of each listing). Daily rollups are kept unless `rollup_retention_days` is set.
+    Returns a dict of deleted row counts per table.
+    """
+    now = time.time() if now is None else now
+    cutoff = int(now - retention_days * DAY)
+    deleted = {}
+    with store.transaction() as conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS expired (listing_id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.expired")
+        conn.execute("INSERT INTO temp.expired SELECT listing_id FROM listings WHERE last_seen < ?", (cutoff,))
+        deleted["query_listings"] = conn.execute(
+            "DELETE FROM query_listings WHERE listing_id IN (SELECT listing_id FROM temp.expired)").rowcount
+        deleted["listings"] = conn.execute(
+            "DELETE FROM listings WHERE listing_id IN (SELECT listing_id FROM temp.expired)").rowcount
+        deleted["price_observations"] = conn.execute(
+            "DELETE FROM price_observations WHERE listing_id IN (SELECT listing_id FROM temp.expired)").rowcount
+        deleted["daily_listing_prices"] = conn.execute(
+            "DELETE FROM daily_listing_prices WHERE listing_id IN (SELECT listing_id FROM temp.expired)").rowcount
+        deleted["price_observations"] += conn.execute("""
+            DELETE FROM price_observations
+            WHERE observed_at < ?
+              AND observed_at < (SELECT MAX(p.observed_at) FROM price_observations p
+                                 WHERE p.listing_id = price_observations.listing_id)
+        """, (cutoff,)).rowcount
+        deleted["searches"] = conn.execute("DELETE FROM searches WHERE timestamp < ?", (cutoff,)).rowcount
+        conn.execute("DELETE FROM temp.expired")
+
+        if rollup_retention_days is not None:
+            rollup_cutoff = _day_start(now - rollup_retention_days * DAY)
+            deleted["daily_listing_prices"] += conn.execute(
+                "DELETE FROM daily_listing_prices WHERE day < ?", (rollup_cutoff,)).rowcount
+            deleted["daily_query_prices"] = conn.execute(
+                "DELETE FROM daily_query_prices WHERE day < ?", (rollup_cutoff,)).rowcount
+    return deleted
+
+
+def incremental_vacuum(store, pages=None):
+    """
+    Returns free pages to the file system with PRAGMA incremental_vacuum and truncates the WAL.
+    Databases created before auto_vacuum=INCREMENTAL was enabled are converted with one full
+    VACUUM first. `pages` limits how many pages are freed per run (None = all).
+    Returns the number of freed pages.
+    """
+    with store.lock:
+        conn = store.conn
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # executescript runs the pragma to completion; execute() would free a single page.
+        if pages is None:
+            conn.executescript("PRAGMA incremental_vacuum;")
+        else:
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        freed = free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA optimize")
+    return freed
+
+
+def run_maintenance(store, retention_days=365, rollup_after_days=30, rollup_retention_days=None,
+                    vacuum_pages=None, now=None):
+    """
+    Runs every maintenance job in order: dedupe, rollup, retention, vacuum.
+    Returns a report dict with what each step did and how long it took.
+    """
+    report = {}
+    steps = [
+        ("deduplicated", lambda: dedupe_observations(store)),
+        ("rolled_up", lambda: rollup_daily(store, rollup_after_days, now=now)),
+        ("retention", lambda: apply_retention(store, retention_days, rollup_retention_days, now=now)),
+        ("vacuumed_pages", lambda: incremental_vacuum(store, vacuum_pages)),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        report[name] = step()
+        report[f"{name}_seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main():
+    """Command line entry point; runs maintenance once or on a fixed interval."""
+    parser = argparse.ArgumentParser(description="Maintain the Pink OLX history DB.")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--retention-days", type=int, default=365)
+    parser.add_argument("--rollup-after-days", type=int, default=30)
+    parser.add_argument("--rollup-retention-days", type=int, default=None)
+    parser.add_argument("--vacuum-pages", type=int, default=None)
+    parser.add_argument("--interval", type=int, default=None, help="Repeat every N seconds.")
+    args = parser.parse_args()
+
+    store = PinkStore(args.db)
+    try:
+        while True:
+            report = run_maintenance(store, args.retention_days, args.rollup_after_days,
+                                     args.rollup_retention_days, args.vacuum_pages)
+            print(f"[Maintenance] {report}")
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
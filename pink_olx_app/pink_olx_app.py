@@ -2,10 +2,11 @@
 # pink_olx_app.py
 
 import sys
-import statistics
 import csv
+import threading
 
-from PyQt5.QtCore import Qt, QTimer
+import numpy as np
+from PyQt5.QtCore import Qt, QTimer, QObject, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (
     QApplication,
@@ -18,23 +19,124 @@ from PyQt5.QtWidgets import (
     QTextEdit,
     QPushButton,
     QComboBox,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QHeaderView,
     QCheckBox,
     QTabWidget,
     QLabel,
     QFileDialog,
     QListWidget,
     QListWidgetItem,
-    QHBoxLayout
+    QHBoxLayout,
+    QProgressBar
 )
 
 # Our custom modules
 from pink_olx_app import pink_olx_logic as logic
 from pink_olx_app import pink_store
 from pink_olx_app import pink_data_analysis
+from pink_olx_app import pink_export
+from pink_olx_app.pink_autosuggest import AutosuggestService, normalize_query
+from pink_olx_app.pink_dedup import DedupIndex
+from pink_olx_app.pink_stats import PriceStats
+from pink_olx_app.pink_table_model import ListingProxyModel, ListingTableModel, size_columns
+
+class SearchWorker(QObject):
+    """
+    Runs a paginated search on a QThread and hands each page to the GUI as soon as it arrives.
+    Near-duplicate indexing also happens here, off the main thread.
+    """
+    page_ready = pyqtSignal(list, int)  # listings of the page, page number
+    finished = pyqtSignal(bool)  # True if cancelled
+
+    def __init__(self, search_api, query, per_page, max_pages, dedup_index, dedup_lock):
+        super().__init__()
+        self.search_api = search_api
+        self.query = query
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.dedup_index = dedup_index
+        self.dedup_lock = dedup_lock
+        self.done = False
+        self.error = None
+        self._cancelled = False
+
+    def cancel(self):
+        """Stops the crawl after the page currently being fetched."""
+        self._cancelled = True
+
+    def run(self):
+        try:
+            # raise_errors: a page that fails ends up in self.error, so the window can tell a
+            # cut-off crawl from a finished one
+            for number, page in enumerate(self.search_api.iter_search_pages(
+                q=self.query,
+                per_page=self.per_page,
+                max_pages=self.max_pages,
+                raise_errors=True
+            ), start=1):
+                if self._cancelled:
+                    break
+                with self.dedup_lock:
+                    self.dedup_index.add_listings(page)
+                    self.dedup_index.annotate(page)
+                self.page_ready.emit(page, number)
+        except Exception as e:
+            # An exception escaping a slot would abort the application
+            self.error = e
+            print(f"[Search Error] {e}")
+        finally:
+            # Always emitted, so the thread quits and the window leaves the searching state
+            self.done = True
+            self.finished.emit(self._cancelled)
+
+
+def write_csv(listings, file_path):
+    """Write listings to a CSV file; returns the number of rows written."""
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Title", "Price", "Condition", "City"])
+        for item in listings:
+            row = [
+                item.get("id", ""),
+                item.get("title", ""),
+                item.get("price", ""),
+                item.get("state", ""),
+                (item.get("location") or {}).get("city", "")
+            ]
+            writer.writerow(row)
+    return len(listings)
+
+
+class ExportWorker(QObject):
+    """
+    Writes an export file on a QThread, so exporting a large result set doesn't freeze the window.
+    """
+    finished = pyqtSignal(str)  # message for the stats area
+
+    def __init__(self, export, listings, file_path, label, **kwargs):
+        super().__init__()
+        self.export = export
+        self.listings = listings
+        self.file_path = file_path
+        self.label = label
+        self.kwargs = kwargs
+        self.done = False
+
+    def run(self):
+        try:
+            rows = self.export(self.listings, self.file_path, **self.kwargs)
+            message = f"Exported {rows} listings to {self.label}: {self.file_path}"
+        except Exception as e:
+            message = f"Export Error: {e}"
+        self.done = True
+        self.finished.emit(message)
+
 
 class PinkOLXApp(QMainWindow):
+    # Emitted from the autosuggest thread; Qt delivers it on the main thread
+    suggestions_ready = pyqtSignal(str, object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Pink OLX Search - Modular Edition")
@@ -50,6 +152,8 @@ class PinkOLXApp(QMainWindow):
 
         # Initialize the local DB (so we can store search results)
         pink_store.init_db()
+        # Saves happen on a writer thread so large crawls don't freeze the window
+        self.store_writer = pink_store.BackgroundWriter()
 
         # Main layout with tabs
         self.central_widget = QWidget()
@@ -72,10 +176,31 @@ class PinkOLXApp(QMainWindow):
         self.autosuggest_timer = QTimer()
         self.autosuggest_timer.setSingleShot(True)
         self.autosuggest_timer.timeout.connect(self.run_autosuggest)
-
-        # For storing the final results we display
-        self.current_listings = []
+        # Cached suggestions show at once; misses are fetched in the background
+        self.autosuggest = AutosuggestService(on_result=self.suggestions_ready.emit)
+        self.suggestions_ready.connect(self.on_suggestions_ready)
+
+        # The result set the filters and the table work on (see also current_listings)
+        self.current_frame = logic.ListingFrame([])
+        self.crawl_stats = PriceStats()
+        # Near-duplicate index, kept across searches of the same query so reposts are recognized
+        # between them; a different query starts a new one, so it doesn't grow for the whole session
+        self.dedup_index = DedupIndex()
+        # A replaced search can still be indexing its last page while the next one starts
+        self.dedup_lock = threading.Lock()
         self.search_api = None
+        self.search_worker = None
+        # (thread, worker) of searches still running, including replaced ones
+        self.search_jobs = []
+        # (thread, worker) of exports still being written
+        self.export_jobs = []
+        self.search_query = ""
+        self.search_listings = []
+        # Pages that arrive close together are shown in one refresh instead of one each
+        self.search_refresh_timer = QTimer(self)
+        self.search_refresh_timer.setSingleShot(True)
+        self.search_refresh_timer.setInterval(300)
+        self.search_refresh_timer.timeout.connect(self.refresh_search_results)
 
     def build_search_tab(self):
         """Create all input/filters on the first tab."""
@@ -128,24 +253,33 @@ class PinkOLXApp(QMainWindow):
 
         self.min_price_input = QLineEdit()
         self.min_price_input.setPlaceholderText("Min Price")
+        self.min_price_input.editingFinished.connect(self.apply_filters)
         form_layout.addRow("Min Price:", self.min_price_input)
 
         self.max_price_input = QLineEdit()
         self.max_price_input.setPlaceholderText("Max Price")
+        self.max_price_input.editingFinished.connect(self.apply_filters)
         form_layout.addRow("Max Price:", self.max_price_input)
 
         self.condition_filter = QComboBox()
         self.condition_filter.addItem("All")
         self.condition_filter.addItem("new")
         self.condition_filter.addItem("used")
+        self.condition_filter.currentIndexChanged.connect(self.apply_filters)
         form_layout.addRow("Condition:", self.condition_filter)
 
         self.sort_combo = QComboBox()
         self.sort_combo.addItem("None")
         self.sort_combo.addItem("Ascending")
         self.sort_combo.addItem("Descending")
+        self.sort_combo.currentIndexChanged.connect(self.on_sort_changed)
         form_layout.addRow("Sort by Price:", self.sort_combo)
 
+        self.dedupe_checkbox = QCheckBox("Hide near-duplicate reposts")
+        self.dedupe_checkbox.setChecked(False)
+        self.dedupe_checkbox.stateChanged.connect(self.apply_filters)
+        form_layout.addRow(self.dedupe_checkbox)
+
         # Search button
         self.search_button = QPushButton("Search OLX")
         self.search_button.clicked.connect(self.perform_search)
@@ -157,10 +291,30 @@ class PinkOLXApp(QMainWindow):
         """Create the table, stats area, and some data science features."""
         layout = QVBoxLayout(self.results_tab)
 
-        # Table for listings
-        self.results_table = QTableWidget()
-        self.results_table.setColumnCount(4)
-        self.results_table.setHorizontalHeaderLabels(["Title", "Price", "Condition", "Location"])
+        # Search progress + cancel
+        progress_layout = QHBoxLayout()
+        self.search_progress = QProgressBar()
+        self.search_progress.setFormat("%v / %m pages")
+        self.search_progress.hide()
+        progress_layout.addWidget(self.search_progress)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_search)
+        self.cancel_button.hide()
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+
+        # Table for listings: a view over the current ListingFrame, cells are produced on demand
+        self.results_model = ListingTableModel(parent=self)
+        self.results_proxy = ListingProxyModel(self)
+        self.results_proxy.setSourceModel(self.results_model)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_proxy)
+        # Fixed row heights, so the view never measures rows it doesn't show
+        self.results_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        # Clicking a header sorts by that column; no header sort until then
+        self.results_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.results_table.setSortingEnabled(True)
         self.results_table.setColumnWidth(0, 350)
         layout.addWidget(self.results_table)
 
@@ -176,6 +330,10 @@ class PinkOLXApp(QMainWindow):
         self.export_button.clicked.connect(self.export_to_csv)
         btn_layout.addWidget(self.export_button)
 
+        self.export_parquet_button = QPushButton("Export Parquet")
+        self.export_parquet_button.clicked.connect(self.export_to_parquet)
+        btn_layout.addWidget(self.export_parquet_button)
+
         self.plot_button = QPushButton("Show Plot")
         self.plot_button.clicked.connect(self.on_show_plot)
         btn_layout.addWidget(self.plot_button)
@@ -187,11 +345,13 @@ class PinkOLXApp(QMainWindow):
         """Start the timer for autosuggest if text >=2 chars."""
         self.suggestions_list.hide()  # hide suggestions while typing
         if len(text.strip()) < 2:
+            self.autosuggest.cancel()
             return
-        self.autosuggest_timer.start(350)
+        # Short debounce: most keystrokes are answered from the cache
+        self.autosuggest_timer.start(150)
 
     def run_autosuggest(self):
-        """Retrieve suggestions from OLX and display them in the QListWidget."""
+        """Show cached suggestions right away; fresh ones arrive through suggestions_ready."""
         text = self.query_input.text().strip()
         if len(text) < 2:
             return
@@ -204,7 +364,18 @@ class PinkOLXApp(QMainWindow):
                 self.token_input.text().strip(),
             )
 
-        data = logic.autosuggest_olx(self.search_api, text)
+        self.autosuggest.search_api = self.search_api
+        data, _ = self.autosuggest.request(text)
+        if data is not None:
+            self.show_suggestions(data)
+
+    def on_suggestions_ready(self, query, data):
+        """Display fetched suggestions unless the user has typed on since."""
+        if normalize_query(self.query_input.text()) == query:
+            self.show_suggestions(data)
+
+    def show_suggestions(self, data):
+        """Display autosuggest data in the QListWidget."""
         refined = data.get("autocomplete", [])
         categories = data.get("categories", [])
 
@@ -231,9 +402,9 @@ class PinkOLXApp(QMainWindow):
 
     # -- Search Flow --
     def perform_search(self):
-        """Perform the OLX search, store results in DB, display them."""
+        """Start the OLX search on a worker thread; pages are shown as they arrive."""
         self.stats_area.clear()
-        self.results_table.setRowCount(0)
+        self.results_proxy.set_frame(logic.ListingFrame([]))
         query = self.query_input.text().strip()
         if not query:
             self.stats_area.setText("Please enter a search query.")
@@ -249,33 +420,114 @@ class PinkOLXApp(QMainWindow):
                 self.token_input.text().strip(),
             )
 
-        # Get listings
-        listings = logic.search_all_listings(
-            self.search_api,
-            query,
-            self.per_page_input.value(),
-            self.max_pages_input.value()
-        )
+        # A new search replaces one that is still running
+        self.cancel_search()
+        self.search_refresh_timer.stop()
+
+        if normalize_query(query) != normalize_query(self.search_query):
+            self.dedup_index = DedupIndex()
+        self.search_query = query
+        self.search_listings = []
+        self.crawl_stats = PriceStats()
+        self.current_frame = logic.ListingFrame([])
+
+        max_pages = self.max_pages_input.value()
+        self.search_progress.setRange(0, max_pages)
+        self.search_progress.setValue(0)
+        self.search_progress.show()
+        self.cancel_button.show()
+
+        # The window owns the thread, so it outlives its Python reference until it has finished
+        thread = QThread(self)
+        self.search_worker = SearchWorker(self.search_api, query, self.per_page_input.value(), max_pages,
+                                          self.dedup_index, self.dedup_lock)
+        self.search_worker.moveToThread(thread)
+        thread.started.connect(self.search_worker.run)
+        self.search_worker.page_ready.connect(self.on_search_page)
+        self.search_worker.finished.connect(self.on_search_finished)
+        self.search_worker.finished.connect(thread.quit)
+        thread.finished.connect(self.on_search_thread_finished)
+        thread.finished.connect(self.search_worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        self.search_jobs.append((thread, self.search_worker))
+        thread.start()
 
-        # Save them for historical tracking
-        pink_store.save_listings(listings, query)
+        # Switch tab
+        self.tabs.setCurrentIndex(1)
 
-        # Filter
+    def on_search_page(self, page, number):
+        """Add one page of results; the table and stats refresh shortly after (see refresh_search_results)."""
+        if self.sender() is not self.search_worker:
+            return  # a page from a search that was replaced
+        self.search_listings.extend(page)
+        self.crawl_stats.add_listings(page)
+        self.search_progress.setValue(number)
+        if not self.search_refresh_timer.isActive():
+            self.search_refresh_timer.start()
+
+    def refresh_search_results(self):
+        """Show the pages received so far (at most once per timer interval while searching)."""
+        # Filter & sort (prices, conditions and cities are parsed once into columns)
+        self.current_frame = logic.ListingFrame(self.search_listings)
+        self.apply_filters()
+
+    def on_search_finished(self, cancelled):
+        """Save the crawled listings and show the final, fully deduplicated results."""
+        if self.sender() is not self.search_worker:
+            return
+        error = self.search_worker.error
+        self.search_worker = None
+        self.search_refresh_timer.stop()
+        listings = self.search_listings
+        # Clusters can merge as later pages arrive; refresh the ids of earlier pages
+        with self.dedup_lock:
+            self.dedup_index.annotate(listings)
+
+        # Save them for historical tracking (queued, written in the background)
+        if listings:
+            self.store_writer.submit(listings, self.search_query)
+
+        self.current_frame = logic.ListingFrame(listings)
+        self.apply_filters()
+        if cancelled:
+            self.stats_area.append(f"Search cancelled after {len(listings)} listings.")
+        elif error is not None:
+            self.stats_area.append(f"Search stopped after {len(listings)} listings: {error}")
+
+        self.search_progress.hide()
+        self.cancel_button.hide()
+
+    def on_search_thread_finished(self):
+        """Forget a finished search; its worker and thread delete themselves (deleteLater)."""
+        thread = self.sender()
+        self.search_jobs = [(job_thread, worker) for job_thread, worker in self.search_jobs
+                            if job_thread is not thread]
+
+    def cancel_search(self):
+        """Cancel the running search, if any. Results so far are kept."""
+        if self.search_worker is not None:
+            self.search_worker.cancel()
+
+    def apply_filters(self):
+        """Re-filter and re-sort the current result set locally, without searching again."""
         min_p, max_p = self.parse_price_range()
         condition = self.condition_filter.currentText()
-        filtered = logic.filter_listings_by_price_condition(listings, min_p, max_p, condition)
-
-        # Sort
         sort_order = self.sort_combo.currentText()
-        final_list = logic.sort_listings_by_price(filtered, sort_order)
+        rows = self.current_frame.filter_and_sort(min_p, max_p, condition, sort_order,
+                                                  dedupe=self.dedupe_checkbox.isChecked())
 
         # Display
-        self.current_listings = final_list[:]  # store locally
-        self.display_listings_in_table(final_list)
-        self.show_price_stats(final_list)
+        self.stats_area.clear()
+        self.display_listings_in_table(rows)
+        if self.search_worker is not None:
+            self.show_crawl_stats()
+        else:
+            self.show_price_stats(rows)
 
-        # Switch tab
-        self.tabs.setCurrentIndex(1)
+    def on_sort_changed(self):
+        """The price sort box replaces any header sort."""
+        self.results_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.apply_filters()
 
     def parse_price_range(self):
         """Safely parse min/max price from QLineEdits."""
@@ -291,50 +543,65 @@ class PinkOLXApp(QMainWindow):
 
         return (min_p, max_p)
 
-    def display_listings_in_table(self, listings):
-        """Fill the QTableWidget with listing data."""
-        self.results_table.setRowCount(len(listings))
-        for row, item in enumerate(listings):
-            # Title
-            title = item.get("title", "N/A")
-            price = str(item.get("price", "N/A"))
-            cond = item.get("state", "N/A")
-            loc = (item.get("location") or {}).get("city", "N/A")
-
-            self.results_table.setItem(row, 0, QTableWidgetItem(title))
-            self.results_table.setItem(row, 1, QTableWidgetItem(price))
-            self.results_table.setItem(row, 2, QTableWidgetItem(cond))
-            self.results_table.setItem(row, 3, QTableWidgetItem(loc))
-        self.results_table.resizeColumnsToContents()
-
-    def show_price_stats(self, listings):
-        """Compute & show min, max, avg price in stats_area."""
-        if not listings:
+    @property
+    def current_listings(self):
+        """
+        The listings the table shows, in its order: a header sort applies to CSV / Parquet
+        export and the plot too.
+        """
+        return self.results_proxy.listings()
+
+    def display_listings_in_table(self, rows):
+        """Show the given rows of current_frame in the table view."""
+        if self.results_model.frame is not self.current_frame:
+            self.results_proxy.set_frame(self.current_frame, rows)
+        else:
+            self.results_proxy.set_rows(rows)
+        size_columns(self.results_table)
+
+    def show_price_stats(self, rows):
+        """Compute & show min, max, avg, median price of the given current_frame rows in stats_area."""
+        if not len(rows):
             self.stats_area.setText("No listings found after filtering.")
             return
 
-        prices = []
-        for item in listings:
-            try:
-                p = float(item.get("price", 0) or 0)
-                if p > 0:
-                    prices.append(p)
-            except:
-                pass
-
-        if not prices:
+        # Exact statistics over the filtered prices; the sketch in crawl_stats is for the stream
+        prices = self.current_frame.price[rows]
+        prices = prices[prices > 0]
+        if not len(prices):
             self.stats_area.append("No valid prices among these listings.")
             return
 
-        min_p = min(prices)
-        max_p = max(prices)
-        avg_p = statistics.mean(prices)
-
+        p10, median, p90 = np.percentile(prices, [10, 50, 90])
         self.stats_area.append("\n=== Price Stats ===")
         self.stats_area.append(f"Count: {len(prices)}")
-        self.stats_area.append(f"Min : {min_p:.2f}")
-        self.stats_area.append(f"Max : {max_p:.2f}")
-        self.stats_area.append(f"Avg : {avg_p:.2f}")
+        self.stats_area.append(f"Min : {prices.min():.2f}")
+        self.stats_area.append(f"Max : {prices.max():.2f}")
+        self.stats_area.append(f"Avg : {prices.mean():.2f}")
+        self.stats_area.append(f"Std : {prices.std(ddof=1) if len(prices) > 1 else 0.0:.2f}")
+        self.stats_area.append(f"Median : {median:.2f} (P10 {p10:.2f}, P90 {p90:.2f})")
+        distinct = len(np.unique(self.current_frame.cluster_code[rows]))
+        if distinct < len(rows):
+            self.stats_area.append(f"Distinct items: {distinct} ({len(rows) - distinct} near-duplicate reposts)")
+        if self.crawl_stats.count:
+            self.stats_area.append(f"All results: {self.crawl_stats.count} priced, "
+                                   f"median {self.crawl_stats.median:.2f}")
+
+    def show_crawl_stats(self):
+        """Show the running stats of all results received so far, while a search is in progress."""
+        stats = self.crawl_stats
+        if not stats.count:
+            self.stats_area.setText("Searching...")
+            return
+
+        p10, median, p90 = stats.quantiles([0.1, 0.5, 0.9])
+        self.stats_area.append("\n=== Price Stats (searching...) ===")
+        self.stats_area.append(f"All results so far: {stats.count} priced")
+        self.stats_area.append(f"Min : {stats.min:.2f}")
+        self.stats_area.append(f"Max : {stats.max:.2f}")
+        self.stats_area.append(f"Avg : {stats.mean:.2f}")
+        self.stats_area.append(f"Std : {stats.stdev:.2f}")
+        self.stats_area.append(f"Median : ~{median:.2f} (P10 ~{p10:.2f}, P90 ~{p90:.2f})")
 
     # -- CSV Export --
     def export_to_csv(self):
@@ -348,23 +615,62 @@ class PinkOLXApp(QMainWindow):
         if not file_path:
             return
 
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["ID", "Title", "Price", "Condition", "City"])
-                for item in self.current_listings:
-                    row = [
-                        item.get("id", ""),
-                        item.get("title", ""),
-                        item.get("price", ""),
-                        item.get("state", ""),
-                        (item.get("location") or {}).get("city", "")
-                    ]
-                    writer.writerow(row)
-
-            self.stats_area.append(f"Exported to CSV: {file_path}")
-        except Exception as e:
-            self.stats_area.append(f"Export Error: {e}")
+        self.start_export(write_csv, file_path, "CSV")
+
+    # -- Parquet / Arrow Export --
+    def export_to_parquet(self):
+        """Export current_listings, with all flattened fields, to Parquet or Arrow IPC."""
+        if not self.current_listings:
+            self.stats_area.append("No listings to export.")
+            return
+
+        file_dialog = QFileDialog()
+        file_path, _ = file_dialog.getSaveFileName(
+            self, "Save Parquet", "", "Parquet Files (*.parquet);;Arrow IPC Files (*.feather *.arrow)")
+        if not file_path:
+            return
+
+        self.start_export(pink_export.export_listings, file_path, "Parquet",
+                          query=self.query_input.text().strip())
+
+    def start_export(self, export, file_path, label, **kwargs):
+        """Run export(listings, file_path, **kwargs) for the current listings on a worker thread."""
+        # current_listings is a new list, so filtering or a new search doesn't change what is written
+        worker = ExportWorker(export, self.current_listings, file_path, label, **kwargs)
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self.on_export_finished)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self.on_export_thread_finished)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        self.export_jobs.append((thread, worker))
+        self.stats_area.append(f"Exporting {len(worker.listings)} listings to {file_path}...")
+        thread.start()
+
+    def on_export_finished(self, message):
+        self.stats_area.append(message)
+
+    def on_export_thread_finished(self):
+        """Forget a finished export; its worker and thread delete themselves (deleteLater)."""
+        thread = self.sender()
+        self.export_jobs = [(job_thread, worker) for job_thread, worker in self.export_jobs
+                            if job_thread is not thread]
+
+    def closeEvent(self, event):
+        """Write any queued listings to the DB before the window closes."""
+        for thread, worker in self.search_jobs:
+            if not worker.done:
+                worker.cancel()
+                thread.quit()
+                thread.wait()
+        # Exports can't be cancelled halfway without leaving a broken file; let them finish
+        for thread, _ in self.export_jobs:
+            thread.wait()
+        self.autosuggest.close()
+        self.store_writer.close()
+        super().closeEvent(event)
 
     # -- Show Plot --
     def on_show_plot(self):
@@ -2,6 +2,10 @@
 
 # pink_olx_logic.py
 
+import math
+
+import numpy as np
+
 from olx_api.authentication import OLXAuth
 from olx_api.search import Search
 
@@ -66,30 +70,222 @@ def search_all_listings(search_api, query, per_page, max_pages):
         return []
 
 
-def filter_listings_by_price_condition(listings, min_price, max_price, condition):
+def iter_search_pages(search_api, query, per_page, max_pages):
     """
-    Filters listings by optional min_price, max_price, and condition ('new', 'used', or 'All').
-    Returns filtered list.
+    Yields search results page by page (see Search.iter_search_pages), so callers can
+    update statistics or storage while the crawl is still running.
+    """
+    if not search_api:
+        return
+
+    try:
+        yield from search_api.iter_search_pages(
+            q=query,
+            per_page=per_page,
+            max_pages=max_pages
+        )
+    except Exception as e:
+        print(f"[Search Error] {e}")
+
+
+def _parse_price(item):
+    """Listing price as a float; 0.0 if it is missing or not a finite number (e.g. "nan")."""
+    try:
+        price = float(item.get("price", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    # NaN would fail every price comparison and land at an arbitrary place in the price index
+    return price if math.isfinite(price) else 0.0
+
+
+class ListingFrame:
     """
-    # Price Filter
-    filtered = []
-    for item in listings:
+    Columnar view of a result set: prices, condition, city and category codes are parsed once
+    into NumPy arrays, so filters are boolean masks and sorts are argsorts over row indices.
+    The original listing dicts stay in 'listings'; 'select' maps row indices back to them.
+
+    Usage Example:
+        >>> frame = ListingFrame(listings)
+        >>> rows = frame.filter_and_sort(min_price=100, max_price=300, condition="used",
+        ...                              sort_order="Ascending")
+        >>> frame.select(rows)
+    """
+
+    def __init__(self, listings):
+        """
+        :param listings: List of listing dicts, as returned by the search API.
+        """
+        self.listings = list(listings)
+        self.price = np.fromiter((_parse_price(item) for item in self.listings),
+                                 dtype=np.float64, count=len(self.listings))
+        self.states, self.state_code = self._encode(
+            (item.get("state") or "").lower() for item in self.listings)
+        self.cities, self.city_code = self._encode(
+            (item.get("location") or {}).get("city") or "" for item in self.listings)
+        self.categories, self.category_code = self._encode(
+            item.get("category_id") for item in self.listings)
+        # Near-duplicate clusters (see pink_dedup); listings without a cluster id are their own cluster.
+        self.clusters, self.cluster_code = self._encode(
+            ("row", row) if item.get("cluster_id") is None else item["cluster_id"]
+            for row, item in enumerate(self.listings))
+        self._by_price = None
+        self._sorted_price = None
+
+    def _encode(self, values):
+        """Dictionary-encodes values; returns (vocabulary list, int32 code array)."""
+        vocabulary = {}
+        codes = np.fromiter((vocabulary.setdefault(value, len(vocabulary)) for value in values),
+                            dtype=np.int32, count=len(self.listings))
+        return list(vocabulary), codes
+
+    def __len__(self):
+        return len(self.listings)
+
+    def mask(self, min_price=None, max_price=None, condition="All", city=None):
+        """
+        Returns a boolean array selecting the rows that pass every given filter.
+        'condition' is 'new', 'used' or 'All'; 'city' is a city name (None = any).
+        """
+        keep = np.ones(len(self.listings), dtype=bool)
+        if min_price is not None:
+            keep &= self.price >= min_price
+        if max_price is not None:
+            keep &= self.price <= max_price
+        if condition and condition != "All":
+            keep &= self.state_code == self._code(self.states, condition.lower())
+        if city is not None:
+            keep &= self.city_code == self._code(self.cities, city)
+        return keep
+
+    @staticmethod
+    def _code(vocabulary, value):
         try:
-            p = float(item.get("price", 0) or 0)
+            return vocabulary.index(value)
         except ValueError:
-            p = 0
+            return -1
+
+    def order(self, sort_order, rows=None):
+        """
+        Orders row indices by price ('Ascending' / 'Descending'; 'None' keeps them as they are).
+        The sort is stable, so equal prices keep their original order.
+
+        :param sort_order: 'Ascending', 'Descending' or 'None'.
+        :param rows: (Optional) Row indices to order; defaults to all rows.
+        :return: Array of row indices.
+        """
+        rows = np.arange(len(self.listings)) if rows is None else np.asarray(rows)
+        if sort_order == "None":
+            return rows
+        prices = self.price[rows]
+        if sort_order == "Descending":
+            prices = -prices
+        return rows[np.argsort(prices, kind="stable")]
+
+    # -- Price index --
+    def _price_index(self):
+        """Row indices in ascending price order (stable), and the prices in that order; built once."""
+        if self._by_price is None:
+            self._by_price = np.argsort(self.price, kind="stable")
+            self._sorted_price = self.price[self._by_price]
+        return self._by_price, self._sorted_price
+
+    def price_range(self, min_price=None, max_price=None):
+        """
+        Row indices with min_price <= price <= max_price, cheapest first, found by binary search
+        in the price index: O(log n) plus the size of the result.
+        """
+        by_price, sorted_price = self._price_index()
+        start = 0 if min_price is None else np.searchsorted(sorted_price, min_price, side="left")
+        stop = len(sorted_price) if max_price is None else np.searchsorted(sorted_price, max_price, side="right")
+        return by_price[start:max(start, stop)]
+
+    def _narrow(self, rows, condition="All", city=None):
+        """Keeps the rows whose condition / city code matches, preserving their order."""
+        if condition and condition != "All":
+            rows = rows[self.state_code[rows] == self._code(self.states, condition.lower())]
+        if city is not None:
+            rows = rows[self.city_code[rows] == self._code(self.cities, city)]
+        return rows
+
+    def filter_and_sort(self, min_price=None, max_price=None, condition="All", sort_order="None", city=None,
+                        dedupe=False):
+        """
+        Filters, then sorts. Returns the row indices of the result.
+        Uses the price index, so changing a filter only costs O(log n) plus the size of the result.
+        With dedupe=True only the first listing of each near-duplicate cluster is kept.
+        """
+        rows = self._narrow(self.price_range(min_price, max_price), condition, city)
+        if sort_order == "Descending":
+            rows = self.order(sort_order, rows)
+        elif sort_order != "Ascending":
+            rows = np.sort(rows)
+        return self.one_per_cluster(rows) if dedupe else rows
+
+    def one_per_cluster(self, rows):
+        """
+        Keeps the first of 'rows' from each near-duplicate cluster, preserving their order.
+        """
+        rows = np.asarray(rows)
+        _, first = np.unique(self.cluster_code[rows], return_index=True)
+        return rows[np.sort(first)]
 
-        if min_price is not None and p < min_price:
-            continue
-        if max_price is not None and p > max_price:
-            continue
-        filtered.append(item)
+    def cluster_count(self, rows=None):
+        """
+        Number of distinct near-duplicate clusters among the rows (default: all rows).
+        """
+        codes = self.cluster_code if rows is None else self.cluster_code[np.asarray(rows)]
+        return len(np.unique(codes))
 
-    # Condition Filter
-    if condition != "All":
-        filtered = [f for f in filtered if f.get("state", "").lower() == condition.lower()]
+    def _first_matches(self, rows, n, condition="All", city=None):
+        """The first n of 'rows' that pass the condition / city filters, checked in small chunks."""
+        if (not condition or condition == "All") and city is None:
+            return rows[:n]
+        chunk_size = max(n, 256)
+        found, count = [], 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = self._narrow(rows[start:start + chunk_size], condition, city)
+            found.append(chunk)
+            count += len(chunk)
+            if count >= n:
+                break
+        return np.concatenate(found)[:n] if found else rows[:0]
 
-    return filtered
+    def cheapest(self, n, min_price=None, max_price=None, condition="All", city=None):
+        """
+        Row indices of the n cheapest listings passing the filters, cheapest first.
+        Walks the price index up from min_price and stops after n matches.
+        """
+        return self._first_matches(self.price_range(min_price, max_price), n, condition, city)
+
+    def most_expensive(self, n, min_price=None, max_price=None, condition="All", city=None):
+        """
+        Row indices of the n most expensive listings passing the filters, most expensive first.
+        Walks the price index down from max_price and stops after n matches; equal prices keep
+        their original order, as in filter_and_sort(sort_order="Descending").
+        """
+        rows = self._first_matches(self.price_range(min_price, max_price)[::-1], n, condition, city)
+        if n and len(rows) == n:
+            # Walking down visits equal prices last row first; take every match at the lowest
+            # selected price, so the earliest rows win the last places
+            boundary = self.price[rows[-1]]
+            tied = self._narrow(self.price_range(boundary, boundary), condition, city)
+            rows = np.concatenate([rows[self.price[rows] > boundary], tied])
+        return self.order("Descending", np.sort(rows))[:n]
+
+    def select(self, rows):
+        """
+        Returns the listing dicts at the given row indices, in that order.
+        """
+        return [self.listings[row] for row in rows]
+
+
+def filter_listings_by_price_condition(listings, min_price, max_price, condition):
+    """
+    Filters listings by optional min_price, max_price, and condition ('new', 'used' or 'All').
+    Returns filtered list.
+    """
+    frame = ListingFrame(listings)
+    return frame.select(np.flatnonzero(frame.mask(min_price, max_price, condition)))
 
 
 def sort_listings_by_price(listings, sort_order):
@@ -100,11 +296,5 @@ def sort_listings_by_price(listings, sort_order):
     if sort_order == "None":
         return listings
 
-    reverse_sort = (sort_order == "Descending")
-    def get_price(item):
-        try:
-            return float(item.get("price", 0) or 0)
-        except ValueError:
-            return 0
-
-    return sorted(listings, key=get_price, reverse=reverse_sort)
+    frame = ListingFrame(listings)
+    return frame.select(frame.order(sort_order))
@@ -0,0 +1,218 @@
+# Streaming price statistics with a mergeable quantile sketch
+
+# pink_stats.py
+#
+# PriceStats can be fed page by page while a search is running and uses constant memory:
+# count, mean and variance (Welford), min/max, and a KLL sketch for median and percentiles.
+# Accumulators filled by parallel workers are combined with merge().
+
+import math
+import random
+
+
+def _price(item):
+    try:
+        return float(item.get("price", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Keeps a stack of compactors; when one is full it is sorted and every other item is promoted
+    to the next level with double weight. Memory is O(k) items regardless of stream length, the
+    rank error is roughly 1.7 / k, and two sketches merge into one with the same guarantees.
+
+    Usage Example:
+        >>> sketch = KLLSketch()
+        >>> for price in prices:
+        ...     sketch.add(price)
+        >>> sketch.quantile(0.5)
+    """
+
+    def __init__(self, k=200, seed=None):
+        """
+        :param k: Size of the largest compactor; higher is more accurate and uses more memory.
+        :param seed: (Optional) Seed for the coin flips, for reproducible results.
+        """
+        self.k = k
+        self.count = 0
+        self.compactors = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _size(self):
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def _max_size(self):
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def add(self, value):
+        self.compactors[0].append(value)
+        self.count += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for level, compactor in enumerate(self.compactors):
+                if len(compactor) >= self._capacity(level):
+                    if level + 1 == len(self.compactors):
+                        self.compactors.append([])
+                    compactor.sort()
+                    # An odd item out stays at this level.
+                    keep = [compactor.pop()] if len(compactor) % 2 else []
+                    offset = self._random.randint(0, 1)
+                    self.compactors[level + 1].extend(compactor[offset::2])
+                    self.compactors[level] = keep
+                    break
+            else:
+                break
+
+    def merge(self, other):
+        """
+        Adds another sketch's items to this one. Returns self.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = [(value, 1 << level) for level, compactor in enumerate(self.compactors) for value in compactor]
+        items.sort()
+        return items
+
+    def quantiles(self, fractions):
+        """
+        Returns the approximate values at the given fractions (0..1) of the distribution.
+        """
+        items = self._weighted()
+        if not items:
+            return [None for _ in fractions]
+        total = sum(weight for _, weight in items)
+        results = []
+        for fraction in fractions:
+            target = fraction * total
+            cumulative = 0
+            for value, weight in items:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(value)
+        return results
+
+    def quantile(self, fraction):
+        return self.quantiles([fraction])[0]
+
+    def rank(self, value):
+        """
+        Returns the approximate fraction of items <= value.
+        """
+        items = self._weighted()
+        total = sum(weight for _, weight in items)
+        if not total:
+            return 0.0
+        return sum(weight for item, weight in items if item <= value) / total
+
+
+class PriceStats:
+    """
+    Streaming count, mean, variance, min, max and quantiles of listing prices.
+
+    Usage Example:
+        >>> stats = PriceStats()
+        >>> for page in search_api.iter_search_pages(q="iphone"):
+        ...     stats.add_listings(page)
+        >>> stats.mean, stats.stdev, stats.quantile(0.5)
+    """
+
+    def __init__(self, k=200, seed=None):
+        """
+        :param k: Accuracy parameter of the quantile sketch, see KLLSketch.
+        :param seed: (Optional) Seed for the sketch, for reproducible results.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = KLLSketch(k=k, seed=seed)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.sketch.add(value)
+
+    def update(self, values):
+        for value in values:
+            self.add(float(value))
+
+    def add_listings(self, listings):
+        """
+        Adds the prices of listing dicts; listings without a positive price are skipped.
+        """
+        for item in listings:
+            price = _price(item)
+            if price > 0:
+                self.add(price)
+
+    def merge(self, other):
+        """
+        Combines another accumulator into this one (Chan et al. parallel variance). Returns self.
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            self.mean, self._m2 = other.mean, other._m2
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (0.0 for fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, fraction):
+        return self.sketch.quantile(fraction)
+
+    def quantiles(self, fractions):
+        return self.sketch.quantiles(fractions)
+
+    @property
+    def median(self):
+        return self.sketch.quantile(0.5)
+
+    @classmethod
+    def from_listings(cls, listings, **kwargs):
+        stats = cls(**kwargs)
+        stats.add_listings(listings)
+        return stats
@@ -3,73 +3,587 @@
 # pink_store.py
 
 import sqlite3
+import threading
 import time
 
-def init_db(db_name="pink_olx_data.db"):
+DEFAULT_DB = "pink_olx_data.db"
+
+
+def _listing_row(item):
     """
-    Initialize the local database (if not exists) and create the table.
+    Flattens one API listing dict into a (listing_id, title, price, state, city, description,
+    cluster_id) row. cluster_id is set by pink_dedup.DedupIndex.annotate, if used.
     """
-    conn = sqlite3.connect(db_name)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS search_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            listing_id INTEGER,
-            title TEXT,
-            price REAL,
-            state TEXT,
-            city TEXT,
-            query TEXT,
-            timestamp INTEGER
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-def save_listings(listings, query, db_name="pink_olx_data.db"):
-    """
-    Saves current listings into the DB. 
-    Includes the search 'query' and a timestamp, so we can track history.
+    try:
+        price = float(item.get("price", 0) or 0)
+    except (TypeError, ValueError):
+        price = 0
+    location_dict = item.get("location") or {}
+    description = (item.get("description") or item.get("short_description")
+                   or (item.get("additional") or {}).get("description"))
+    return (
+        item.get("id"),
+        item.get("title", ""),
+        price,
+        item.get("state", ""),
+        location_dict.get("city", ""),
+        description,
+        item.get("cluster_id"),
+    )
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS queries (
+        id INTEGER PRIMARY KEY,
+        query TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS searches (
+        id INTEGER PRIMARY KEY,
+        query_id INTEGER NOT NULL REFERENCES queries(id),
+        timestamp INTEGER NOT NULL,
+        result_count INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_searches_query_time ON searches (query_id, timestamp);
+
+    -- One row per listing with its latest known data.
+    CREATE TABLE IF NOT EXISTS listings (
+        listing_id INTEGER PRIMARY KEY,
+        title TEXT,
+        price REAL,
+        state TEXT,
+        city TEXT,
+        first_seen INTEGER NOT NULL,
+        last_seen INTEGER NOT NULL,
+        description TEXT,
+        cluster_id INTEGER
+    );
+
+    -- A row is only written when a listing is first seen or its price changes.
+    CREATE TABLE IF NOT EXISTS price_observations (
+        listing_id INTEGER NOT NULL,
+        observed_at INTEGER NOT NULL,
+        price REAL,
+        PRIMARY KEY (listing_id, observed_at)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_price_observations_time ON price_observations (observed_at);
+
+    -- Which listings a query returned, and when.
+    CREATE TABLE IF NOT EXISTS query_listings (
+        query_id INTEGER NOT NULL,
+        listing_id INTEGER NOT NULL,
+        first_seen INTEGER NOT NULL,
+        last_seen INTEGER NOT NULL,
+        PRIMARY KEY (query_id, listing_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_query_listings_listing ON query_listings (listing_id);
+
+    -- Daily rollups of old price observations (see pink_maintenance).
+    CREATE TABLE IF NOT EXISTS daily_listing_prices (
+        listing_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        min_price REAL,
+        max_price REAL,
+        median_price REAL,
+        observations INTEGER NOT NULL,
+        PRIMARY KEY (listing_id, day)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS daily_query_prices (
+        query_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        min_price REAL,
+        max_price REAL,
+        median_price REAL,
+        observations INTEGER NOT NULL,
+        PRIMARY KEY (query_id, day)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS maintenance_state (
+        key TEXT PRIMARY KEY,
+        value INTEGER
+    );
+"""
+
+# Full-text index over listing titles and descriptions. New listings are indexed in bulk by
+# PinkStore._save (a per-row insert trigger made first crawls about twice as slow); updates and
+# deletes are kept in sync by triggers, which only touch the index when the text actually changes.
+FTS_SCHEMA = (
     """
-    if not listings:
-        return
+    CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+        title, description,
+        content='listings', content_rowid='listing_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS listings_fts_delete AFTER DELETE ON listings BEGIN
+        INSERT INTO listings_fts (listings_fts, rowid, title, description)
+        VALUES ('delete', old.listing_id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS listings_fts_update AFTER UPDATE OF title, description ON listings
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+        INSERT INTO listings_fts (listings_fts, rowid, title, description)
+        VALUES ('delete', old.listing_id, old.title, old.description);
+        INSERT INTO listings_fts (rowid, title, description)
+        VALUES (new.listing_id, new.title, new.description);
+    END
+    """,
+)
 
-    timestamp = int(time.time())  # seconds since epoch
-    conn = sqlite3.connect(db_name)
-    c = conn.cursor()
+# Moves the old denormalized search_results table (one full row per listing per search)
+# into the normalized tables. Only price changes are kept as observations.
+MIGRATE_SEARCH_RESULTS = """
+    INSERT OR IGNORE INTO queries (query)
+    SELECT DISTINCT COALESCE(query, '') FROM search_results;
 
-    for item in listings:
-        listing_id = item.get("id", 0)
-        title = item.get("title", "")
-        try:
-            price = float(item.get("price", 0) or 0)
-        except:
-            price = 0
-        state = item.get("state", "")
-        location_dict = item.get("location") or {}
-        city = location_dict.get("city", "")
-
-        c.execute("""
-            INSERT INTO search_results (listing_id, title, price, state, city, query, timestamp)
+    INSERT INTO searches (query_id, timestamp, result_count)
+    SELECT q.id, s.timestamp, COUNT(*)
+    FROM search_results s JOIN queries q ON q.query = COALESCE(s.query, '')
+    GROUP BY q.id, s.timestamp;
+
+    INSERT OR REPLACE INTO listings (listing_id, title, price, state, city, first_seen, last_seen)
+    SELECT listing_id, title, price, state, city, first_seen, last_seen FROM (
+        SELECT listing_id, title, price, state, city,
+               MIN(timestamp) OVER (PARTITION BY listing_id) AS first_seen,
+               MAX(timestamp) OVER (PARTITION BY listing_id) AS last_seen,
+               ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY timestamp DESC, id DESC) AS rn
+        FROM search_results WHERE listing_id IS NOT NULL
+    ) WHERE rn = 1;
+
+    INSERT OR IGNORE INTO price_observations (listing_id, observed_at, price)
+    SELECT listing_id, timestamp, price FROM (
+        SELECT listing_id, timestamp, price,
+               LAG(price) OVER (PARTITION BY listing_id ORDER BY timestamp) AS prev_price,
+               ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY timestamp) AS rn
+        FROM (SELECT listing_id, timestamp, MAX(price) AS price
+              FROM search_results WHERE listing_id IS NOT NULL
+              GROUP BY listing_id, timestamp)
+    ) WHERE rn = 1 OR price IS NOT prev_price;
+
+    INSERT OR REPLACE INTO query_listings (query_id, listing_id, first_seen, last_seen)
+    SELECT q.id, s.listing_id, MIN(s.timestamp), MAX(s.timestamp)
+    FROM search_results s JOIN queries q ON q.query = COALESCE(s.query, '')
+    WHERE s.listing_id IS NOT NULL
+    GROUP BY q.id, s.listing_id;
+
+    DROP TABLE search_results;
+"""
+
+
+class PinkStore:
+    """
+    Holds one long-lived SQLite connection to the local history DB.
+
+    The connection runs in WAL mode with relaxed fsync and a bigger page cache, and
+    save_listings() writes a whole crawl with executemany in batches inside one transaction,
+    instead of one execute and one connection per listing.
+    The connection may be shared between threads; calls are serialized with a lock.
+
+    Schema: `listings` keeps one upserted row per listing_id, `price_observations` only gets a
+    row when a price changes, `query_listings` links queries to the listings they returned and
+    `searches` records when each query ran. Databases with the old `search_results` table are
+    migrated on open.
+    """
+
+    PRAGMAS = (
+        # Only takes effect on new files; pink_maintenance converts older ones.
+        "PRAGMA auto_vacuum=INCREMENTAL",
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=5000",
+    )
+    SCHEMA_VERSION = 6
+
+    def __init__(self, db_name=DEFAULT_DB, batch_size=1000):
+        self.db_name = db_name
+        self.batch_size = batch_size
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_name, check_same_thread=False, isolation_level=None)
+        for pragma in self.PRAGMAS:
+            self.conn.execute(pragma)
+        self.init_db()
+
+    def transaction(self):
+        """
+        Context manager running a block in one write transaction (BEGIN IMMEDIATE ... COMMIT).
+        """
+        return _Transaction(self)
+
+    def init_db(self):
+        """
+        Create the tables (if they don't exist yet) and migrate older databases.
+        """
+        with self.transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self.SCHEMA_VERSION:
+                return
+            for statement in _split_sql(SCHEMA):
+                conn.execute(statement)
+            has_legacy = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_results'"
+            ).fetchone()
+            if has_legacy:
+                for statement in _split_sql(MIGRATE_SEARCH_RESULTS):
+                    conn.execute(statement)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(listings)")]
+            if "description" not in columns:
+                conn.execute("ALTER TABLE listings ADD COLUMN description TEXT")
+            if "cluster_id" not in columns:
+                conn.execute("ALTER TABLE listings ADD COLUMN cluster_id INTEGER")
+            has_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'listings_fts'"
+            ).fetchone()
+            for statement in FTS_SCHEMA:
+                conn.execute(statement)
+            conn.execute("DROP TRIGGER IF EXISTS listings_fts_insert")
+            if not has_fts:
+                conn.execute("INSERT INTO listings_fts (listings_fts) VALUES ('rebuild')")
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def save_listings(self, listings, query, timestamp=None):
+        """
+        Saves listings into the DB in a single transaction.
+        Upserts each listing, records a price observation for new listings and price changes,
+        and links the listings to the search 'query'. Returns the number of saved listings.
+        """
+        if not listings:
+            return 0
+        return self.save_batches([(listings, query, timestamp)])
+
+    def save_batches(self, batches):
+        """
+        Saves several (listings, query, timestamp) batches in one transaction.
+        Batches with the same query and timestamp count as one search.
+        Returns the number of saved listings.
+        """
+        merged = {}
+        for listings, query, timestamp in batches:
+            if listings:
+                timestamp = int(time.time()) if timestamp is None else timestamp
+                merged.setdefault((query, timestamp), []).extend(listings)
+
+        saved = 0
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS incoming (
+                    listing_id INTEGER PRIMARY KEY, title TEXT, price REAL, state TEXT, city TEXT,
+                    description TEXT, cluster_id INTEGER
+                )
+            """)
+            for (query, timestamp), listings in merged.items():
+                saved += self._save(conn, listings, query, timestamp)
+        return saved
+
+    def _save(self, conn, listings, query, timestamp):
+        conn.execute("DELETE FROM temp.incoming")
+        batch = []
+        for item in listings:
+            row = _listing_row(item)
+            if row[0] is None:
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._stage_rows(batch)
+                batch = []
+        if batch:
+            self._stage_rows(batch)
+
+        saved = conn.execute("SELECT COUNT(*) FROM temp.incoming").fetchone()[0]
+        conn.execute("INSERT OR IGNORE INTO queries (query) VALUES (?)", (query,))
+        query_id = conn.execute("SELECT id FROM queries WHERE query = ?", (query,)).fetchone()[0]
+        search = conn.execute("SELECT id FROM searches WHERE query_id = ? AND timestamp = ?",
+                              (query_id, timestamp)).fetchone()
+        if search:
+            # More pages of a search that was already (partly) saved.
+            conn.execute("UPDATE searches SET result_count = result_count + ? WHERE id = ?", (saved, search[0]))
+        else:
+            conn.execute("INSERT INTO searches (query_id, timestamp, result_count) VALUES (?, ?, ?)",
+                         (query_id, timestamp, saved))
+        # Index new listings in one statement, before the upsert makes them indistinguishable.
+        conn.execute("""
+            INSERT INTO listings_fts (rowid, title, description)
+            SELECT i.listing_id, i.title, i.description
+            FROM temp.incoming i LEFT JOIN listings l ON l.listing_id = i.listing_id
+            WHERE l.listing_id IS NULL
+        """)
+        # Price observations must be written before the upsert overwrites the old price.
+        conn.execute("""
+            INSERT OR REPLACE INTO price_observations (listing_id, observed_at, price)
+            SELECT i.listing_id, ?, i.price
+            FROM temp.incoming i LEFT JOIN listings l ON l.listing_id = i.listing_id
+            WHERE l.listing_id IS NULL OR l.price IS NOT i.price
+        """, (timestamp,))
+        conn.execute("""
+            INSERT INTO listings (listing_id, title, price, state, city, description, cluster_id, first_seen, last_seen)
+            SELECT listing_id, title, price, state, city, description, cluster_id, ?1, ?1 FROM temp.incoming WHERE true
+            ON CONFLICT (listing_id) DO UPDATE SET
+                title = excluded.title,
+                price = excluded.price,
+                state = excluded.state,
+                city = excluded.city,
+                description = COALESCE(excluded.description, listings.description),
+                cluster_id = COALESCE(excluded.cluster_id, listings.cluster_id),
+                last_seen = excluded.last_seen
+        """, (timestamp,))
+        conn.execute("""
+            INSERT INTO query_listings (query_id, listing_id, first_seen, last_seen)
+            SELECT ?1, listing_id, ?2, ?2 FROM temp.incoming WHERE true
+            ON CONFLICT (query_id, listing_id) DO UPDATE SET last_seen = excluded.last_seen
+        """, (query_id, timestamp))
+        conn.execute("DELETE FROM temp.incoming")
+        return saved
+
+    def _stage_rows(self, rows):
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO temp.incoming (listing_id, title, price, state, city, description, cluster_id)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (listing_id, title, price, state, city, query, timestamp))
+        """, rows)
+
+    def get_history_for_query(self, query):
+        """
+        Retrieves the price history of every listing a query returned, newest first.
+        Rows are (listing_id, title, price, state, city, query, timestamp). Days that
+        pink_maintenance rolled up appear once, with the day's median price.
+        """
+        with self.lock:
+            return self.conn.execute("""
+                WITH history (listing_id, price, timestamp) AS (
+                    SELECT listing_id, price, observed_at FROM price_observations
+                    UNION ALL
+                    SELECT listing_id, median_price, day FROM daily_listing_prices
+                )
+                SELECT l.listing_id, l.title, h.price, l.state, l.city, q.query, h.timestamp
+                FROM queries q
+                JOIN query_listings ql ON ql.query_id = q.id
+                JOIN listings l ON l.listing_id = ql.listing_id
+                JOIN history h ON h.listing_id = ql.listing_id
+                WHERE q.query = ?
+                ORDER BY h.timestamp DESC
+            """, (query,)).fetchall()
+
+    def search_history(self, text, min_price=None, max_price=None, state=None, city=None, since=None, limit=50):
+        """
+        Full-text search over stored listings, best matches first.
+        Every word of 'text' must match the title or description (as a prefix, ignoring
+        diacritics). Results can be narrowed by price range, state, city and 'since' (only
+        listings seen at or after that timestamp).
+        Rows are (listing_id, title, price, state, city, last_seen).
+        """
+        match = _fts_query(text)
+        if not match:
+            return []
+        conditions = ["listings_fts MATCH ?"]
+        params = [match]
+        for clause, value in (("l.price >= ?", min_price), ("l.price <= ?", max_price),
+                              ("l.state = ?", state), ("l.city = ?", city), ("l.last_seen >= ?", since)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        params.append(limit)
+        with self.lock:
+            return self.conn.execute(f"""
+                SELECT l.listing_id, l.title, l.price, l.state, l.city, l.last_seen
+                FROM listings_fts
+                JOIN listings l ON l.listing_id = listings_fts.rowid
+                WHERE {" AND ".join(conditions)}
+                ORDER BY bm25(listings_fts, 2.0, 1.0)
+                LIMIT ?
+            """, params).fetchall()
+
+    def close(self):
+        """Close the connection."""
+        with self.lock:
+            self.conn.close()
+
+
+class BackgroundWriter:
+    """
+    Persists listings on a dedicated writer thread, so callers never wait on disk.
+
+    submit() only queues the listings. The writer thread collects submissions until
+    max_batch listings are pending or max_delay seconds have passed, and commits them in one
+    transaction through its own PinkStore connection. Once more than max_pending listings are
+    waiting, submit() blocks (back-pressure) until the writer catches up.
+    """
+
+    def __init__(self, db_name=DEFAULT_DB, max_batch=5000, max_delay=1.0, max_pending=100000):
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.last_error = None
+        self._pending = []
+        self._pending_count = 0
+        self._submitted = 0
+        self._committed = 0
+        self._failures = 0
+        self._closed = False
+        self._flush_wanted = False
+        self._cond = threading.Condition()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="PinkStoreWriter", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.last_error is not None:
+            raise self.last_error
+
+    def submit(self, listings, query, timestamp=None, timeout=None):
+        """
+        Queues listings for saving. Blocks while the queue is over max_pending.
+        Pages of one search should share the same timestamp.
+        Raises TimeoutError if the queue did not drain within timeout seconds.
+        """
+        if not listings:
+            return
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BackgroundWriter is closed.")
+            if not self._cond.wait_for(lambda: self._pending_count < self.max_pending or self._closed, timeout):
+                raise TimeoutError("Timed out waiting for the writer queue to drain.")
+            self._pending.append((list(listings), query, timestamp))
+            self._pending_count += len(listings)
+            self._submitted += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Waits until everything submitted so far is committed.
+        Returns False if timeout passed first, or if saving failed meanwhile (see last_error).
+        """
+        with self._cond:
+            target = self._submitted
+            failures = self._failures
+            self._flush_wanted = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: self._committed >= target, timeout)
+            return done and self._failures == failures
+
+    def close(self, timeout=None):
+        """Flushes pending listings, stops the writer thread and closes its connection."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            store = PinkStore(self.db_name)
+        except Exception as e:
+            self.last_error = e
+            self._closed = True
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._closed)
+                    if not self._pending:
+                        return
+                    # Give more pages max_delay seconds to arrive, unless a batch is full
+                    # or someone is waiting in flush()/close().
+                    self._cond.wait_for(
+                        lambda: self._closed or self._flush_wanted or self._pending_count >= self.max_batch,
+                        self.max_delay,
+                    )
+                    batches, self._pending = self._pending, []
+                    self._flush_wanted = False
+
+                failed = False
+                try:
+                    store.save_batches(batches)
+                except Exception as e:
+                    self.last_error = e
+                    failed = True
+                    print(f"[Store Error] {e}")
+
+                with self._cond:
+                    self._failures += failed
+                    self._pending_count -= sum(len(listings) for listings, _, _ in batches)
+                    self._committed += len(batches)
+                    self._cond.notify_all()
+        finally:
+            store.close()
+
+
+class _Transaction:
+    """Serializes access through the store lock and wraps the block in BEGIN IMMEDIATE/COMMIT."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __enter__(self):
+        self.store.lock.acquire()
+        try:
+            self.store.conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.store.lock.release()
+            raise
+        return self.store.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.store.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.store.lock.release()
+        return False
+
+
+def _fts_query(text):
+    """Turns free text into an FTS5 query: every word quoted and matched as a prefix."""
+    words = [word.replace('"', '""') for word in text.split()]
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _split_sql(script):
+    """Splits a script of ';'-terminated statements (no ';' inside literals)."""
+    return [statement.strip() for statement in script.split(";") if statement.strip()]
 
-    conn.commit()
-    conn.close()
 
-def get_history_for_query(query, db_name="pink_olx_data.db"):
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_name=DEFAULT_DB):
+    """
+    Returns the shared PinkStore for db_name, opening it on first use.
+    """
+    with _stores_lock:
+        store = _stores.get(db_name)
+        if store is None:
+            store = _stores[db_name] = PinkStore(db_name)
+        return store
+
+
+def init_db(db_name=DEFAULT_DB):
+    """
+    Initialize the local database (if not exists) and create the table.
+    """
+    get_store(db_name)
+
+
+def save_listings(listings, query, db_name=DEFAULT_DB):
+    """
+    Saves current listings into the DB.
+    Includes the search 'query' and a timestamp, so we can track history.
+    """
+    return get_store(db_name).save_listings(listings, query)
+
+
+def get_history_for_query(query, db_name=DEFAULT_DB):
     """
     Retrieves historical listing data for a given query. You can do more advanced queries or grouping.
     """
-    conn = sqlite3.connect(db_name)
-    c = conn.cursor()
-    c.execute("""
-        SELECT listing_id, title, price, state, city, query, timestamp 
-        FROM search_results
-        WHERE query = ?
-        ORDER BY timestamp DESC
-    """, (query,))
-
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    return get_store(db_name).get_history_for_query(query)
+
+
+def search_history(text, min_price=None, max_price=None, state=None, city=None, since=None, limit=50,
+                   db_name=DEFAULT_DB):
+    """
+    Full-text search over the stored listings, see PinkStore.search_history.
+    """
+    return get_store(db_name).search_history(text, min_price, max_price, state, city, since, limit)
@@ -0,0 +1,224 @@
+# Qt model/view classes for the results table
+
+# pink_table_model.py
+#
+# The table shows a ListingFrame through a QAbstractTableModel: nothing is created per row,
+# cell text is produced only for the rows the view actually paints. Filtering and sorting
+# happen in ListingProxyModel, which keeps the visible rows as a NumPy index array and sorts
+# it with argsort over the frame's precomputed columns instead of calling lessThan per pair.
+
+import numpy as np
+from PyQt5.QtCore import QAbstractProxyModel, QAbstractTableModel, QModelIndex, Qt
+
+from pink_olx_app.pink_olx_logic import ListingFrame
+
+COLUMNS = ("Title", "Price", "Condition", "Location")
+
+
+def _ranks(values):
+    """Rank of every value in case-insensitive order, as an int32 array."""
+    order = sorted(range(len(values)), key=lambda i: str(values[i] or "").lower())
+    ranks = np.empty(len(values), dtype=np.int32)
+    ranks[order] = np.arange(len(values), dtype=np.int32)
+    return ranks
+
+
+class ListingTableModel(QAbstractTableModel):
+    """
+    Read-only table over all rows of a ListingFrame (Title, Price, Condition, Location).
+    """
+
+    def __init__(self, frame=None, parent=None):
+        super().__init__(parent)
+        self.frame = frame if frame is not None else ListingFrame([])
+        self._sort_keys = {}
+
+    def set_frame(self, frame):
+        self.beginResetModel()
+        self.frame = frame
+        self._sort_keys = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.frame)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            if role == Qt.ToolTipRole and column != 0:
+                return None
+            item = self.frame.listings[index.row()]
+            if column == 0:
+                return item.get("title", "N/A")
+            if column == 1:
+                return str(item.get("price", "N/A"))
+            if column == 2:
+                return item.get("state", "N/A")
+            return (item.get("location") or {}).get("city", "N/A")
+        if role == Qt.TextAlignmentRole and column == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section] if 0 <= section < len(COLUMNS) else None
+        return str(section + 1)
+
+    def sort_key(self, column):
+        """
+        Per-row array that orders rows by a column: prices, or ranks of titles / condition /
+        city names. Built once per frame and column.
+        """
+        if column not in self._sort_keys:
+            frame = self.frame
+            if column == 0:
+                key = _ranks([item.get("title") for item in frame.listings])
+            elif column == 1:
+                key = frame.price
+            elif column == 2:
+                key = _ranks(frame.states)[frame.state_code]
+            else:
+                key = _ranks(frame.cities)[frame.city_code]
+            self._sort_keys[column] = key
+        return self._sort_keys[column]
+
+
+class ListingProxyModel(QAbstractProxyModel):
+    """
+    Shows a subset of a ListingTableModel's rows in a given order.
+
+    set_rows() takes the row indices from ListingFrame.filter_and_sort (or any other selection),
+    and sort() - called by the view when a header is clicked - reorders them with one stable
+    argsort of the column's sort key. Section -1 restores the order set_rows() was given.
+
+    Usage Example:
+        >>> model = ListingTableModel()
+        >>> proxy = ListingProxyModel()
+        >>> proxy.setSourceModel(model)
+        >>> view.setModel(proxy)
+        >>> proxy.set_frame(frame, frame.filter_and_sort(min_price=100))
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._base_rows = np.empty(0, dtype=np.int64)
+        self._rows = self._base_rows
+        self._inverse = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def set_frame(self, frame, rows=None):
+        """Replaces the source frame and shows the given rows (default: all)."""
+        self.beginResetModel()
+        self.sourceModel().set_frame(frame)
+        self._set_rows(np.arange(len(frame)) if rows is None else rows)
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """Shows the given source rows, in that order (then re-applies the header sort, if any)."""
+        self.beginResetModel()
+        self._set_rows(rows)
+        self.endResetModel()
+
+    def _set_rows(self, rows):
+        self._base_rows = np.asarray(rows, dtype=np.int64)
+        self._rows = self._sorted(self._base_rows)
+        self._inverse = None
+
+    def _sorted(self, rows):
+        if self._sort_column < 0 or not len(rows):
+            return rows
+        key = self.sourceModel().sort_key(self._sort_column)[rows]
+        if self._sort_order == Qt.DescendingOrder:
+            key = -key
+        return rows[np.argsort(key, kind="stable")]
+
+    def rows(self):
+        """Source row indices in display order."""
+        return self._rows
+
+    def listings(self):
+        """Listing dicts of the visible rows, in display order."""
+        return self.sourceModel().frame.select(self._rows)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self._rows
+        self._sort_column = column
+        self._sort_order = order
+        self._rows = self._sorted(self._base_rows)
+        self._inverse = None
+
+        # Keep selections and the current index on the same listings.
+        persistent = self.persistentIndexList()
+        if persistent:
+            moved = [self.index(int(self._source_to_proxy()[old_rows[index.row()]]), index.column())
+                     for index in persistent]
+            self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def _source_to_proxy(self):
+        if self._inverse is None:
+            inverse = np.full(self.sourceModel().rowCount(), -1, dtype=np.int64)
+            inverse[self._rows] = np.arange(len(self._rows))
+            self._inverse = inverse
+        return self._inverse
+
+    # -- QAbstractProxyModel interface --
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < len(self._rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        source = self.sourceModel()
+        return 0 if parent.isValid() or source is None else source.columnCount()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(int(self._rows[proxy_index.row()]), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = int(self._source_to_proxy()[source_index.row()])
+        return self.index(row, source_index.column()) if row >= 0 else QModelIndex()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        return str(section + 1) if role == Qt.DisplayRole else None
+
+
+def size_columns(view, sample=200, padding=24, max_width=400):
+    """
+    Sets column widths from the text of up to 'sample' rows spread evenly over the model,
+    instead of resizeColumnsToContents, which measures every row.
+    """
+    model = view.model()
+    rows = model.rowCount()
+    metrics = view.fontMetrics()
+    # Rounded up, so e.g. 399 rows are sampled every 2nd row rather than all of them
+    sampled = range(0, rows, max(1, -(-rows // sample))) if rows else ()
+    header = view.horizontalHeader()
+    for column in range(model.columnCount()):
+        width = metrics.horizontalAdvance(str(model.headerData(column, Qt.Horizontal)))
+        for row in sampled:
+            text = model.data(model.index(row, column))
+            if text:
+                width = max(width, metrics.horizontalAdvance(str(text)))
+        header.resizeSection(column, min(width + padding, max_width))
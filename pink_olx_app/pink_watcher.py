@@ -0,0 +1,330 @@
+# Saved-search watcher with new listing / price drop / removal alerts
+
+# pink_watcher.py
+#
+# Saved searches are read from a JSON list, e.g.
+#   [{"name": "iphone", "query": "iphone 13", "interval": 600, "max_pages": 3},
+#    {"name": "golf", "query": "golf 7", "interval": 1800, "extra_params": {"sort_by": "date"}}]
+# and run with:
+#   python -m pink_olx_app.pink_watcher --config searches.json --jsonl events.jsonl
+
+import argparse
+import heapq
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from olx_api.search import Search
+from pink_olx_app.pink_store import DEFAULT_DB, PinkStore
+
+SavedSearch = namedtuple(
+    "SavedSearch",
+    ["name", "query", "interval", "jitter", "per_page", "max_pages", "category_id", "extra_params"],
+    defaults=(900, 0.1, 40, 5, None, None),
+)
+
+EVENT_TYPES = ("new", "price_drop", "removed")
+
+
+def load_saved_searches(path):
+    """Reads saved searches from a JSON file holding a list of SavedSearch field dicts."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [SavedSearch(**entry) for entry in json.load(f)]
+
+
+def _price(item):
+    try:
+        return float(item.get("price", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# -- Sinks --
+class StdoutSink:
+    """Prints one line per event."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, events):
+        with self._lock:
+            for event in events:
+                old = f" (was {event['old_price']})" if event.get("old_price") is not None else ""
+                print(f"[{event['type']}] {event['search']}: {event['title']} - {event['price']}{old}",
+                      file=self.stream)
+            self.stream.flush()
+
+
+class JsonlSink:
+    """Appends events to a JSON Lines file, one object per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, events):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+class WebhookSink:
+    """
+    Sends each search run's events as one JSON POST ({"events": [...]}).
+    With dry_run=True (the default) payloads are only collected in 'sent', which makes it a
+    stand-in for a real endpoint in tests and demos.
+    """
+
+    def __init__(self, url, dry_run=True, timeout=10):
+        self.url = url
+        self.dry_run = dry_run
+        self.timeout = timeout
+        self.sent = []
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+    def emit(self, events):
+        payload = {"events": list(events)}
+        with self._lock:
+            self.sent.append(payload)
+        if self.dry_run:
+            return
+        try:
+            requests.post(self.url, json=payload, timeout=self.timeout).raise_for_status()
+        except requests.RequestException as e:
+            self.logger.warning("Webhook %s failed: %s", self.url, e)
+
+
+# -- Store comparison --
+def store_query(search):
+    """
+    Query key a saved search's results are stored and compared under: the query text plus a hash
+    of its filters (Search.search_key), so two saved searches with the same text but different
+    filters, or a GUI search for that text, don't share their known listings.
+    """
+    key = Search.search_key(search.query, search.category_id, extra_params=search.extra_params)
+    return f"{search.query} #{key}"
+
+
+def query_snapshot(store, query):
+    """
+    Returns (known, latest): listing ids the query has ever returned, and
+    {listing_id: (price, title)} of the listings its most recent stored search returned.
+    """
+    with store.lock:
+        query_id = store.conn.execute("SELECT id FROM queries WHERE query = ?", (query,)).fetchone()
+        if not query_id:
+            return set(), {}
+        known = {row[0] for row in store.conn.execute(
+            "SELECT listing_id FROM query_listings WHERE query_id = ?", query_id)}
+        latest = {listing_id: (price, title) for listing_id, price, title in store.conn.execute("""
+            SELECT l.listing_id, l.price, l.title
+            FROM query_listings ql JOIN listings l ON l.listing_id = ql.listing_id
+            WHERE ql.query_id = ?1
+              AND ql.last_seen = (SELECT MAX(timestamp) FROM searches WHERE query_id = ?1)
+        """, query_id)}
+    return known, latest
+
+
+def diff_results(search, listings, known, latest, complete, now):
+    """
+    Compares a fresh result set with the stored snapshot and returns the events.
+    Removals are only reported for complete crawls: a listing missing from a crawl that was cut
+    off at max_pages may just be on a later page.
+    """
+    events = []
+
+    def event(event_type, listing_id, title, price, old_price=None):
+        events.append({
+            "type": event_type, "search": search.name, "query": search.query, "listing_id": listing_id,
+            "title": title, "price": price, "old_price": old_price, "at": now,
+        })
+
+    current = {}
+    for item in listings:
+        listing_id = item.get("id")
+        price = _price(item)
+        current[listing_id] = price
+        if listing_id not in known:
+            event("new", listing_id, item.get("title"), price)
+        elif listing_id in latest and 0 < price < (latest[listing_id][0] or 0):
+            event("price_drop", listing_id, item.get("title"), price, latest[listing_id][0])
+    if complete:
+        for listing_id in latest.keys() - current.keys():
+            old_price, title = latest[listing_id]
+            event("removed", listing_id, title, None, old_price)
+    return events
+
+
+class Watcher:
+    """
+    Runs saved searches on their own intervals (with random jitter, so they don't all hit the
+    API at once), several at a time on one shared Search client. Each result set is compared
+    with what pink_store holds for the query and its filters (see store_query), then saved. New listings, price drops and
+    removals are sent to the sinks.
+
+    Usage Example:
+        >>> watcher = Watcher(load_saved_searches("searches.json"), sinks=[StdoutSink()])
+        >>> watcher.run_forever()
+    """
+
+    def __init__(self, searches, sinks=(), search_api=None, db_name=DEFAULT_DB, max_workers=4,
+                 clock=time.time, seed=None):
+        """
+        :param searches: Iterable of SavedSearch.
+        :param sinks: Objects with an emit(events) method.
+        :param search_api: (Optional) Shared Search instance; an anonymous one is created if omitted.
+        :param db_name: History DB the results are compared with and saved to.
+        :param max_workers: Number of searches run concurrently.
+        :param clock: Callable returning the current unix time (injectable for tests).
+        :param seed: (Optional) Seed for the jitter.
+        """
+        self.searches = {search.name: search for search in searches}
+        self.sinks = list(sinks)
+        self.search_api = search_api or Search(token=None)
+        self.store = PinkStore(db_name)
+        self.max_workers = max_workers
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._stop = threading.Event()
+        self._queue = [(self.clock(), name) for name in self.searches]
+        heapq.heapify(self._queue)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.addHandler(logging.NullHandler())
+
+    def _next_run(self, search, now):
+        jitter = search.interval * search.jitter
+        return now + search.interval + self._random.uniform(-jitter, jitter)
+
+    def run_search(self, search):
+        """
+        Crawls one saved search, diffs it against the store, saves it and emits its events.
+        Returns a report dict.
+        """
+        start = time.perf_counter()
+        listings, pages, complete = [], 0, True
+        try:
+            for page in self.search_api.iter_search_pages(search.query, search.category_id,
+                                                          per_page=search.per_page, extra_params=search.extra_params,
+                                                          max_pages=search.max_pages, raise_errors=True):
+                listings.extend(page)
+                pages += 1
+                # Pages stop at a short page, at last_page or at max_pages; only the last can leave results out.
+                complete = len(page) < search.per_page or search.max_pages is None or pages < search.max_pages
+        except Exception as e:
+            if not pages:
+                raise
+            # Keep the pages read so far, but don't report the rest as removed.
+            self.logger.warning("Search %s stopped after %d pages: %s", search.name, pages, e)
+            complete = False
+
+        now = int(self.clock())
+        query = store_query(search)
+        known, latest = query_snapshot(self.store, query)
+        events = diff_results(search, listings, known, latest, complete, now)
+        self.store.save_listings(listings, query, timestamp=now)
+        if events:
+            for sink in self.sinks:
+                try:
+                    sink.emit(events)
+                except Exception as e:
+                    self.logger.warning("Sink %s failed: %s", sink.__class__.__name__, e)
+        return {
+            "search": search.name, "listings": len(listings), "pages": pages, "complete": complete,
+            "events": len(events), "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def due_searches(self, now):
+        """Pops and returns the searches due at 'now', rescheduling each one."""
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            _, name = heapq.heappop(self._queue)
+            search = self.searches[name]
+            due.append(search)
+            heapq.heappush(self._queue, (self._next_run(search, now), name))
+        return due
+
+    def run_cycle(self, now=None):
+        """
+        Runs every due search concurrently. Returns a report with per-search results and the
+        latency of the whole cycle.
+        """
+        now = self.clock() if now is None else now
+        due = self.due_searches(now)
+        start = time.perf_counter()
+        results = []
+        if due:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as pool:
+                for search, future in [(search, pool.submit(self.run_search, search)) for search in due]:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        self.logger.warning("Search %s failed: %s", search.name, e)
+                        results.append({"search": search.name, "error": str(e)})
+        report = {"searches": results, "cycle_seconds": round(time.perf_counter() - start, 3)}
+        if due:
+            self.logger.info("Cycle: %d searches, %d events in %.3fs", len(due),
+                             sum(result.get("events", 0) for result in results), report["cycle_seconds"])
+        return report
+
+    def seconds_until_next(self, now=None):
+        now = self.clock() if now is None else now
+        return max(0.0, self._queue[0][0] - now) if self._queue else None
+
+    def run_forever(self):
+        """Runs cycles until stop() is called."""
+        while not self._stop.is_set():
+            self.run_cycle()
+            wait = self.seconds_until_next()
+            if wait is None:
+                break
+            self._stop.wait(wait)
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self.stop()
+        self.store.close()
+
+
+def main():
+    """Command line entry point; watches saved searches until interrupted."""
+    parser = argparse.ArgumentParser(description="Watch saved OLX searches and report changes.")
+    parser.add_argument("--config", required=True, help="JSON file with the saved searches.")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--jsonl", default=None, help="Append events to this JSON Lines file.")
+    parser.add_argument("--webhook", default=None, help="POST events to this URL.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--once", action="store_true", help="Run every search once and exit.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    sinks = [StdoutSink()]
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook, dry_run=False))
+    watcher = Watcher(load_saved_searches(args.config), sinks=sinks, db_name=args.db, max_workers=args.workers)
+    try:
+        if args.once:
+            print(f"[Watcher] {watcher.run_cycle()}")
+        else:
+            watcher.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+# Fake OLX API responses shared by the tests that patch requests.get
+
+from unittest.mock import Mock
+
+
+def make_response(data, total, last_page):
+    """A requests response whose JSON is one page of search results."""
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {"data": data, "meta": {"total": total, "last_page": last_page}}
+    return response
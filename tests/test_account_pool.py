@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from olx_api.account_pool import AccountPool
+from olx_api.search import Search
+
+
+def make_auth(username):
+    auth = Mock()
+    auth.username = username
+    auth.device_name = "integration"
+    auth.user = {"username": username}
+    auth.login.return_value = f"token-{username}"
+    return auth
+
+
+class TestAccountPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = AccountPool([make_auth("shop1"), make_auth("shop2")], cache_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reader_round_robin(self):
+        tokens = [self.pool.reader(Search).token for _ in range(4)]
+        self.assertEqual(tokens, ["token-shop1", "token-shop2", "token-shop1", "token-shop2"])
+
+    def test_writer_routes_to_owner(self):
+        self.pool.register_listing(40, "shop2")
+        self.assertEqual(self.pool.writer(40).token, "token-shop2")
+        with self.assertRaises(KeyError):
+            self.pool.writer(41)
+        with self.assertRaises(KeyError):
+            self.pool.register_listing(41, "shop3")
+
+    @patch('olx_api.users.requests.get')
+    def test_load_ownership(self, mock_get):
+        def fake_get(url, headers=None, params=None):
+            response = Mock()
+            response.raise_for_status.return_value = None
+            listing_id = 1 if "shop1" in url else 2
+            response.json.return_value = {"data": [{"id": listing_id}], "meta": {"last_page": 1}}
+            return response
+
+        mock_get.side_effect = fake_get
+        self.pool.load_ownership()
+        self.assertEqual(self.pool.owner_of(1).name, "shop1")
+        self.assertEqual(self.pool.owner_of(2).name, "shop2")
+
+    @patch('olx_api.users.requests.get')
+    def test_load_ownership_without_login_uses_profile(self, mock_get):
+        # Logged in with an email and a cached token: no user from the login response.
+        auth = make_auth("shop1@olx.ba")
+        auth.user = None
+        pool = AccountPool([auth], cache_dir=self.tmp_dir.name)
+
+        def fake_get(url, headers=None, params=None):
+            response = Mock()
+            response.raise_for_status.return_value = None
+            if url.endswith("/me"):
+                response.json.return_value = {"data": {"id": 7, "username": "shop1"}}
+            else:
+                response.json.return_value = {"data": [{"id": 5}] if "/users/shop1/" in url else [],
+                                              "meta": {"last_page": 1}}
+            return response
+
+        mock_get.side_effect = fake_get
+        pool.load_ownership()
+        pool.load_ownership()
+
+        self.assertEqual(pool.owner_of(5).name, "shop1@olx.ba")
+        self.assertEqual(pool.accounts[0].username, "shop1")
+        # The profile is read once, not on every load.
+        self.assertEqual(sum(call.args[0].endswith("/me") for call in mock_get.call_args_list), 1)
+
+    @patch('olx_api.listings.requests.put')
+    @patch('olx_api.listings.requests.get')
+    def test_refresh_uses_owner_quota(self, mock_get, mock_put):
+        def fake_get(url, headers=None):
+            response = Mock()
+            response.raise_for_status.return_value = None
+            if url.endswith("/listing/refresh/limits"):
+                free_count = 9 if headers["Authorization"] == "Bearer token-shop1" else 0
+                response.json.return_value = {"free_limit": 10, "free_count": free_count, "paid_count": 0}
+            elif url.endswith("/listing-limits"):
+                response.json.return_value = {"data": [{"category": "Vozila", "limit": 5}]}
+            else:
+                response.json.return_value = {}
+            return response
+
+        mock_get.side_effect = fake_get
+        put_response = Mock()
+        put_response.raise_for_status.return_value = None
+        put_response.json.return_value = {"message": "refreshed"}
+        mock_put.return_value = put_response
+
+        self.pool.update_quotas()
+        self.assertEqual(self.pool.quotas(), {"shop1": 1, "shop2": 10})
+        self.assertEqual(self.pool.accounts[0].listing_limits, {"data": [{"category": "Vozila", "limit": 5}]})
+
+        self.pool.register_listing(1, "shop1")
+        self.pool.register_listing(2, "shop1")
+        self.pool.register_listing(3, "shop2")
+        results = self.pool.refresh_many([1, 2, 3])
+
+        self.assertEqual(results[1], {"message": "refreshed"})
+        self.assertIsNone(results[2])
+        self.assertEqual(results[3], {"message": "refreshed"})
+        self.assertEqual(self.pool.quotas(), {"shop1": 0, "shop2": 9})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch, Mock
+
+from olx_api.pagination import BloomFilter, CompactIdSet, ConsistentPaginator
+from olx_api.search import Search
+
+
+class LiveServer:
+    """Serves self.listings in pages; 'changes' maps a request number to a callback run before it."""
+
+    def __init__(self, listings, changes=None):
+        self.listings = listings
+        self.changes = changes or {}
+        self.requests = 0
+
+    def get(self, url, headers=None, params=None):
+        self.requests += 1
+        if self.requests in self.changes:
+            self.changes[self.requests](self.listings)
+        page, per_page = params["page"], params["per_page"]
+        response = Mock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = {
+            "data": self.listings[(page - 1) * per_page:page * per_page],
+            "meta": {"total": len(self.listings)},
+        }
+        return response
+
+
+class TestIdSets(unittest.TestCase):
+    def test_compact_id_set(self):
+        ids = CompactIdSet(buffer_size=4)
+        self.assertTrue(all(ids.add(listing_id) for listing_id in range(100, 0, -3)))
+        self.assertFalse(ids.add(97))
+        self.assertIn(4, ids)
+        self.assertNotIn(5, ids)
+        self.assertEqual(len(ids), 34)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        ids = BloomFilter(capacity=1000, error_rate=0.01)
+        for listing_id in range(1000):
+            ids.add(listing_id)
+        self.assertTrue(all(listing_id in ids for listing_id in range(1000)))
+        false_positives = sum(listing_id in ids for listing_id in range(1000, 11000))
+        self.assertLess(false_positives, 300)
+
+
+class TestConsistentPaginator(unittest.TestCase):
+    def setUp(self):
+        self.api = Search(token="dummy_token")
+        self.listings = [{"id": listing_id} for listing_id in range(100, 80, -1)]
+
+    @patch('olx_api.search.requests.get')
+    def test_stable_results(self, mock_get):
+        mock_get.side_effect = LiveServer(self.listings).get
+        paginator = ConsistentPaginator(self.api, per_page=5)
+
+        result = paginator.crawl("iphone")
+
+        self.assertEqual(result, self.listings)
+        self.assertEqual(paginator.report["consistency"], 1.0)
+        self.assertEqual(paginator.report["shifts"], [])
+
+    @patch('olx_api.search.requests.get')
+    def test_inserted_listings_are_deduplicated(self, mock_get):
+        def publish(listings):
+            listings[0:0] = [{"id": 102}, {"id": 101}]
+
+        # Two new listings appear before page 3 is read.
+        server = LiveServer(list(self.listings), {3: publish})
+        mock_get.side_effect = server.get
+        paginator = ConsistentPaginator(self.api, per_page=5)
+
+        result = paginator.crawl("iphone")
+
+        ids = [item["id"] for item in result]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertTrue(set(item["id"] for item in self.listings) <= set(ids))
+        self.assertEqual(paginator.report["duplicates"], 2)
+        self.assertIn((3, 2), paginator.report["shifts"])
+        self.assertLess(paginator.report["consistency"], 1.0)
+
+    @patch('olx_api.search.requests.get')
+    def test_removed_listings_trigger_refetch(self, mock_get):
+        # Listing 100 is removed before page 3 is read: 90 slides from page 3 onto page 2.
+        server = LiveServer(list(self.listings), {3: lambda listings: listings.pop(0)})
+        mock_get.side_effect = server.get
+        paginator = ConsistentPaginator(self.api, per_page=5)
+
+        result = paginator.crawl("iphone")
+
+        self.assertIn(90, [item["id"] for item in result])
+        self.assertEqual(paginator.report["refetched"], [2])
+        self.assertEqual(paginator.report["recovered"], 1)
+        self.assertEqual(paginator.report["missing_estimate"], 0)
+
+    @patch('olx_api.search.requests.get')
+    def test_removed_listings_without_refetch_are_reported_missing(self, mock_get):
+        server = LiveServer(list(self.listings), {3: lambda listings: listings.pop(0)})
+        mock_get.side_effect = server.get
+        paginator = ConsistentPaginator(self.api, per_page=5, refetch=False)
+
+        result = paginator.crawl("iphone")
+
+        self.assertNotIn(90, [item["id"] for item in result])
+        self.assertEqual(paginator.report["missing_estimate"], 1)
+        self.assertLess(paginator.report["consistency"], 1.0)
+
+    @patch('olx_api.search.requests.get')
+    def test_search_all_listings_consistent(self, mock_get):
+        mock_get.side_effect = LiveServer(self.listings).get
+
+        result = self.api.search_all_listings("iphone", per_page=5, consistent=True)
+
+        self.assertEqual(result, self.listings)
+        self.assertEqual(mock_get.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
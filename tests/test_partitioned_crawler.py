@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch, Mock
+
+from olx_api.partitioned_crawler import PartitionedCrawler
+from olx_api.search import Search
+
+
+class FakeServer:
+    """Filters a fixed listing set by price_from/price_to and pages through at most max_pages."""
+
+    def __init__(self, listings, max_pages):
+        self.listings = listings
+        self.max_pages = max_pages
+
+    def get(self, url, headers=None, params=None):
+        low, high = params.get("price_from", 0), params.get("price_to")
+        data = [item for item in self.listings
+                if item["price"] >= low and (high is None or item["price"] <= high)]
+        page, per_page = params["page"], params["per_page"]
+        last_page = -(-len(data) // per_page)
+        response = Mock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = {
+            "data": data[(page - 1) * per_page:page * per_page] if page <= self.max_pages else [],
+            "meta": {"total": len(data), "last_page": last_page},
+        }
+        return response
+
+
+class TestPartitionedCrawler(unittest.TestCase):
+    def setUp(self):
+        self.api = Search(token="dummy_token")
+        # 500 listings with decimal prices from 0 to about 4990, plus 30 at the same price.
+        self.listings = [{"id": i, "price": i * 9.98} for i in range(500)]
+        self.listings += [{"id": 1000 + i, "price": 250} for i in range(30)]
+
+    @patch('olx_api.search.requests.get')
+    def test_crawl_fetches_every_listing_once(self, mock_get):
+        mock_get.side_effect = FakeServer(self.listings, max_pages=5).get
+        crawler = PartitionedCrawler(self.api, per_page=10, max_pages=5, first_split=1000)
+
+        result = crawler.crawl("iphone")
+
+        self.assertEqual(sorted(item["id"] for item in result), sorted(item["id"] for item in self.listings))
+        self.assertEqual(crawler.report["expected"], len(self.listings))
+        self.assertEqual(crawler.report["fetched"], len(self.listings))
+        self.assertEqual(crawler.report["capped"], [])
+        self.assertGreater(crawler.report["partitions"], 1)
+
+    @patch('olx_api.search.requests.get')
+    def test_root_band_is_counted_once(self, mock_get):
+        mock_get.side_effect = FakeServer(self.listings, max_pages=5).get
+        crawler = PartitionedCrawler(self.api, per_page=10, max_pages=5)
+
+        crawler.crawl("iphone", category_ids=[10, 20])
+
+        root_counts = [call for call in mock_get.call_args_list
+                       if call.kwargs["params"]["per_page"] == 1 and "price_to" not in call.kwargs["params"]
+                       and call.kwargs["params"]["price_from"] == 0]
+        self.assertEqual(len(root_counts), 2)
+        self.assertEqual(crawler.report["expected"], 2 * len(self.listings))
+
+    @patch('olx_api.search.requests.get')
+    def test_listings_without_id_are_skipped(self, mock_get):
+        listings = [{"id": i, "price": i * 10} for i in range(20)]
+        listings += [{"id": None, "price": 55}, {"price": 65}]
+        mock_get.side_effect = FakeServer(listings, max_pages=5).get
+        crawler = PartitionedCrawler(self.api, per_page=10, max_pages=5)
+
+        result = crawler.crawl("iphone")
+
+        self.assertEqual(sorted(item["id"] for item in result), list(range(20)))
+        self.assertEqual((crawler.report["without_id"], crawler.report["duplicates"]), (2, 0))
+
+    @patch('olx_api.search.requests.get')
+    def test_plan_partitions_fit_capacity(self, mock_get):
+        mock_get.side_effect = FakeServer(self.listings, max_pages=5).get
+        crawler = PartitionedCrawler(self.api, per_page=10, max_pages=5)
+
+        partitions = crawler.plan("iphone")
+
+        self.assertTrue(all(total <= crawler.capacity for _, _, _, total in partitions))
+        # Empty bands are dropped; the rest meet at shared boundary prices.
+        bands = sorted((low, high) for _, low, high, _ in partitions)
+        self.assertEqual(bands[0][0], 0)
+        self.assertTrue(all(high == next_low for (_, high), (next_low, _) in zip(bands, bands[1:])))
+        self.assertGreaterEqual(sum(total for _, _, _, total in partitions), len(self.listings))
+
+    @patch('olx_api.search.requests.get')
+    def test_single_price_over_capacity_is_reported(self, mock_get):
+        listings = [{"id": i, "price": 100} for i in range(60)]
+        mock_get.side_effect = FakeServer(listings, max_pages=5).get
+        crawler = PartitionedCrawler(self.api, per_page=10, max_pages=5)
+
+        result = crawler.crawl("iphone")
+
+        self.assertEqual(len(result), 50)
+        self.assertTrue(crawler.report["capped"])
+        self.assertEqual(crawler.report["expected"], 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from pink_olx_app import pink_analytics
+from pink_olx_app.pink_store import PinkStore
+
+DAY = 86400
+D0, D1, D2 = 10 * DAY, 11 * DAY, 12 * DAY
+
+
+def listing(listing_id, price, city):
+    return {"id": listing_id, "title": f"listing {listing_id}", "price": price, "state": "used",
+            "location": {"city": city}}
+
+
+class TestPinkAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = PinkStore(os.path.join(self.tmp_dir.name, "history.db"))
+        # Listing 3 disappears after day 0, listing 2 after day 1; listing 1 drops its price on day 1.
+        self.store.save_listings([listing(1, 100, "Sarajevo"), listing(2, 200, "Sarajevo"),
+                                  listing(3, 300, "Mostar")], "phone", timestamp=D0 + 100)
+        self.store.save_listings([listing(1, 80, "Sarajevo"), listing(2, 200, "Sarajevo"),
+                                  listing(4, 400, "Mostar")], "phone", timestamp=D1 + 100)
+        self.store.save_listings([listing(1, 80, "Sarajevo"), listing(4, 400, "Mostar"),
+                                  listing(5, 50, "Sarajevo")], "phone", timestamp=D2 + 100)
+        self.store.save_listings([listing(9, 999, "Tuzla")], "tablet", timestamp=D0 + 50)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_daily_price_percentiles(self):
+        result = pink_analytics.daily_price_percentiles(self.store, "phone")
+
+        self.assertEqual(result, {
+            "day": (D0, D1, D2),
+            "listings": (3, 3, 3),
+            "min_price": (100, 80, 50),
+            "p10": (100, 80, 50),
+            "p25": (100, 80, 50),
+            "p50": (200, 200, 80),
+            "p75": (300, 400, 400),
+            "p90": (300, 400, 400),
+            "max_price": (300, 400, 400),
+        })
+        until = pink_analytics.daily_price_percentiles(self.store, "phone", until=D1, percentiles=(0.5,))
+        self.assertEqual(until, {"day": (D0,), "listings": (3,), "min_price": (100,), "p50": (200,),
+                                 "max_price": (300,)})
+
+    def test_daily_price_percentiles_use_rolled_up_prices(self):
+        # Day 1 and 2 prices of listing 1 rolled up into one row per day.
+        self.store.conn.execute("DELETE FROM price_observations WHERE listing_id = 1 AND observed_at > ?", (D0 + 100,))
+        self.store.conn.executemany("INSERT INTO daily_listing_prices (listing_id, day, median_price, observations) "
+                                    "VALUES (1, ?, 80, 1)", [(D1,), (D2,)])
+
+        result = pink_analytics.daily_price_percentiles(self.store, "phone")
+        self.assertEqual(result["min_price"], (100, 80, 50))
+        self.assertEqual(result["listings"], (3, 3, 3))
+
+    def test_unknown_query_returns_empty_columns(self):
+        result = pink_analytics.daily_price_percentiles(self.store, "bicikl")
+        self.assertEqual(result["day"], ())
+        self.assertEqual(pink_analytics.listing_churn(self.store, "bicikl")["new"], ())
+
+    def test_listing_churn(self):
+        self.assertEqual(pink_analytics.listing_churn(self.store, "phone"), {
+            "day": (D0, D1, D2),
+            "searches": (1, 1, 1),
+            "result_count": (3, 3, 3),
+            "new": (3, 1, 1),
+            "disappeared": (1, 1, 0),
+            "active": (3, 3, 3),
+        })
+        # Active counts still include listings that appeared before `since`.
+        since = pink_analytics.listing_churn(self.store, "phone", since=D1)
+        self.assertEqual((since["day"], since["active"]), ((D1, D2), (3, 3)))
+
+    def test_time_to_sell(self):
+        self.assertEqual(pink_analytics.time_to_sell(self.store, "phone"),
+                         {"sold": (2,), "median_days": (0.5,), "p25_days": (0.0,), "p75_days": (1.0,)})
+        self.assertEqual(pink_analytics.time_to_sell(self.store, "phone", since=D1)["sold"], (1,))
+        # Listing 9 is still returned by the latest "tablet" search.
+        self.assertEqual(pink_analytics.time_to_sell(self.store)["sold"], (2,))
+
+        by_city = pink_analytics.time_to_sell(self.store, "phone", by="city")
+        self.assertEqual(sorted(zip(by_city["city"], by_city["sold"], by_city["median_days"])),
+                         [("Mostar", 1, 0.0), ("Sarajevo", 1, 1.0)])
+        with self.assertRaises(ValueError):
+            pink_analytics.time_to_sell(self.store, by="title")
+
+    def test_city_breakdown(self):
+        self.assertEqual(pink_analytics.city_breakdown(self.store, "phone"), {
+            "city": ("Sarajevo", "Mostar"),
+            "listings": (3, 2),
+            "active": (2, 1),
+            "sold": (1, 1),
+            "min_price": (50, 300),
+            "median_price": (80, 350),
+            "max_price": (200, 400),
+            "median_days_to_sell": (1.0, 0.0),
+        })
+        self.assertEqual(pink_analytics.city_breakdown(self.store)["city"], ("Sarajevo", "Mostar", "Tuzla"))
+        # Only listings seen since day 2.
+        recent = pink_analytics.city_breakdown(self.store, "phone", since=D2)
+        self.assertEqual((recent["city"], recent["listings"], recent["sold"]),
+                         (("Sarajevo", "Mostar"), (2, 1), (0, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from pink_olx_app.pink_anomaly import (
+    OVERPRICED,
+    UNDERPRICED,
+    detect_anomalies,
+    detect_store_anomalies,
+    score_prices,
+    underpriced,
+)
+from pink_olx_app.pink_store import PinkStore
+
+
+def listing(listing_id, price, title="iPhone 13 128GB", category_id=10, state="used"):
+    return {"id": listing_id, "title": title, "price": price, "category_id": category_id, "state": state,
+            "location": {"city": "Sarajevo"}}
+
+
+class TestScorePrices(unittest.TestCase):
+    def test_robust_z_score(self):
+        prices = np.array([90.0, 95, 100, 105, 110, 1000])
+        result = score_prices(prices, np.zeros(6, dtype=np.int64))
+
+        # Median 102.5, MAD 7.5: the outlier barely moves either.
+        self.assertEqual((result.median[0], result.mad[0]), (102.5, 7.5))
+        self.assertAlmostEqual(result.score[5], (1000 - 102.5) / (7.5 / 0.6745))
+        self.assertAlmostEqual(result.score[2], (100 - 102.5) / (7.5 / 0.6745))
+
+    def test_rows_without_price_are_not_scored(self):
+        prices = np.array([0.0, 100, 110, 120, 130, 140, -5])
+        result = score_prices(prices, np.zeros(7, dtype=np.int64))
+        self.assertTrue(math.isnan(result.score[0]) and math.isnan(result.score[6]))
+        self.assertEqual(np.isnan(result.score[1:6]).sum(), 0)
+        self.assertTrue(np.isnan(score_prices(np.zeros(3), np.zeros(3, dtype=np.int64)).score).all())
+
+    def test_tiny_group_falls_back_to_all_prices(self):
+        # Group 0 has five prices, group 1 only two.
+        prices = np.array([100.0, 110, 120, 130, 140, 115, 125])
+        groups = np.array([0, 0, 0, 0, 0, 1, 1])
+        result = score_prices(prices, groups, min_group_size=5)
+
+        overall = score_prices(prices, np.zeros(7, dtype=np.int64), min_group_size=5)
+        np.testing.assert_allclose(result.score[5:], overall.score[5:])
+        self.assertEqual(result.median[5], 120.0)
+        self.assertEqual(result.median[0], 120.0)
+        # The big group is still scored on its own.
+        self.assertAlmostEqual(result.mad[0], 10.0)
+        self.assertEqual(result.group.tolist(), groups.tolist())
+
+        # Fewer priced rows than min_group_size in total: nothing is scored.
+        self.assertTrue(np.isnan(score_prices(prices[:4], groups[:4], min_group_size=5).score).all())
+
+    def test_zero_mad_falls_back_to_iqr(self):
+        # More than half the prices are equal: MAD 0, IQR 425 -> 500.
+        prices = np.array([100.0, 200, 500, 500, 500, 500, 500, 900])
+        result = score_prices(prices, np.zeros(8, dtype=np.int64))
+
+        self.assertEqual((result.mad[0], result.q1[0], result.q3[0]), (0.0, 425.0, 500.0))
+        self.assertAlmostEqual(result.score[7], 400 / (75 / 1.349))
+        self.assertEqual(result.score[2], 0.0)
+
+    def test_zero_mad_and_iqr_fall_back_to_mean_deviation(self):
+        prices = np.array([100.0] * 9 + [1000.0])
+        result = score_prices(prices, np.zeros(10, dtype=np.int64))
+
+        self.assertEqual((result.mad[0], result.q1[0], result.q3[0]), (0.0, 100.0, 100.0))
+        self.assertAlmostEqual(result.score[9], 900 / (90 * 1.2533))
+        self.assertEqual(result.score[0], 0.0)
+
+    def test_all_equal_prices_are_not_scored(self):
+        result = score_prices(np.full(6, 250.0), np.zeros(6, dtype=np.int64))
+        self.assertTrue(np.isnan(result.score).all())
+
+
+class TestDetectAnomalies(unittest.TestCase):
+    def setUp(self):
+        prices = [900, 950, 980, 1000, 1000, 1020, 1050, 1100]
+        self.listings = [listing(listing_id, price) for listing_id, price in enumerate(prices)]
+
+    def test_clear_outliers_are_flagged(self):
+        listings = self.listings + [listing(8, 150), listing(9, 5000)]
+        result = detect_anomalies(listings)
+
+        self.assertEqual(result.flag[8], UNDERPRICED)
+        self.assertEqual(result.flag[9], OVERPRICED)
+        self.assertEqual(np.count_nonzero(result.flag), 2)
+        rows, _ = underpriced(listings)
+        self.assertEqual(rows.tolist(), [8])
+
+    def test_groups_are_scored_separately(self):
+        # 150 is normal for cases (category 20), even though it is far below the phones.
+        cases = [listing(listing_id, price, "Maska iPhone 13", category_id=20)
+                 for listing_id, price in zip(range(10, 16), [140, 150, 150, 160, 170, 155])]
+        result = detect_anomalies(self.listings + cases)
+        self.assertEqual(np.count_nonzero(result.flag), 0)
+        self.assertEqual((result.median[0], result.median[-1]), (1000.0, 152.5))
+
+    def test_tiny_group_is_compared_with_all_listings(self):
+        # Only one new phone: too few to judge on its own, but far below all other prices.
+        listings = self.listings + [listing(8, 100, state="new")]
+        result = detect_anomalies(listings, group_by=("category", "state"))
+        self.assertEqual(result.flag[8], UNDERPRICED)
+
+    def test_unknown_group_key(self):
+        with self.assertRaises(ValueError):
+            detect_anomalies(self.listings, group_by=("color",))
+
+    def test_store_anomalies(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = PinkStore(os.path.join(tmp_dir, "history.db"))
+            try:
+                store.save_listings(self.listings + [listing(8, 90)], "iphone", timestamp=1000)
+                store.save_listings([listing(20, 10, "Maska")], "maska", timestamp=1000)
+                frame, result = detect_store_anomalies(store, query="iphone")
+            finally:
+                store.close()
+
+        self.assertEqual(len(frame), 9)
+        flagged = [frame.listings[row]["id"] for row in np.flatnonzero(result.flag == UNDERPRICED)]
+        self.assertEqual(flagged, [8])
+
+
+if __name__ == '__main__':
+    unittest.main()
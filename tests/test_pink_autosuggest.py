@@ -0,0 +1,177 @@
+import threading
+import unittest
+from unittest.mock import Mock
+
+from pink_olx_app.pink_autosuggest import AutosuggestService, SuggestionCache, filter_suggestions
+
+
+def response(*texts):
+    return {"autocomplete": list(texts), "categories": [{"name": "Mobiteli"}]}
+
+
+class TestSuggestionCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.cache = SuggestionCache(max_entries=3, ttl=60, clock=lambda: self.now)
+
+    def test_ttl_expiry(self):
+        self.cache.put("iPhone ", response("iphone 13"))
+        self.assertEqual(self.cache.get("iphone"), response("iphone 13"))
+
+        self.now += 61
+        self.assertIsNone(self.cache.get("iphone"))
+        self.assertEqual(self.cache.longest_prefix("iphone 13"), (None, None))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_longest_prefix_skips_expired_entries(self):
+        self.cache.put("ip", response("ipad"))
+        self.now += 30
+        self.cache.put("iph", response("iphone"))
+        self.assertEqual(self.cache.longest_prefix("ipho")[0], "iph")
+
+        self.now += 40
+        # "ip" expired, "iph" is still fresh.
+        self.assertEqual(self.cache.longest_prefix("ipho")[0], "iph")
+        self.now += 30
+        self.assertEqual(self.cache.longest_prefix("ipho"), (None, None))
+
+    def test_lru_eviction(self):
+        for query in ("a", "b", "c"):
+            self.cache.put(query, response(query))
+        self.cache.get("a")
+        self.cache.put("d", response("d"))
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.longest_prefix("bx"), (None, None))
+        self.assertIsNotNone(self.cache.get("a"))
+
+    def test_filter_suggestions(self):
+        data = {"autocomplete": ["iphone 13 pro", "iphone 12", "ipad pro"],
+                "categories": [{"name": "Mobiteli"}, {"name": "Tableti"}]}
+        self.assertEqual(filter_suggestions(data, "iphone 1"),
+                         {"autocomplete": ["iphone 13 pro", "iphone 12"], "categories": []})
+        self.assertEqual(filter_suggestions(data, "pro")["autocomplete"], ["iphone 13 pro", "ipad pro"])
+
+
+class TestAutosuggestService(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.cache = SuggestionCache(ttl=60, clock=lambda: self.now)
+        self.api = Mock()
+        self.results = []
+        self.delivered = threading.Event()
+        self.service = AutosuggestService(self.api, on_result=self.on_result, cache=self.cache, full_size=3)
+
+    def tearDown(self):
+        self.service.close()
+
+    def on_result(self, query, data):
+        self.results.append((query, data))
+        self.delivered.set()
+
+    def fetch(self, query):
+        self.delivered.clear()
+        data, source = self.service.request(query)
+        self.assertTrue(self.delivered.wait(5))
+        return data, source
+
+    def test_prefix_reuse(self):
+        self.api.autosuggest.return_value = response("iphone 13", "iphone 12")
+        self.assertEqual(self.fetch("ip"), (None, "partial"))
+
+        # Fewer than full_size suggestions: "iph" is answered from "ip" without a request.
+        data, source = self.service.request("iph")
+        self.assertEqual(source, "prefix")
+        self.assertEqual(data["autocomplete"], ["iphone 13", "iphone 12"])
+        self.assertEqual(self.service.request("iphone 13"), ({"autocomplete": ["iphone 13"], "categories": []},
+                                                              "prefix"))
+        self.assertEqual(self.service.request("ip")[1], "cache")
+        self.api.autosuggest.assert_called_once_with("ip")
+
+    def test_full_prefix_response_is_refetched(self):
+        self.api.autosuggest.return_value = response("iphone", "ipad", "ipod")
+        self.fetch("ip")
+
+        data, source = self.fetch("iph")
+        self.assertEqual(source, "partial")
+        # The filtered prefix suggestions are shown while the longer query is fetched.
+        self.assertEqual(data["autocomplete"], ["iphone"])
+        self.assertEqual(self.api.autosuggest.call_count, 2)
+
+    def test_empty_fallback_is_not_reused(self):
+        self.api.autosuggest.return_value = {}
+        self.fetch("ip")
+        self.assertIsNone(self.cache.get("ip"))
+
+        self.api.autosuggest.return_value = response("iphone 13")
+        self.assertEqual(self.fetch("iph"), (None, "partial"))
+        self.assertEqual(self.results[-1], ("iph", response("iphone 13")))
+
+    def test_errors_are_not_cached(self):
+        failed = threading.Event()
+
+        def autosuggest(query):
+            if not failed.is_set():
+                failed.set()
+                raise Exception("429 Too Many Requests")
+            return response("iphone 13")
+
+        self.api.autosuggest.side_effect = autosuggest
+        self.service.request("ip")
+        self.assertTrue(failed.wait(5))
+        self.assertEqual(self.fetch("ip"), (None, "partial"))
+        self.assertEqual(self.api.autosuggest.call_count, 2)
+
+    def test_cached_response_expires(self):
+        self.api.autosuggest.return_value = response("iphone 13")
+        self.fetch("ip")
+        self.now += 61
+        self.assertEqual(self.fetch("iph"), (None, "partial"))
+        self.assertEqual(self.api.autosuggest.call_count, 2)
+
+    def test_only_newest_query_is_fetched_and_delivered(self):
+        started, release = threading.Event(), threading.Event()
+        fetched = []
+
+        def autosuggest(query):
+            fetched.append(query)
+            if query == "i":
+                started.set()
+                release.wait(5)
+            return response(f"{query} result", "x", "y")
+
+        self.api.autosuggest.side_effect = autosuggest
+        self.service.request("i")
+        self.assertTrue(started.wait(5))
+        # While "i" is in flight, typing continues; only the last query waits.
+        for query in ("ip", "iph", "ipho"):
+            self.service.request(query)
+        release.set()
+        self.assertTrue(self.delivered.wait(5))
+
+        self.assertEqual(fetched, ["i", "ipho"])
+        self.assertEqual([query for query, _ in self.results], ["ipho"])
+        # The superseded response is still cached.
+        self.assertIsNotNone(self.cache.get("i"))
+
+    def test_cancel_drops_pending_result(self):
+        started, release = threading.Event(), threading.Event()
+
+        def autosuggest(query):
+            started.set()
+            release.wait(5)
+            return response("iphone")
+
+        self.api.autosuggest.side_effect = autosuggest
+        self.service.request("ip")
+        self.assertTrue(started.wait(5))
+        self.service.cancel()
+        release.set()
+        self.service.close()
+        self.service._thread.join(5)
+
+        self.assertEqual(self.results, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from pink_olx_app.pink_data_analysis import BIN_METHODS, bin_edges, listing_prices, price_histogram
+
+
+class TestBinEdges(unittest.TestCase):
+    def test_fixed_bins(self):
+        edges = bin_edges(np.array([10.0, 30.0, 110.0]), "fixed", bins=4)
+        self.assertEqual(edges.tolist(), [10.0, 35.0, 60.0, 85.0, 110.0])
+
+    def test_log_bins(self):
+        edges = bin_edges(np.array([10.0, 50.0, 1000.0]), "log", bins=2)
+        np.testing.assert_allclose(edges, [10.0, 100.0, 1000.0])
+
+    def test_log_bins_reject_zero_and_negative_prices(self):
+        for prices in ([0.0, 100.0], [-5.0, 100.0], [0.0, 0.0]):
+            with self.subTest(prices=prices), self.assertRaises(ValueError):
+                bin_edges(np.array(prices), "log")
+
+    def test_freedman_diaconis_width(self):
+        prices = np.arange(1.0, 1001.0)
+        q25, q75 = np.percentile(prices, [25, 75])
+        width = 2 * (q75 - q25) / 1000 ** (1 / 3)
+
+        edges = bin_edges(prices, "fd")
+        self.assertEqual(len(edges) - 1, int(np.ceil(999 / width)))
+        self.assertEqual((edges[0], edges[-1]), (1.0, 1000.0))
+
+    def test_freedman_diaconis_caps_bins(self):
+        # A narrow interquartile range and a far outlier would ask for thousands of bins.
+        prices = np.concatenate([np.linspace(100, 101, 1000), [1e6]])
+        self.assertEqual(len(bin_edges(prices, "fd", max_bins=50)) - 1, 50)
+
+    def test_freedman_diaconis_zero_iqr_falls_back_to_fixed_bins(self):
+        prices = np.array([100.0] * 20 + [500.0])
+        edges = bin_edges(prices, "fd", bins=8)
+        self.assertEqual(edges.tolist(), np.linspace(100, 500, 9).tolist())
+
+    def test_single_and_equal_values_get_one_bin(self):
+        for method in BIN_METHODS:
+            for prices in ([250.0], [250.0] * 5):
+                with self.subTest(method=method, prices=prices):
+                    self.assertEqual(bin_edges(np.array(prices), method).tolist(), [250.0, 251.0])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            bin_edges(np.array([1.0, 2.0]), "sturges")
+
+
+class TestPriceHistogram(unittest.TestCase):
+    def test_every_price_is_counted(self):
+        prices = np.random.default_rng(5).lognormal(6, 1, 2000)
+        for method in BIN_METHODS:
+            with self.subTest(method=method):
+                histogram = price_histogram(prices, method, bins=12)
+                self.assertEqual(histogram.method, method)
+                self.assertEqual(len(histogram.counts), len(histogram.edges) - 1)
+                # The maximum lands in the last bin, which includes its right edge.
+                self.assertEqual(histogram.counts.sum(), len(prices))
+                self.assertEqual((histogram.edges[0], histogram.edges[-1]), (prices.min(), prices.max()))
+
+    def test_single_value_and_all_equal_prices(self):
+        self.assertEqual(price_histogram([{"price": 99}], "log").counts.tolist(), [1])
+        histogram = price_histogram(np.full(7, 99.0), "fd")
+        self.assertEqual((histogram.counts.tolist(), histogram.edges.tolist()), ([7], [99.0, 100.0]))
+
+    def test_zero_and_negative_prices_are_skipped(self):
+        listings = [{"price": 0}, {"price": -10}, {"price": "nan"}, {"price": "inf"}, {"price": "po dogovoru"},
+                    {"price": 10}, {"price": "1000"}]
+        self.assertEqual(listing_prices(listings).tolist(), [10.0, 1000.0])
+
+        histogram = price_histogram(listings, "log", bins=2)
+        self.assertEqual(histogram.counts.tolist(), [1, 1])
+        np.testing.assert_allclose(histogram.edges, [10.0, 100.0, 1000.0])
+        # Arrays are filtered the same way.
+        histogram = price_histogram(np.array([0.0, -10.0, np.nan, 10.0, 1000.0]), "log", bins=2)
+        self.assertEqual(histogram.counts.tolist(), [1, 1])
+
+    def test_no_positive_prices(self):
+        self.assertIsNone(price_histogram([{"price": 0}, {}], "log"))
+        self.assertIsNone(price_histogram(np.array([0.0, -1.0]), "fd"))
+        self.assertIsNone(price_histogram([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from pink_olx_app.pink_dedup import DedupIndex
+from pink_olx_app.pink_olx_logic import ListingFrame
+
+
+def listing(listing_id, title, price=100):
+    return {"id": listing_id, "title": title, "price": price}
+
+
+class TestDedupIndex(unittest.TestCase):
+    def test_reposts_share_the_smallest_id(self):
+        index = DedupIndex()
+        cluster_ids = index.add_listings([
+            listing(7, "Samsung Galaxy S21 Ultra 256GB crni, kao nov"),
+            listing(3, "Samsung Galaxy S21 Ultra 256GB crni, kao nov!"),
+            listing(5, "Bicikl Scott Aspect 930 vel. L"),
+        ])
+
+        self.assertEqual(cluster_ids, [7, 3, 5])
+        self.assertEqual(index.cluster_id(7), 3)
+        self.assertEqual(index.clusters(), {3: [7, 3]})
+        self.assertEqual(index.cluster_count(), 2)
+
+    def test_price_difference_keeps_listings_apart(self):
+        index = DedupIndex()
+        index.add_listings([listing(1, "iPhone 13 Pro 128GB", 1000), listing(2, "iPhone 13 Pro 128GB", 600)])
+        self.assertEqual(index.cluster_count(), 2)
+
+    def test_listings_without_id_are_skipped(self):
+        index = DedupIndex()
+        cluster_ids = index.add_listings([listing(None, "iPhone 13 Pro 128GB"), listing(4, "iPhone 13 Pro 128GB"),
+                                          listing(None, "iPhone 13 Pro 128GB")])
+
+        self.assertEqual(cluster_ids, [None, 4, None])
+        self.assertEqual(len(index), 1)
+        self.assertNotIn("cluster_id", index.annotate([listing(None, "iPhone 13 Pro 128GB")])[0])
+
+
+class TestListingFrameClusters(unittest.TestCase):
+    def test_cluster_zero_is_a_cluster(self):
+        frame = ListingFrame([
+            dict(listing(0, "a"), cluster_id=0),
+            dict(listing(1, "b"), cluster_id=0),
+            listing(2, "c"),
+            listing(3, "d"),
+        ])
+
+        self.assertEqual(frame.cluster_count(), 3)
+        self.assertEqual(frame.one_per_cluster([0, 1, 2, 3]).tolist(), [0, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from pink_olx_app import pink_export
+from pink_olx_app.pink_store import PinkStore
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def listing(listing_id, price, city="Sarajevo"):
+    return {"id": listing_id, "title": f"listing {listing_id}", "price": price, "display_price": f"{price} KM",
+            "state": "used", "location": {"city": city, "city_id": 1, "lat": 43.85, "lon": 18.41},
+            "category_id": 10, "sponsored": 0, "date": 1700000000}
+
+
+def read_table(path, file_format):
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    import pyarrow.feather as feather
+    return feather.read_table(path)
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestColumnarExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_listings_round_trip(self):
+        listings = [listing(1, 100), listing(2, "oko 200"), {"id": "3", "title": "no location", "location": None}]
+        for file_format, name in (("parquet", "crawl.parquet"), ("feather", "crawl.feather")):
+            with self.subTest(file_format=file_format):
+                # Guessed from the extension; batch_rows=2 writes two row groups / record batches.
+                rows = pink_export.export_listings(iter(listings), self.path(name), query="iphone",
+                                                   crawled_at=1700000100, batch_rows=2)
+                self.assertEqual(rows, 3)
+
+                table = read_table(self.path(name), file_format)
+                self.assertEqual(table.column_names, [name for name, _ in pink_export.LISTING_COLUMNS])
+                columns = table.to_pydict()
+                self.assertEqual(columns["listing_id"], [1, 2, 3])
+                # Unparseable prices and missing fields become nulls.
+                self.assertEqual(columns["price"], [100.0, None, None])
+                self.assertEqual(columns["city"], ["Sarajevo", "Sarajevo", None])
+                self.assertEqual(columns["latitude"], [43.85, 43.85, None])
+                self.assertEqual(columns["query"], ["iphone"] * 3)
+                self.assertEqual(columns["listed_at"][0], datetime(2023, 11, 14, 22, 13, 20))
+                self.assertEqual(columns["crawled_at"], [datetime(2023, 11, 14, 22, 15)] * 3)
+
+        import pyarrow.parquet as pq
+        self.assertEqual(pq.ParquetFile(self.path("crawl.parquet")).num_row_groups, 2)
+
+    def test_history_round_trip(self):
+        db_name = self.path("history.db")
+        store = PinkStore(db_name)
+        try:
+            store.save_listings([listing(1, 100), listing(2, 200)], "iphone", timestamp=1000)
+            store.save_listings([listing(1, 90)], "iphone", timestamp=2000)
+            store.save_listings([listing(3, 50)], "ipad", timestamp=2000)
+        finally:
+            store.close()
+
+        for file_format in pink_export.FORMATS:
+            with self.subTest(file_format=file_format):
+                path = self.path(f"history.{file_format}")
+                rows = pink_export.export_history(path, query="iphone", db_name=db_name, file_format=file_format)
+                self.assertEqual(rows, 3)
+
+                columns = read_table(path, file_format).to_pydict()
+                self.assertEqual(sorted(zip(columns["listing_id"], columns["price"])),
+                                 [(1, 90.0), (1, 100.0), (2, 200.0)])
+                self.assertEqual(set(columns["query"]), {"iphone"})
+
+        self.assertEqual(pink_export.export_history(self.path("since.parquet"), since=2000, db_name=db_name), 2)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            pink_export.ColumnarWriter(self.path("crawl.csv"), pink_export.LISTING_COLUMNS, file_format="csv")
+
+
+class TestMissingPyarrow(unittest.TestCase):
+    def test_export_without_pyarrow_raises_import_error(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "crawl.parquet")
+            # A None entry makes "import pyarrow" fail as if it weren't installed.
+            with patch.dict(sys.modules, {"pyarrow": None}):
+                with self.assertRaisesRegex(ImportError, "pip install pyarrow"):
+                    pink_export.export_listings([listing(1, 100)], path)
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from pink_olx_app import pink_maintenance
+from pink_olx_app.pink_store import PinkStore
+
+DAY = 86400
+
+
+def listing(listing_id, price):
+    return {"id": listing_id, "title": f"listing {listing_id}", "price": price, "state": "used",
+            "location": {"city": "Sarajevo"}}
+
+
+class TestPinkMaintenance(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = PinkStore(os.path.join(self.tmp_dir.name, "history.db"))
+        self.now = 100 * DAY
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def count(self, table):
+        return self.store.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_rollup_keeps_each_observation_once(self):
+        # Listing 1: three prices on day 10, its latest price on day 20.
+        # Listing 2: three prices on day 10, the last of them is its latest price.
+        for offset, (first, second) in enumerate([(100, 200), (110, 210), (120, 220)]):
+            self.store.save_listings([listing(1, first), listing(2, second)], "tablet",
+                                     timestamp=10 * DAY + offset * 3600)
+        self.store.save_listings([listing(1, 130)], "tablet", timestamp=20 * DAY)
+        self.assertEqual(len(self.store.get_history_for_query("tablet")), 7)
+
+        deleted = pink_maintenance.rollup_daily(self.store, older_than_days=30, now=self.now)
+
+        self.assertEqual(deleted, 5)
+        history = self.store.get_history_for_query("tablet")
+        # Listing 1: day 10 rollup + day 20 observation; listing 2: day 10 rollup + latest observation.
+        self.assertEqual(len(history), 4)
+        rollups = dict(self.store.conn.execute(
+            "SELECT listing_id, observations FROM daily_listing_prices").fetchall())
+        self.assertEqual(rollups, {1: 3, 2: 2})
+        self.assertEqual(sum(rollups.values()) + self.count("price_observations"), 7)
+        self.assertEqual(self.store.conn.execute(
+            "SELECT median_price FROM daily_listing_prices WHERE listing_id = 2").fetchone()[0], 205)
+        # Latest prices are still raw observations.
+        latest = self.store.conn.execute(
+            "SELECT listing_id, price FROM price_observations ORDER BY listing_id").fetchall()
+        self.assertEqual(latest, [(1, 130), (2, 220)])
+
+        # Each day is rolled up only once.
+        self.assertEqual(pink_maintenance.rollup_daily(self.store, older_than_days=30, now=self.now), 0)
+
+    def test_dedupe_observations(self):
+        self.store.save_listings([listing(1, 100)], "tablet", timestamp=DAY)
+        self.store.conn.execute("INSERT INTO price_observations VALUES (1, ?, 100)", (2 * DAY,))
+
+        self.assertEqual(pink_maintenance.dedupe_observations(self.store), 1)
+        self.assertEqual(self.count("price_observations"), 1)
+
+    def test_retention(self):
+        self.store.save_listings([listing(1, 100), listing(2, 200)], "tablet", timestamp=DAY)
+        self.store.save_listings([listing(2, 150)], "tablet", timestamp=90 * DAY)
+
+        deleted = pink_maintenance.apply_retention(self.store, retention_days=50, now=self.now)
+
+        self.assertEqual(deleted["listings"], 1)
+        self.assertEqual(deleted["query_listings"], 1)
+        # Listing 1's observation and listing 2's old one (it has a newer one).
+        self.assertEqual(deleted["price_observations"], 2)
+        self.assertEqual(deleted["searches"], 1)
+        self.assertEqual(self.store.conn.execute("SELECT listing_id, price FROM price_observations").fetchall(),
+                         [(2, 150)])
+
+    def test_run_maintenance_vacuums(self):
+        self.store.save_listings([listing(i, i) for i in range(2000)], "tablet", timestamp=DAY)
+        report = pink_maintenance.run_maintenance(self.store, retention_days=50, now=self.now)
+
+        self.assertEqual(report["retention"]["listings"], 2000)
+        self.assertGreater(report["vacuumed_pages"], 0)
+        self.assertEqual(self.store.conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import importlib.util
+import threading
+import unittest
+from unittest.mock import Mock
+
+from pink_olx_app.pink_dedup import DedupIndex
+
+HAS_PYQT5 = importlib.util.find_spec("PyQt5") is not None
+
+if HAS_PYQT5:
+    from pink_olx_app.pink_olx_app import SearchWorker
+
+
+@unittest.skipUnless(HAS_PYQT5, "PyQt5 is not installed")
+class TestSearchWorker(unittest.TestCase):
+    def run_worker(self, pages):
+        search_api = Mock()
+        search_api.iter_search_pages.side_effect = lambda **kwargs: pages()
+        worker = SearchWorker(search_api, "iphone", 2, 5, DedupIndex(), threading.Lock())
+        received, finished = [], []
+        worker.page_ready.connect(lambda page, number: received.append(number))
+        worker.finished.connect(finished.append)
+        worker.run()
+        search_api.iter_search_pages.assert_called_once_with(q="iphone", per_page=2, max_pages=5,
+                                                             raise_errors=True)
+        return worker, received, finished
+
+    def test_error_on_a_later_page_is_kept(self):
+        def pages():
+            yield [{"id": 1, "title": "iPhone 13", "price": 100}]
+            raise Exception("429 Too Many Requests")
+
+        worker, received, finished = self.run_worker(pages)
+
+        self.assertEqual(received, [1])
+        self.assertEqual(str(worker.error), "429 Too Many Requests")
+        self.assertEqual(finished, [False])
+        self.assertTrue(worker.done)
+
+    def test_finished_crawl_has_no_error(self):
+        worker, received, finished = self.run_worker(lambda: iter([[{"id": 1}], [{"id": 2}]]))
+
+        self.assertEqual(received, [1, 2])
+        self.assertIsNone(worker.error)
+        self.assertEqual(finished, [False])
+
+
+if __name__ == '__main__':
+    unittest.main()
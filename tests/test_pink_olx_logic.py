@@ -0,0 +1,186 @@
+import random
+import unittest
+
+from pink_olx_app.pink_olx_logic import (
+    ListingFrame,
+    filter_listings_by_price_condition,
+    sort_listings_by_price,
+)
+
+
+# The list-based filter and sort ListingFrame replaced; the frame must give the same results.
+def legacy_price(item):
+    try:
+        return float(item.get("price", 0) or 0)
+    except ValueError:
+        return 0
+
+
+def legacy_filter(listings, min_price, max_price, condition):
+    filtered = []
+    for item in listings:
+        p = legacy_price(item)
+        if min_price is not None and p < min_price:
+            continue
+        if max_price is not None and p > max_price:
+            continue
+        filtered.append(item)
+    if condition != "All":
+        filtered = [f for f in filtered if f.get("state", "").lower() == condition.lower()]
+    return filtered
+
+
+def legacy_sort(listings, sort_order):
+    if sort_order == "None":
+        return listings
+    return sorted(listings, key=legacy_price, reverse=(sort_order == "Descending"))
+
+
+def random_listings(count, seed):
+    rng = random.Random(seed)
+    # Few distinct prices, so there are many ties; some prices are missing or unparseable.
+    prices = [50, 100, 100.0, "100", "250", 999, 0, None, "", "po dogovoru"]
+    return [{"id": listing_id, "title": f"listing {listing_id}", "price": rng.choice(prices),
+             "state": rng.choice(["new", "used", "New", "USED"]),
+             "location": {"city": rng.choice(["Sarajevo", "Mostar"])}}
+            for listing_id in range(count)]
+
+
+FILTERS = [
+    (None, None, "All"),
+    (100, None, "All"),
+    (None, 100, "used"),
+    (50, 250, "new"),
+    (0, 0, "All"),
+    (101, 249, "All"),
+    (300, 100, "All"),  # min_price > max_price
+    (None, None, "refurbished"),
+]
+SORT_ORDERS = ["None", "Ascending", "Descending"]
+
+
+class TestListingFrame(unittest.TestCase):
+    def setUp(self):
+        self.listings = random_listings(300, seed=1)
+        self.frame = ListingFrame(self.listings)
+
+    def test_mask_matches_legacy_filter(self):
+        for min_price, max_price, condition in FILTERS:
+            with self.subTest(min_price=min_price, max_price=max_price, condition=condition):
+                rows = self.frame.mask(min_price, max_price, condition).nonzero()[0]
+                self.assertEqual(self.frame.select(rows),
+                                 legacy_filter(self.listings, min_price, max_price, condition))
+
+    def test_order_matches_legacy_sort(self):
+        for sort_order in SORT_ORDERS:
+            with self.subTest(sort_order=sort_order):
+                self.assertEqual(self.frame.select(self.frame.order(sort_order)),
+                                 legacy_sort(self.listings, sort_order))
+        # Ordering a subset keeps ties in the order of the given rows.
+        rows = [5, 3, 1, 7]
+        self.assertEqual(self.frame.select(self.frame.order("Ascending", rows)),
+                         legacy_sort([self.listings[row] for row in rows], "Ascending"))
+
+    def test_filter_and_sort_matches_legacy(self):
+        for min_price, max_price, condition in FILTERS:
+            for sort_order in SORT_ORDERS:
+                with self.subTest(min_price=min_price, max_price=max_price, condition=condition,
+                                  sort_order=sort_order):
+                    rows = self.frame.filter_and_sort(min_price, max_price, condition, sort_order)
+                    expected = legacy_sort(legacy_filter(self.listings, min_price, max_price, condition),
+                                           sort_order)
+                    self.assertEqual(self.frame.select(rows), expected)
+                    self.assertEqual(filter_listings_by_price_condition(self.listings, min_price, max_price,
+                                                                        condition),
+                                     legacy_filter(self.listings, min_price, max_price, condition))
+                    self.assertEqual(sort_listings_by_price(self.listings, sort_order),
+                                     legacy_sort(self.listings, sort_order))
+
+    def test_nan_and_unparseable_prices_count_as_zero(self):
+        listings = [{"id": 1, "price": "nan"}, {"id": 2, "price": 20}, {"id": 3, "price": "inf"},
+                    {"id": 4, "price": "20 KM"}, {"id": 5, "price": 10}]
+        frame = ListingFrame(listings)
+
+        self.assertEqual(frame.price.tolist(), [0.0, 20.0, 0.0, 0.0, 10.0])
+        self.assertEqual(frame.filter_and_sort(sort_order="Ascending").tolist(), [0, 2, 3, 4, 1])
+        self.assertEqual(frame.filter_and_sort(sort_order="Descending").tolist(), [1, 4, 0, 2, 3])
+        self.assertEqual(frame.filter_and_sort(min_price=5).tolist(), [1, 4])
+        self.assertEqual(frame.mask(max_price=0).nonzero()[0].tolist(), [0, 2, 3])
+
+    def test_empty_frame(self):
+        frame = ListingFrame([])
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame.mask(100, 200, "used").tolist(), [])
+        for sort_order in SORT_ORDERS:
+            self.assertEqual(frame.filter_and_sort(100, 200, "used", sort_order, dedupe=True).tolist(), [])
+        self.assertEqual(frame.order("Descending").tolist(), [])
+        self.assertEqual(frame.select([]), [])
+
+    def test_missing_state_and_location(self):
+        frame = ListingFrame([{"id": 1, "price": 5, "state": None, "location": None}, {"id": 2, "price": 5}])
+        self.assertEqual(frame.filter_and_sort(condition="used").tolist(), [])
+        self.assertEqual(frame.filter_and_sort(city="Sarajevo").tolist(), [])
+        self.assertEqual(frame.filter_and_sort(sort_order="Descending").tolist(), [0, 1])
+
+    def test_city_filter(self):
+        rows = self.frame.filter_and_sort(min_price=100, condition="used", city="Mostar", sort_order="Ascending")
+        expected = legacy_sort([item for item in legacy_filter(self.listings, 100, None, "used")
+                                if item["location"]["city"] == "Mostar"], "Ascending")
+        self.assertEqual(self.frame.select(rows), expected)
+        self.assertEqual(self.frame.filter_and_sort(city="Tuzla").tolist(), [])
+
+
+class TestListingFramePriceIndex(unittest.TestCase):
+    def setUp(self):
+        self.listings = random_listings(300, seed=2)
+        self.frame = ListingFrame(self.listings)
+
+    def test_price_range_matches_legacy(self):
+        for min_price, max_price, _ in FILTERS:
+            with self.subTest(min_price=min_price, max_price=max_price):
+                rows = self.frame.price_range(min_price, max_price)
+                self.assertEqual(self.frame.select(rows),
+                                 legacy_sort(legacy_filter(self.listings, min_price, max_price, "All"), "Ascending"))
+        self.assertEqual(self.frame.price_range(300, 100).tolist(), [])
+        # The index is built once.
+        self.assertIs(self.frame._price_index()[0], self.frame._price_index()[0])
+
+    def test_cheapest_and_most_expensive_match_legacy(self):
+        for min_price, max_price, condition in FILTERS:
+            filtered = legacy_filter(self.listings, min_price, max_price, condition)
+            for n in (0, 1, 5, 40, 1000):
+                with self.subTest(min_price=min_price, max_price=max_price, condition=condition, n=n):
+                    cheapest = self.frame.cheapest(n, min_price, max_price, condition)
+                    self.assertEqual(self.frame.select(cheapest), legacy_sort(filtered, "Ascending")[:n])
+                    most_expensive = self.frame.most_expensive(n, min_price, max_price, condition)
+                    self.assertEqual(self.frame.select(most_expensive), legacy_sort(filtered, "Descending")[:n])
+
+    def test_most_expensive_breaks_ties_by_original_order(self):
+        frame = ListingFrame([{"id": listing_id, "price": price, "state": "used"}
+                              for listing_id, price in enumerate([300, 100, 300, 200, 300])])
+        self.assertEqual(frame.most_expensive(2).tolist(), [0, 2])
+        self.assertEqual(frame.most_expensive(4, condition="used").tolist(), [0, 2, 4, 3])
+        self.assertEqual(frame.cheapest(2, min_price=200).tolist(), [3, 0])
+
+    def test_first_matches_reads_chunks_until_enough_matches(self):
+        # More rows than one chunk (256), matches only near the end.
+        listings = [{"id": listing_id, "price": 10, "state": "used"} for listing_id in range(600)]
+        listings[550]["state"] = listings[590]["state"] = "new"
+        frame = ListingFrame(listings)
+        rows = frame.price_range()
+
+        self.assertEqual(frame._first_matches(rows, 1, condition="new").tolist(), [550])
+        self.assertEqual(frame._first_matches(rows, 5, condition="new").tolist(), [550, 590])
+        self.assertEqual(frame._first_matches(rows, 3).tolist(), [0, 1, 2])
+        self.assertEqual(frame._first_matches(rows, 3, city="Sarajevo").tolist(), [])
+        self.assertEqual(frame._first_matches(rows[:0], 3, condition="new").tolist(), [])
+
+    def test_empty_frame(self):
+        frame = ListingFrame([])
+        self.assertEqual(frame.price_range(1, 2).tolist(), [])
+        self.assertEqual(frame.cheapest(3, condition="used").tolist(), [])
+        self.assertEqual(frame.most_expensive(3).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import random
+import statistics
+import unittest
+
+from pink_olx_app.pink_stats import KLLSketch, PriceStats
+
+FRACTIONS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+# Well above the sketch's ~1.7 / k rank error for k=200, so the tests don't depend on the seed.
+MAX_RANK_ERROR = 0.03
+
+
+def true_rank(sorted_values, value):
+    """Fraction of values <= value."""
+    low, high = 0, len(sorted_values)
+    while low < high:
+        middle = (low + high) // 2
+        if sorted_values[middle] <= value:
+            low = middle + 1
+        else:
+            high = middle
+    return low / len(sorted_values)
+
+
+class TestKLLSketch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        # Log-normal, like listing prices: a long tail of expensive items.
+        self.values = [round(rng.lognormvariate(6, 1), 2) for _ in range(50000)]
+        self.sorted_values = sorted(self.values)
+
+    def assertRankErrors(self, sketch):
+        for fraction, value in zip(FRACTIONS, sketch.quantiles(FRACTIONS)):
+            self.assertLessEqual(abs(true_rank(self.sorted_values, value) - fraction), MAX_RANK_ERROR,
+                                 f"quantile({fraction}) = {value}")
+
+    def test_quantile_rank_error(self):
+        sketch = KLLSketch(seed=1)
+        sketch.update(self.values)
+
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertRankErrors(sketch)
+        # Memory stays O(k), not O(n).
+        self.assertLess(sketch._size(), 1000)
+        for value in (100, 400, 2000):
+            self.assertAlmostEqual(sketch.rank(value), true_rank(self.sorted_values, value), delta=MAX_RANK_ERROR)
+
+    def test_small_stream_is_exact(self):
+        sketch = KLLSketch(seed=1)
+        sketch.update([5, 1, 3, 2, 4])
+        self.assertEqual(sketch.quantiles([0.2, 0.5, 1.0]), [1, 3, 5])
+        self.assertEqual(sketch.rank(3), 0.6)
+        self.assertEqual(KLLSketch().quantiles([0.5]), [None])
+        self.assertEqual(KLLSketch().rank(1), 0.0)
+
+    def test_merge_matches_single_pass(self):
+        single = KLLSketch(seed=1)
+        single.update(self.values)
+        parts = [KLLSketch(seed=seed) for seed in range(4)]
+        for index, value in enumerate(self.values):
+            parts[index % 4].add(value)
+
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+
+        self.assertEqual(merged.count, single.count)
+        self.assertRankErrors(merged)
+        for merged_value, single_value in zip(merged.quantiles(FRACTIONS), single.quantiles(FRACTIONS)):
+            self.assertLessEqual(abs(true_rank(self.sorted_values, merged_value)
+                                     - true_rank(self.sorted_values, single_value)), 2 * MAX_RANK_ERROR)
+        self.assertLess(merged._size(), 1000)
+
+
+class TestPriceStats(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.prices = [rng.uniform(10, 5000) for _ in range(10000)]
+
+    def assertMoments(self, stats, prices):
+        self.assertEqual(stats.count, len(prices))
+        self.assertAlmostEqual(stats.mean, statistics.mean(prices), places=6)
+        self.assertAlmostEqual(stats.variance, statistics.variance(prices), delta=1e-9 * statistics.variance(prices))
+        self.assertAlmostEqual(stats.stdev, statistics.stdev(prices), places=6)
+        self.assertEqual((stats.min, stats.max), (min(prices), max(prices)))
+
+    def test_mean_and_variance_match_statistics(self):
+        stats = PriceStats(seed=1)
+        stats.update(self.prices)
+        self.assertMoments(stats, self.prices)
+        self.assertAlmostEqual(stats.median, statistics.median(self.prices), delta=0.03 * 5000)
+
+    def test_merge_matches_single_pass(self):
+        single = PriceStats(seed=1)
+        single.update(self.prices)
+        # Uneven parts, and an empty one on either side of merge().
+        merged = PriceStats(seed=1)
+        for part in (self.prices[:10], [], self.prices[10:7000], self.prices[7000:]):
+            stats = PriceStats(seed=2)
+            stats.update(part)
+            merged.merge(stats)
+
+        self.assertMoments(merged, self.prices)
+        self.assertAlmostEqual(merged.mean, single.mean, places=9)
+        self.assertAlmostEqual(merged.variance, single.variance, delta=1e-9 * single.variance)
+        self.assertEqual(merged.sketch.count, single.sketch.count)
+
+    def test_add_listings_skips_missing_prices(self):
+        stats = PriceStats.from_listings([{"price": 100}, {"price": "200"}, {"price": None}, {"price": 0},
+                                          {"price": "po dogovoru"}, {}])
+        self.assertMoments(stats, [100, 200])
+        self.assertEqual(PriceStats.from_listings([{"price": 50}]).variance, 0.0)
+        self.assertIsNone(PriceStats().median)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pink_olx_app.pink_store import BackgroundWriter, PinkStore
+
+
+def listing(listing_id, price, title=None, description=None):
+    return {"id": listing_id, "title": title or f"listing {listing_id}", "price": price, "state": "used",
+            "location": {"city": "Sarajevo"}, "description": description}
+
+
+class TestPinkStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "history.db")
+        self.store = None
+
+    def tearDown(self):
+        if self.store is not None:
+            self.store.close()
+        self.tmp_dir.cleanup()
+
+    def open_store(self):
+        self.store = PinkStore(self.db_name)
+        return self.store
+
+    def count(self, table):
+        return self.store.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_save_same_price_twice_stores_one_observation(self):
+        store = self.open_store()
+        self.assertEqual(store.save_listings([listing(1, 100), listing(2, 200)], "tablet", timestamp=1000), 2)
+        self.assertEqual(store.save_listings([listing(1, 100), listing(2, 250)], "tablet", timestamp=2000), 2)
+
+        self.assertEqual(self.count("listings"), 2)
+        self.assertEqual(store.conn.execute(
+            "SELECT listing_id, observed_at, price FROM price_observations ORDER BY listing_id, observed_at"
+        ).fetchall(), [(1, 1000, 100), (2, 1000, 200), (2, 2000, 250)])
+        self.assertEqual(store.conn.execute("SELECT timestamp, result_count FROM searches").fetchall(),
+                         [(1000, 2), (2000, 2)])
+        self.assertEqual(store.conn.execute(
+            "SELECT first_seen, last_seen FROM listings WHERE listing_id = 1").fetchone(), (1000, 2000))
+
+        history = store.get_history_for_query("tablet")
+        self.assertEqual([row[6] for row in history], [2000, 1000, 1000])
+        self.assertEqual(sorted((row[0], row[2], row[6]) for row in history),
+                         [(1, 100, 1000), (2, 200, 1000), (2, 250, 2000)])
+
+    def test_save_skips_listings_without_id(self):
+        store = self.open_store()
+        self.assertEqual(store.save_listings([listing(None, 100), listing(1, 100)], "tablet", timestamp=1000), 1)
+        self.assertEqual(self.count("listings"), 1)
+
+    def test_save_batches_merges_pages_of_one_search(self):
+        store = self.open_store()
+        saved = store.save_batches([([listing(1, 100)], "tablet", 1000), ([listing(2, 200)], "tablet", 1000)])
+
+        self.assertEqual(saved, 2)
+        self.assertEqual(store.conn.execute("SELECT result_count FROM searches").fetchall(), [(2,)])
+
+    def test_migrates_legacy_search_results(self):
+        conn = sqlite3.connect(self.db_name)
+        conn.execute("""
+            CREATE TABLE search_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, listing_id INTEGER, title TEXT, price REAL,
+                state TEXT, city TEXT, query TEXT, timestamp INTEGER
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO search_results (listing_id, title, price, state, city, query, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(1, "old title", 100, "used", "Sarajevo", "tablet", 1000),
+             (2, "listing 2", 200, "new", "Mostar", "tablet", 1000),
+             (1, "new title", 100, "used", "Sarajevo", "tablet", 2000),
+             (2, "listing 2", 180, "new", "Mostar", "tablet", 2000),
+             (1, "new title", 100, "used", "Sarajevo", "ipad", 3000)])
+        conn.commit()
+        conn.close()
+
+        store = self.open_store()
+
+        self.assertIsNone(store.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'search_results'").fetchone())
+        self.assertEqual(store.conn.execute("PRAGMA user_version").fetchone()[0], PinkStore.SCHEMA_VERSION)
+        self.assertEqual(store.conn.execute(
+            "SELECT listing_id, title, price, first_seen, last_seen FROM listings ORDER BY listing_id"
+        ).fetchall(), [(1, "new title", 100, 1000, 3000), (2, "listing 2", 180, 1000, 2000)])
+        # Unchanged prices are not repeated.
+        self.assertEqual(store.conn.execute(
+            "SELECT listing_id, observed_at, price FROM price_observations ORDER BY listing_id, observed_at"
+        ).fetchall(), [(1, 1000, 100), (2, 1000, 200), (2, 2000, 180)])
+        self.assertEqual(store.conn.execute("""
+            SELECT q.query, s.timestamp, s.result_count FROM searches s JOIN queries q ON q.id = s.query_id
+            ORDER BY s.timestamp
+        """).fetchall(), [("tablet", 1000, 2), ("tablet", 2000, 2), ("ipad", 3000, 1)])
+        self.assertEqual(len(store.get_history_for_query("ipad")), 1)
+        # The migrated titles are searchable.
+        self.assertEqual([row[0] for row in store.search_history("new")], [1])
+
+        # Reopening a migrated database changes nothing.
+        store.close()
+        store = self.open_store()
+        self.assertEqual(self.count("price_observations"), 3)
+
+    def test_search_history_follows_listing_changes(self):
+        store = self.open_store()
+        store.save_listings([listing(1, 100, "Samsung Galaxy S21", "Očuvan telefon"),
+                             listing(2, 900, "Galaxy Tab S8")], "samsung", timestamp=1000)
+
+        self.assertEqual(sorted(row[0] for row in store.search_history("galax")), [1, 2])
+        # Diacritics are ignored.
+        self.assertEqual([row[0] for row in store.search_history("ocuvan")], [1])
+        self.assertEqual([row[0] for row in store.search_history("galaxy", max_price=500)], [1])
+
+        # The update trigger re-indexes changed titles.
+        store.save_listings([listing(1, 100, "iPhone 13")], "samsung", timestamp=2000)
+        self.assertEqual([row[0] for row in store.search_history("galaxy")], [2])
+        self.assertEqual([row[0] for row in store.search_history("iphone")], [1])
+        # The description is kept when a later crawl doesn't include one.
+        self.assertEqual([row[0] for row in store.search_history("ocuvan")], [1])
+
+        # The delete trigger drops removed listings from the index.
+        store.conn.execute("DELETE FROM listings WHERE listing_id = 2")
+        self.assertEqual(store.search_history("galaxy"), [])
+        self.assertEqual(store.search_history("   "), [])
+
+    def test_upgrade_drops_per_row_fts_insert_trigger(self):
+        store = self.open_store()
+        store.conn.execute("""
+            CREATE TRIGGER listings_fts_insert AFTER INSERT ON listings BEGIN
+                INSERT INTO listings_fts (rowid, title, description)
+                VALUES (new.listing_id, new.title, new.description);
+            END
+        """)
+        store.conn.execute("PRAGMA user_version = 5")
+        store.close()
+
+        store = self.open_store()
+        self.assertIsNone(store.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'listings_fts_insert'").fetchone())
+        store.save_listings([listing(1, 100, "Golf 7")], "golf", timestamp=1000)
+        # Indexed once, by the bulk insert.
+        self.assertEqual(store.conn.execute(
+            "SELECT COUNT(*) FROM listings_fts WHERE listings_fts MATCH 'golf'").fetchone()[0], 1)
+        store.conn.execute("INSERT INTO listings_fts (listings_fts) VALUES ('integrity-check')")
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "history.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def saved_ids(self):
+        store = PinkStore(self.db_name)
+        try:
+            return [row[0] for row in store.conn.execute("SELECT listing_id FROM listings ORDER BY listing_id")]
+        finally:
+            store.close()
+
+    def test_close_flushes_pending_listings(self):
+        # A long max_delay would hold the batch back if close() didn't flush it.
+        writer = BackgroundWriter(self.db_name, max_delay=60)
+        writer.submit([listing(1, 100)], "tablet", timestamp=1000)
+        writer.submit([listing(2, 200)], "tablet", timestamp=1000)
+        writer.close(timeout=10)
+
+        self.assertFalse(writer._thread.is_alive())
+        self.assertIsNone(writer.last_error)
+        self.assertEqual(self.saved_ids(), [1, 2])
+        with self.assertRaises(RuntimeError):
+            writer.submit([listing(3, 300)], "tablet")
+
+    def test_flush_waits_for_commit(self):
+        writer = BackgroundWriter(self.db_name, max_delay=60)
+        try:
+            writer.submit([listing(1, 100)], "tablet", timestamp=1000)
+            self.assertTrue(writer.flush(timeout=10))
+            self.assertEqual(self.saved_ids(), [1])
+        finally:
+            writer.close(timeout=10)
+
+    def test_flush_reports_failed_save(self):
+        writer = BackgroundWriter(self.db_name, max_delay=60)
+        try:
+            with patch.object(PinkStore, "save_batches", side_effect=sqlite3.OperationalError("disk I/O error")):
+                writer.submit([listing(1, 100)], "tablet", timestamp=1000)
+                self.assertFalse(writer.flush(timeout=10))
+            self.assertIsInstance(writer.last_error, sqlite3.OperationalError)
+
+            # A later successful flush reports success again.
+            writer.submit([listing(2, 200)], "tablet", timestamp=1000)
+            self.assertTrue(writer.flush(timeout=10))
+            self.assertEqual(self.saved_ids(), [2])
+        finally:
+            writer.close(timeout=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import importlib.util
+import unittest
+from unittest.mock import Mock
+
+from pink_olx_app.pink_olx_logic import ListingFrame
+
+HAS_PYQT5 = importlib.util.find_spec("PyQt5") is not None
+
+if HAS_PYQT5:
+    from PyQt5.QtCore import QModelIndex, QPersistentModelIndex, Qt
+
+    from pink_olx_app.pink_table_model import ListingProxyModel, ListingTableModel, size_columns
+
+
+def listing(listing_id, title, price, state="used", city="Sarajevo"):
+    return {"id": listing_id, "title": title, "price": price, "state": state, "location": {"city": city}}
+
+
+class SampledModel:
+    """Stands in for a table model; records which rows size_columns reads."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.read = set()
+
+    def rowCount(self):
+        return self.rows
+
+    def columnCount(self):
+        return 2
+
+    def headerData(self, section, orientation):
+        return "Title"
+
+    def index(self, row, column):
+        return row, column
+
+    def data(self, index):
+        row, column = index
+        self.read.add(row)
+        return "x" * (row % 50)
+
+
+@unittest.skipUnless(HAS_PYQT5, "PyQt5 is not installed")
+class TestListingProxyModel(unittest.TestCase):
+    def setUp(self):
+        self.frame = ListingFrame([
+            listing(0, "b phone", 300, "used", "Mostar"),
+            listing(1, "A phone", 100, "new", "Sarajevo"),
+            listing(2, "c phone", 200, "used", "banja Luka"),
+            listing(3, "a case", 100, "new", "Tuzla"),
+            listing(4, "d phone", "po dogovoru", "used", "Sarajevo"),
+        ])
+        self.model = ListingTableModel()
+        self.proxy = ListingProxyModel()
+        self.proxy.setSourceModel(self.model)
+        # Filtered to rows 0-3, price box order "Descending".
+        self.proxy.set_frame(self.frame, self.frame.filter_and_sort(min_price=1, sort_order="Descending"))
+
+    def ids(self):
+        return [item["id"] for item in self.proxy.listings()]
+
+    def assertMapping(self):
+        """mapToSource and mapFromSource are inverses and agree with rows()."""
+        for proxy_row, source_row in enumerate(self.proxy.rows()):
+            for column in range(self.proxy.columnCount()):
+                source = self.proxy.mapToSource(self.proxy.index(proxy_row, column))
+                self.assertEqual((source.row(), source.column()), (source_row, column))
+                back = self.proxy.mapFromSource(source)
+                self.assertEqual((back.row(), back.column()), (proxy_row, column))
+                self.assertEqual(self.proxy.data(self.proxy.index(proxy_row, column)),
+                                 self.model.data(source))
+
+    def test_rows_are_shown_in_the_given_order(self):
+        self.assertEqual(self.ids(), [0, 2, 1, 3])
+        self.assertEqual(self.proxy.rowCount(), 4)
+        self.assertMapping()
+        # Filtered out rows have no proxy index.
+        self.assertFalse(self.proxy.mapFromSource(self.model.index(4, 0)).isValid())
+        self.assertFalse(self.proxy.mapToSource(QModelIndex()).isValid())
+        self.assertFalse(self.proxy.index(4, 0).isValid())
+
+    def test_header_sort_maps_through_argsort(self):
+        cases = [
+            (0, Qt.AscendingOrder, [3, 1, 0, 2]),  # titles, case-insensitive
+            (0, Qt.DescendingOrder, [2, 0, 1, 3]),
+            (1, Qt.AscendingOrder, [1, 3, 2, 0]),  # equal prices keep the given order
+            (1, Qt.DescendingOrder, [0, 2, 1, 3]),
+            (2, Qt.AscendingOrder, [1, 3, 0, 2]),
+            (3, Qt.AscendingOrder, [2, 0, 1, 3]),
+            (-1, Qt.AscendingOrder, [0, 2, 1, 3]),  # no header sort: back to the given order
+        ]
+        for column, order, expected in cases:
+            with self.subTest(column=column, order=order):
+                self.proxy.sort(column, order)
+                self.assertEqual(self.ids(), expected)
+                self.assertMapping()
+
+    def test_header_sort_survives_new_rows(self):
+        self.proxy.sort(1, Qt.AscendingOrder)
+        self.proxy.set_rows([4, 0, 2])
+        self.assertEqual(self.ids(), [4, 2, 0])
+        self.assertMapping()
+
+    def test_sort_keeps_persistent_indexes_on_the_same_listing(self):
+        persistent = QPersistentModelIndex(self.proxy.index(0, 1))  # listing 0
+
+        self.proxy.sort(1, Qt.AscendingOrder)
+        self.assertEqual((persistent.row(), persistent.column()), (3, 1))
+        self.assertEqual(self.proxy.listings()[persistent.row()]["id"], 0)
+
+    def test_sort_keys_are_built_once_per_frame(self):
+        self.assertIs(self.model.sort_key(0), self.model.sort_key(0))
+        self.proxy.set_frame(ListingFrame([listing(9, "z", 5)]))
+        self.assertEqual(self.model.sort_key(0).tolist(), [0])
+        self.assertEqual(self.ids(), [9])
+
+    def test_size_columns_samples_rows(self):
+        view = Mock()
+        view.fontMetrics.return_value.horizontalAdvance.side_effect = len
+        for rows, sample in ((1000, 200), (399, 200), (150, 200), (0, 200), (10, 3)):
+            with self.subTest(rows=rows, sample=sample):
+                model = SampledModel(rows)
+                view.model.return_value = model
+                size_columns(view, sample=sample, padding=4, max_width=30)
+
+                # At most 'sample' rows, spread evenly over the whole model.
+                step = max(1, -(-rows // sample))
+                self.assertEqual(sorted(model.read), list(range(0, rows, step)))
+                self.assertLessEqual(len(model.read), sample)
+                # Widest sampled text or header, plus padding, capped at max_width.
+                widest = max([len("Title")] + [row % 50 for row in model.read])
+                view.horizontalHeader.return_value.resizeSection.assert_called_with(1, min(widest + 4, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
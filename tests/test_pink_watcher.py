@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from olx_api.search import Search
+from pink_olx_app.pink_watcher import SavedSearch, Watcher, diff_results
+from tests.fake_api import make_response
+
+
+def listing(listing_id, price):
+    return {"id": listing_id, "title": f"listing {listing_id}", "price": price}
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, events):
+        self.events.extend(events)
+
+
+class TestDiffResults(unittest.TestCase):
+    def setUp(self):
+        self.search = SavedSearch("phones", "iphone 13")
+        self.known = {1, 2, 3, 4}
+        self.latest = {1: (100.0, "listing 1"), 2: (200.0, "listing 2"), 3: (300.0, "listing 3")}
+        self.listings = [listing(1, 90), listing(2, 250), listing(5, 400)]
+
+    def test_new_price_drop_and_removed(self):
+        events = diff_results(self.search, self.listings, self.known, self.latest, True, 1000)
+
+        self.assertEqual([(event["type"], event["listing_id"]) for event in events],
+                         [("price_drop", 1), ("new", 5), ("removed", 3)])
+        self.assertEqual(events[0]["old_price"], 100.0)
+        self.assertEqual(events[2]["title"], "listing 3")
+        self.assertTrue(all(event["search"] == "phones" and event["at"] == 1000 for event in events))
+
+    def test_no_removals_for_incomplete_crawl(self):
+        events = diff_results(self.search, self.listings, self.known, self.latest, False, 1000)
+        self.assertEqual([event["type"] for event in events], ["price_drop", "new"])
+
+
+class TestWatcherRunSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sink = ListSink()
+        self.now = 1000
+        self.watcher = Watcher([], sinks=[self.sink], search_api=Search(token="dummy_token"),
+                               db_name=os.path.join(self.tmp_dir.name, "history.db"), clock=lambda: self.now)
+        # 5 listings, 2 per page.
+        self.listings = [listing(listing_id, 100) for listing_id in range(1, 6)]
+        self.failing_page = None
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp_dir.cleanup()
+
+    def fake_get(self, url, headers=None, params=None):
+        page, per_page = params["page"], params["per_page"]
+        if page == self.failing_page:
+            raise Exception("500 Server Error")
+        data = self.listings[(page - 1) * per_page:page * per_page]
+        return make_response(data, len(self.listings), -(-len(self.listings) // per_page))
+
+    def run_search(self, search):
+        self.sink.events = []
+        report = self.watcher.run_search(search)
+        self.now += 100
+        return report
+
+    @patch('olx_api.search.requests.get')
+    def test_full_crawl_reports_changes(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        search = SavedSearch("phones", "iphone", per_page=2, max_pages=None)
+
+        report = self.run_search(search)
+        self.assertEqual((report["listings"], report["pages"], report["complete"]), (5, 3, True))
+        self.assertEqual([event["type"] for event in self.sink.events], ["new"] * 5)
+
+        self.listings = [listing(1, 80)] + self.listings[1:4] + [listing(6, 100)]
+        report = self.run_search(search)
+        self.assertTrue(report["complete"])
+        self.assertEqual(sorted((event["type"], event["listing_id"]) for event in self.sink.events),
+                         [("new", 6), ("price_drop", 1), ("removed", 5)])
+
+    @patch('olx_api.search.requests.get')
+    def test_full_last_page_without_max_pages(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        self.listings = self.listings[:4]
+
+        report = self.run_search(SavedSearch("phones", "iphone", per_page=2, max_pages=None))
+
+        self.assertEqual((report["pages"], report["complete"]), (2, True))
+
+    @patch('olx_api.search.requests.get')
+    def test_crawl_cut_off_at_max_pages_is_incomplete(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        self.run_search(SavedSearch("phones", "iphone", per_page=2, max_pages=3))
+
+        report = self.run_search(SavedSearch("phones", "iphone", per_page=2, max_pages=2))
+
+        self.assertEqual((report["pages"], report["complete"]), (2, False))
+        self.assertEqual(self.sink.events, [])
+
+    @patch('olx_api.search.requests.get')
+    def test_crawl_stopped_by_error_reports_no_removals(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        search = SavedSearch("phones", "iphone", per_page=2, max_pages=5)
+        self.run_search(search)
+
+        self.failing_page = 2
+        self.listings[0] = listing(1, 50)
+        report = self.run_search(search)
+
+        self.assertEqual((report["listings"], report["pages"], report["complete"]), (2, 1, False))
+        # The price drop on page 1 is still reported; listings 3-5 were not read, not removed.
+        self.assertEqual([(event["type"], event["listing_id"]) for event in self.sink.events],
+                         [("price_drop", 1)])
+
+    @patch('olx_api.search.requests.get')
+    def test_same_query_with_different_filters_is_tracked_separately(self, mock_get):
+        by_category = {10: [listing(1, 100), listing(2, 200)], 20: [listing(3, 300)]}
+        mock_get.side_effect = lambda url, headers=None, params=None: make_response(
+            by_category[params["category_id"]], len(by_category[params["category_id"]]), 1)
+        phones = SavedSearch("phones", "iphone", category_id=10)
+        cases = SavedSearch("cases", "iphone", category_id=20)
+
+        self.run_search(phones)
+        self.run_search(cases)
+        # A GUI search for the same text is stored under the plain query.
+        self.watcher.store.save_listings([listing(4, 400)], "iphone", timestamp=self.now)
+
+        for search in (phones, cases):
+            report = self.run_search(search)
+            self.assertTrue(report["complete"])
+            self.assertEqual(self.sink.events, [])
+
+    @patch('olx_api.search.requests.get')
+    def test_error_on_first_page_raises(self, mock_get):
+        mock_get.side_effect = Exception("429 Too Many Requests")
+        with self.assertRaises(Exception):
+            self.watcher.run_search(SavedSearch("phones", "iphone", per_page=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
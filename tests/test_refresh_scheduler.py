@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from olx_api.refresh_scheduler import RefreshScheduler
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, "state.json")
+        self.api = Mock()
+        self.api.get_refresh_limits.return_value = {
+            "free_limit": 10,
+            "free_count": 6,
+            "paid_count": 0,
+            "listing_count": 3
+        }
+        # 18:00 local time -> 6 hours until the quota resets.
+        self.now = datetime(2025, 3, 1, 18, 0, 0).timestamp()
+        self.clock = Mock(return_value=self.now)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_scheduler(self, rank_by="age"):
+        return RefreshScheduler(self.api, state_path=self.state_path, rank_by=rank_by, clock=self.clock)
+
+    def test_rank_by_views(self):
+        scheduler = self.make_scheduler(rank_by="views")
+        scheduler.add_listing(1, views=5)
+        scheduler.add_listing(2, views=50)
+        scheduler.add_listing(3, views=20)
+        self.assertEqual(scheduler.queued_listings(), [2, 3, 1])
+
+    def test_refresh_next_rotates_through_ranked_listings(self):
+        scheduler = self.make_scheduler(rank_by="views")
+        for listing_id, views in ((40, 500), (41, 50), (42, 200), (43, 10)):
+            scheduler.add_listing(listing_id, views=views)
+
+        refreshed = [scheduler.refresh_next() for _ in range(6)]
+
+        self.assertEqual(refreshed, [40, 42, 41, 43, 40, 42])
+        # The rotation survives a restart.
+        self.assertEqual(self.make_scheduler(rank_by="views").queued_listings(), [41, 43, 40, 42])
+
+        # A listing added mid-round joins the current round, ranked by its views.
+        scheduler.add_listing(44, views=1000)
+        self.assertEqual(scheduler.queued_listings(), [44, 41, 43, 40, 42])
+
+    def test_run_once_spreads_free_quota(self):
+        scheduler = self.make_scheduler()
+        scheduler.add_listing(1, last_refreshed=100)
+        scheduler.add_listing(2, last_refreshed=50)
+
+        wait = scheduler.run_once()
+
+        self.api.refresh_listing.assert_called_once_with(2)
+        # 4 free refreshes left, one used now -> 3 left over 6 hours.
+        self.assertAlmostEqual(wait, 6 * 3600 / 3)
+        self.assertEqual(scheduler.queued_listings(), [1, 2])
+
+    def test_run_once_waits_until_next_due(self):
+        # 4 free refreshes over 6 hours: one now, then every 2 hours, despite hourly wake-ups.
+        self.api.get_refresh_limits.side_effect = lambda: {
+            "free_limit": 10, "free_count": 6 + self.api.refresh_listing.call_count, "paid_count": 0}
+        scheduler = self.make_scheduler()
+        scheduler.add_listing(1)
+
+        self.assertAlmostEqual(scheduler.run_once(), 2 * 3600)
+        self.clock.return_value = self.now + 3600
+        self.assertAlmostEqual(scheduler.run_once(), 3600)
+        self.assertEqual(self.api.refresh_listing.call_count, 1)
+
+        self.clock.return_value = self.now + 2 * 3600
+        self.assertAlmostEqual(scheduler.run_once(), 2 * 3600)
+        self.assertEqual(self.api.refresh_listing.call_count, 2)
+
+        # The schedule survives a restart.
+        self.clock.return_value = self.now + 3 * 3600
+        self.assertAlmostEqual(self.make_scheduler().run_once(), 3600)
+        self.assertEqual(self.api.refresh_listing.call_count, 2)
+
+    def test_run_once_waits_for_reset_when_quota_used(self):
+        self.api.get_refresh_limits.return_value = {"free_limit": 10, "free_count": 10, "paid_count": 2}
+        scheduler = self.make_scheduler()
+        scheduler.add_listing(1)
+
+        wait = scheduler.run_once()
+
+        self.api.refresh_listing.assert_not_called()
+        self.assertAlmostEqual(wait, 6 * 3600)
+
+    def test_state_is_persisted(self):
+        scheduler = self.make_scheduler(rank_by="score")
+        scheduler.add_listing(1, score=0.5)
+        scheduler.add_listing(2, score=0.9)
+        scheduler.refresh_next()
+
+        restored = self.make_scheduler(rank_by="score")
+        # Listing 2 was refreshed, so listing 1 is next.
+        self.assertEqual(restored.queued_listings(), [1, 2])
+        self.assertEqual(restored._entries["2"]["last_refreshed"], self.now)
+
+
+if __name__ == "__main__":
+    unittest.main()
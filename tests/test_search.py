@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from olx_api.search import NEWEST_FIRST, Search
+from tests.fake_api import make_response
+
+
+class TestSearchPages(unittest.TestCase):
+    def setUp(self):
+        self.api = Search(token="dummy_token")
+
+    @patch('olx_api.search.requests.get')
+    def test_iter_search_pages_reuses_first_page(self, mock_get):
+        pages = {
+            1: make_response([{"id": 1}, {"id": 2}], 3, 2),
+            2: make_response([{"id": 3}], 3, 2),
+        }
+        mock_get.side_effect = lambda url, headers=None, params=None: pages[params["page"]]
+
+        result = list(self.api.iter_search_pages("iphone", per_page=2))
+
+        self.assertEqual(result, [[{"id": 1}, {"id": 2}], [{"id": 3}]])
+        self.assertEqual([call.kwargs["params"]["page"] for call in mock_get.call_args_list], [1, 2])
+
+    @patch('olx_api.search.requests.get')
+    def test_search_all_listings_stops_on_error(self, mock_get):
+        mock_get.side_effect = [make_response([{"id": 1}, {"id": 2}], 10, 5), Exception("429")]
+
+        result = self.api.search_all_listings("iphone", per_page=2)
+
+        self.assertEqual(result, [{"id": 1}, {"id": 2}])
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class TestSearchNewListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, "state.json")
+        self.api = Search(token="dummy_token")
+        # 10 listings, newest first, 2 per page.
+        self.listings = [{"id": listing_id} for listing_id in range(110, 100, -1)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fake_get(self, url, headers=None, params=None):
+        page, per_page = params["page"], params["per_page"]
+        data = self.listings[(page - 1) * per_page:page * per_page]
+        return make_response(data, len(self.listings), -(-len(self.listings) // per_page))
+
+    def known_ids(self):
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)[Search.search_key("iphone", extra_params=dict(NEWEST_FIRST))]
+        return entry["known_ids"], entry.get("low_water")
+
+    @patch('olx_api.search.requests.get')
+    def test_only_new_listings_are_fetched(self, mock_get):
+        mock_get.side_effect = self.fake_get
+
+        first = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=5)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(mock_get.call_count, 5)
+        self.assertEqual(mock_get.call_args.kwargs["params"]["sort_by"], "date")
+
+        mock_get.reset_mock()
+        self.listings = [{"id": 112}, {"id": 111}] + self.listings
+        second = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=5)
+        self.assertEqual([item["id"] for item in second], [112, 111])
+        # Page 2 holds the first already seen listing.
+        self.assertEqual(mock_get.call_count, 2)
+
+        mock_get.reset_mock()
+        self.assertEqual(self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path,
+                                                      resync_every=5), [])
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('olx_api.search.requests.get')
+    def test_periodic_full_resync(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        for _ in range(2):
+            self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2)
+
+        mock_get.reset_mock()
+        self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2)
+        self.assertEqual(mock_get.call_count, 5)
+
+    @patch('olx_api.search.requests.get')
+    def test_resync_finds_late_lower_id_listing(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2)
+
+        # A new listing on top, and listing 99 (older than every seen one) shows up late on page 4.
+        self.listings = [{"id": 111}] + self.listings[:6] + [{"id": 99}] + self.listings[6:]
+        second = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2)
+        # The incremental run stops at the first seen listing.
+        self.assertEqual([item["id"] for item in second], [111])
+
+        third = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2)
+        self.assertEqual([item["id"] for item in third], [99])
+
+        self.assertEqual(self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path,
+                                                      resync_every=2), [])
+
+    @patch('olx_api.search.requests.get')
+    def test_state_with_only_newest_id_is_resynced(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        key = Search.search_key("iphone", extra_params=dict(NEWEST_FIRST))
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump({key: {"q": "iphone", "newest_id": 108, "runs": 3}}, f)
+
+        new = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=0)
+
+        self.assertEqual([item["id"] for item in new], [110, 109])
+        self.assertEqual(mock_get.call_count, 5)
+        self.assertEqual(self.known_ids(), (list(range(101, 111)), None))
+
+    @patch('olx_api.search.requests.get')
+    def test_cut_off_resync_forgets_removed_listings_it_covered(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=1)
+
+        # 109 and 104 are gone; the next resync stops after 2 pages (110, 108, 107, 106).
+        self.listings = [item for item in self.listings if item["id"] not in (109, 104)]
+        self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=1,
+                                     max_pages=2)
+
+        self.assertEqual(mock_get.call_count, 7)
+        # 109 was in the range read and is forgotten; 104 was below it and is kept.
+        self.assertEqual(self.known_ids()[0], [101, 102, 103, 104, 105, 106, 107, 108, 110])
+
+    @patch('olx_api.search.requests.get')
+    def test_known_ids_are_capped_with_a_low_water_mark(self, mock_get):
+        mock_get.side_effect = self.fake_get
+        first = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2,
+                                             max_known_ids=4)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(self.known_ids(), ([107, 108, 109, 110], 107))
+
+        # A new listing on top.
+        self.listings = [{"id": 111}] + self.listings
+        second = self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path, resync_every=2,
+                                              max_known_ids=4)
+        self.assertEqual([item["id"] for item in second], [111])
+        self.assertEqual(self.known_ids(), ([108, 109, 110, 111], 108))
+
+        # The full resync reads everything, but ids below the mark count as seen.
+        self.assertEqual(self.api.search_new_listings("iphone", per_page=2, state_path=self.state_path,
+                                                      resync_every=2, max_known_ids=4), [])
+        self.assertEqual(self.known_ids(), ([108, 109, 110, 111], 108))
+
+
+if __name__ == "__main__":
+    unittest.main()
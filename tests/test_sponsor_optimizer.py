@@ -0,0 +1,69 @@
+import itertools
+import unittest
+from unittest.mock import Mock
+
+from olx_api.sponsor_optimizer import SponsorOptimizer, execute_plan
+from olx_api.sponsor_quotes import Quote
+
+
+def make_quote(listing_id, days, total, sponsor_type=1):
+    return Quote(listing_id, sponsor_type, days, 0, ["homepage"], float(total), {"total": total})
+
+
+class TestSponsorOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.quotes = [
+            make_quote(1, 3, 30), make_quote(1, 7, 60), make_quote(1, 14, 110),
+            make_quote(2, 3, 20), make_quote(2, 7, 45),
+            make_quote(3, 3, 25), make_quote(3, 7, 50), make_quote(3, 14, 90),
+        ]
+        self.values = {1: 10.0, 2: 4.0, 3: 8.0}
+
+    def brute_force(self, budget):
+        by_listing = {}
+        for quote in self.quotes:
+            by_listing.setdefault(quote.listing_id, [None]).append(quote)
+        best = 0.0
+        for combo in itertools.product(*by_listing.values()):
+            picked = [quote for quote in combo if quote is not None]
+            if sum(quote.total for quote in picked) <= budget:
+                best = max(best, sum(self.values[quote.listing_id] * quote.days for quote in picked))
+        return best
+
+    def test_dp_matches_brute_force(self):
+        optimizer = SponsorOptimizer(self.values, method="dp")
+        for budget in (0, 40, 100, 150, 250):
+            plan = optimizer.optimize(self.quotes, budget)
+            self.assertLessEqual(plan.total_cost, budget)
+            self.assertAlmostEqual(plan.total_value, self.brute_force(budget))
+
+    def test_greedy_is_feasible_and_bounded(self):
+        optimizer = SponsorOptimizer(self.values)
+        for budget in (0, 40, 100, 150, 250):
+            plan = optimizer.optimize(self.quotes, budget)
+            optimum = self.brute_force(budget)
+            self.assertLessEqual(plan.total_cost, budget)
+            self.assertLessEqual(plan.total_value, optimum + 1e-9)
+            self.assertGreaterEqual(plan.upper_bound, optimum - 1e-9)
+            self.assertEqual(len({quote.listing_id for quote in plan.selections}), len(plan.selections))
+
+    def test_callable_values(self):
+        optimizer = SponsorOptimizer(lambda quote: 100.0 if quote.listing_id == 2 else 1.0)
+        plan = optimizer.optimize(self.quotes, 30)
+        self.assertEqual([(q.listing_id, q.days) for q in plan.selections], [(2, 3)])
+
+    def test_execute_plan(self):
+        plan = SponsorOptimizer(self.values).optimize(self.quotes, 60)
+        api = Mock()
+        api.sponsor_listing.return_value = {"status": "sponsored"}
+        api.discount_listing.side_effect = ValueError("rejected")
+
+        results = execute_plan(plan, api, discounts={3: (99.0, 7)})
+
+        self.assertEqual(api.sponsor_listing.call_count, len(plan.selections))
+        api.discount_listing.assert_called_once_with(3, 99.0, 7)
+        self.assertIsInstance(results[-1][2], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
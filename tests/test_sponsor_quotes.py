@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import Mock
+
+from olx_api.sponsor_quotes import SponsorQuoteMatrix
+
+
+def fake_price(listing_id, sponsor_type, days, refresh_every, locations):
+    return {
+        "search": 10 * days,
+        "refresh": refresh_every,
+        "locations": 5 * len(locations),
+        "extras": 0,
+        "total": 10 * days + refresh_every + 5 * len(locations) + sponsor_type
+    }
+
+
+class TestSponsorQuoteMatrix(unittest.TestCase):
+    def setUp(self):
+        self.api = Mock()
+        self.api.get_sponsoring_price.side_effect = fake_price
+        self.now = 1000.0
+        self.matrix = SponsorQuoteMatrix(self.api, ttl=60, clock=lambda: self.now)
+
+    def test_get_quotes_fetches_every_combination(self):
+        table = self.matrix.get_quotes(40, sponsor_types=(1, 2), days=(3, 7), refresh_every=(0, 24),
+                                       locations=[["homepage"]])
+
+        self.assertEqual(len(table), 8)
+        self.assertEqual(self.api.get_sponsoring_price.call_count, 8)
+        first = table[0]
+        self.assertEqual((first.sponsor_type, first.days, first.refresh_every, first.locations), (1, 3, 0, ["homepage"]))
+        self.assertEqual(first.total, 36.0)
+
+    def test_quotes_are_cached_until_ttl(self):
+        self.matrix.get_quotes(40, sponsor_types=(1,), days=(3,), refresh_every=(0,))
+        self.matrix.get_quotes(40, sponsor_types=(1,), days=(3,), refresh_every=(0,))
+        self.assertEqual(self.api.get_sponsoring_price.call_count, 1)
+
+        self.now += 61
+        self.matrix.get_quotes(40, sponsor_types=(1,), days=(3,), refresh_every=(0,))
+        self.assertEqual(self.api.get_sponsoring_price.call_count, 2)
+
+    def test_quotes_are_shared_within_price_bracket(self):
+        matrix = SponsorQuoteMatrix(self.api, bracket_fn=lambda price: price // 1000, clock=lambda: self.now)
+        matrix.get_quotes(40, sponsor_types=(1,), days=(3,), refresh_every=(0,), listing_price=1200)
+        table = matrix.get_quotes(41, sponsor_types=(1,), days=(3,), refresh_every=(0,), listing_price=1800)
+
+        self.assertEqual(self.api.get_sponsoring_price.call_count, 1)
+        self.assertEqual(table[0].listing_id, 41)
+
+    def test_failed_combinations_are_skipped(self):
+        def flaky(listing_id, sponsor_type, days, refresh_every, locations):
+            if days == 7:
+                raise ValueError("boom")
+            return fake_price(listing_id, sponsor_type, days, refresh_every, locations)
+
+        self.api.get_sponsoring_price.side_effect = flaky
+        table = self.matrix.get_quotes(40, sponsor_types=(1,), days=(3, 7), refresh_every=(0,))
+        self.assertEqual([quote.days for quote in table], [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+from olx_api.listings import Listings
+from olx_api.token_provider import TokenProvider
+
+
+class TestTokenProvider(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, "token.json")
+        self.auth = Mock()
+        self.auth.username = "test@olx.ba"
+        self.auth.device_name = "integration"
+        self.tokens = iter(["token1", "token2", "token3"])
+        self.auth.login.side_effect = lambda: next(self.tokens)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_token_is_cached_on_disk(self):
+        provider = TokenProvider(self.auth, cache_path=self.cache_path)
+        self.assertEqual(provider.get_token(), "token1")
+        if os.name == "posix":
+            self.assertEqual(stat.S_IMODE(os.stat(self.cache_path).st_mode), 0o600)
+
+        # A second provider (e.g. in another process) reuses the cached token.
+        other = TokenProvider(self.auth, cache_path=self.cache_path)
+        self.assertEqual(other.get_token(), "token1")
+        self.assertEqual(self.auth.login.call_count, 1)
+
+    def test_concurrent_refresh_logs_in_once(self):
+        provider = TokenProvider(self.auth, cache_path=self.cache_path)
+        provider.get_token()
+
+        def slow_login():
+            time.sleep(0.05)
+            return next(self.tokens)
+
+        self.auth.login.side_effect = slow_login
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(provider.refresh(stale_token="token1")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["token2"] * 5)
+        self.assertEqual(self.auth.login.call_count, 2)
+
+    @patch('olx_api.base.requests.Session')
+    @patch('olx_api.listings.requests.get')
+    def test_request_is_retried_on_401(self, mock_get, mock_session):
+        provider = TokenProvider(self.auth, cache_path=self.cache_path)
+        api = Listings(token=provider)
+
+        rejected = Mock()
+        rejected.status_code = 401
+        rejected.request.headers = {"Authorization": "Bearer token1"}
+        retried = Mock()
+        retried.headers = {"Authorization": "Bearer token1"}
+        rejected.request.copy.return_value = retried
+        mock_get.return_value = rejected
+
+        accepted = Mock()
+        accepted.status_code = 200
+        accepted.raise_for_status.return_value = None
+        accepted.json.return_value = {"free_limit": 10}
+        mock_session.return_value.__enter__.return_value.send.return_value = accepted
+
+        self.assertEqual(api.get_refresh_limits(), {"free_limit": 10})
+        self.assertEqual(retried.headers["Authorization"], "Bearer token2")
+        mock_session.return_value.__enter__.return_value.send.assert_called_once_with(retried)
+        self.assertEqual(api.token, "token2")
+
+
+if __name__ == "__main__":
+    unittest.main()